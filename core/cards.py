@@ -1,9 +1,11 @@
 # core/cards.py
 import random
-from typing import List, Tuple
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from itertools import combinations
-from core.enums import Card
+from core.enums import Card, CardId
 from core.ranks import RANK_TO_STR
+from core.utils_hand import NUM_HAND_TYPES, hand_type_index
 
 
 # スート定義（MDFモード用）
@@ -17,37 +19,184 @@ SUIT_EMOJI = {
     "c": "♣️",  # club
 }
 
+# ==========
+# 整数カードID（0..51）
+# ==========
+# card_id = (rank - 2) * 4 + suit_index
+# タプル (rank, suit) は表示・フォーム入出力の境界でのみ使う
 
-def card_to_str(card: Card) -> str:
-    """カードを文字列表現に変換（例: A♠️, K♥️）"""
+SUIT_INDEX = {s: i for i, s in enumerate(SUITS)}
+
+NUM_CARDS = 52
+ALL_CARD_IDS: Tuple[CardId, ...] = tuple(range(NUM_CARDS))
+
+# card_id → ランク（2..14）/ スート番号（0..3）
+CARD_RANK: Tuple[int, ...] = tuple(c // 4 + 2 for c in ALL_CARD_IDS)
+CARD_SUIT: Tuple[int, ...] = tuple(c % 4 for c in ALL_CARD_IDS)
+
+# card_id → ビットマスク
+CARD_BIT: Tuple[int, ...] = tuple(1 << c for c in ALL_CARD_IDS)  # 52bit（カード）
+RANK_BIT: Tuple[int, ...] = tuple(1 << (r - 2) for r in CARD_RANK)  # 13bit（ランク）
+SUIT_BIT: Tuple[int, ...] = tuple(1 << s for s in CARD_SUIT)  # 4bit（スート）
+
+# デッキ順（A♠️, A♥️, ..., 2♣️）: コンボは (強いカード, 弱いカード) の順で列挙される
+DECK: Tuple[CardId, ...] = tuple(sorted(ALL_CARD_IDS, key=lambda c: (-CARD_RANK[c], CARD_SUIT[c])))
+
+
+def make_card(rank: int, suit: str) -> CardId:
+    """ランク（2..14）とスート文字からカードIDを作る"""
+    return (rank - 2) * 4 + SUIT_INDEX[suit]
+
+
+def to_card_id(card: Card) -> CardId:
+    """(rank, suit) タプル → カードID"""
     rank, suit = card
+    return make_card(rank, suit)
+
+
+def from_card_id(card_id: CardId) -> Card:
+    """カードID → (rank, suit) タプル"""
+    return CARD_RANK[card_id], SUITS[CARD_SUIT[card_id]]
+
+
+def parse_card(raw: str) -> CardId:
+    """フォーム形式（例: "14s", "2c"）→ カードID。解釈できなければ ValueError"""
+    rank, suit = raw[:-1], raw[-1:]
+    if not rank.isdigit() or not 2 <= int(rank) <= 14 or suit not in SUIT_INDEX:
+        raise ValueError(f"invalid card: {raw!r}")
+    return make_card(int(rank), suit)
+
+
+def format_card(card_id: CardId) -> str:
+    """カードID → フォーム形式（例: "14s"）"""
+    rank, suit = from_card_id(card_id)
+    return f"{rank}{suit}"
+
+
+def parse_board(raw: str) -> List[CardId]:
+    """board_raw（例: "14s,7h,2c"）→ カードIDのリスト"""
+    return [parse_card(card_str) for card_str in raw.split(',')]
+
+
+def format_board(board: List[CardId]) -> str:
+    """カードIDのリスト → board_raw（カンマ区切り）"""
+    return ",".join(format_card(c) for c in board)
+
+
+def card_to_str(card: CardId) -> str:
+    """カードを文字列表現に変換（例: A♠️, K♥️）"""
+    rank, suit = from_card_id(card)
     return f"{RANK_TO_STR[rank]}{SUIT_EMOJI[suit]}"
 
 
-def generate_board() -> List[Card]:
-    """ランダムにフロップ3枚を生成"""
-    all_cards = [(r, s) for r in RANK_TO_STR.keys() for s in SUITS]
-    return random.sample(all_cards, 3)
+def generate_board(num_cards: int = 3, rng: Optional[random.Random] = None) -> List[CardId]:
+    """ランダムにボードを生成（3枚=フロップ, 4枚=ターン, 5枚=リバー）"""
+    return (rng or random).sample(DECK, num_cards)
 
 
-def enumerate_all_combos() -> List[Tuple[Card, Card]]:
-    """全1326コンボを列挙"""
-    all_cards = [(r, s) for r in RANK_TO_STR.keys() for s in SUITS]
-    return list(combinations(all_cards, 2))
+def enumerate_all_combos() -> Tuple[Tuple[CardId, CardId], ...]:
+    """全1326コンボ（事前構築済みの COMBOS テーブル）を返す"""
+    return COMBOS
 
 
-def combo_to_hand_type(c1: Card, c2: Card) -> Tuple[int, int, bool]:
+def combo_to_hand_type(c1: CardId, c2: CardId) -> Tuple[int, int, bool]:
     """コンボ (card1, card2) を (hi, lo, suited) に変換"""
-    r1, s1 = c1
-    r2, s2 = c2
+    r1 = CARD_RANK[c1]
+    r2 = CARD_RANK[c2]
     hi = max(r1, r2)
     lo = min(r1, r2)
-    suited = (s1 == s2) and (r1 != r2)
+    suited = (CARD_SUIT[c1] == CARD_SUIT[c2]) and (r1 != r2)
     return hi, lo, suited
 
 
-def blocks_with_board(combo: Tuple[Card, Card], board: List[Card]) -> bool:
-    """コンボがボードとカードが被るかチェック"""
-    c1, c2 = combo
-    board_set = set(board)
-    return c1 in board_set or c2 in board_set
+def cards_mask(cards: Iterable[CardId]) -> int:
+    """カードの集合（ボード、ターン/リバー、ヒーローのブロッカー等）→ 52bitデッドカードマスク"""
+    mask = 0
+    for c in cards:
+        mask |= CARD_BIT[c]
+    return mask
+
+
+# ==========
+# 1326コンボテーブル（import時に1回だけ構築・不変）
+# ==========
+# combo_index（0..1325）で各テーブルを引く
+
+COMBOS: Tuple[Tuple[CardId, CardId], ...] = tuple(combinations(DECK, 2))
+NUM_COMBOS = len(COMBOS)  # 1326
+
+# combo_index → (hi, lo, suited)
+COMBO_HAND_TYPE: Tuple[Tuple[int, int, bool], ...] = tuple(
+    combo_to_hand_type(c1, c2) for c1, c2 in COMBOS
+)
+
+# combo_index → 169ハンドクラスの index（core.utils_hand.hand_type_index）
+COMBO_HAND_TYPE_INDEX: Tuple[int, ...] = tuple(hand_type_index(*t) for t in COMBO_HAND_TYPE)
+
+# hand_type_index → そのクラスのコンボの1326bitマスク
+HAND_TYPE_COMBO_BITS: Tuple[int, ...] = tuple(
+    sum(1 << i for i, t in enumerate(COMBO_HAND_TYPE_INDEX) if t == k) for k in range(NUM_HAND_TYPES)
+)
+
+# combo_index → 52bitカードマスク
+COMBO_MASK: Tuple[int, ...] = tuple(CARD_BIT[c1] | CARD_BIT[c2] for c1, c2 in COMBOS)
+
+# (card, card) → combo_index（どちらの順序でも引ける）
+COMBO_INDEX: Dict[Tuple[CardId, CardId], int] = {
+    **{(c1, c2): i for i, (c1, c2) in enumerate(COMBOS)},
+    **{(c2, c1): i for i, (c1, c2) in enumerate(COMBOS)},
+}
+
+# card_id → そのカードを含むコンボの1326bitマスク
+CARD_COMBO_BITS: Tuple[int, ...] = tuple(
+    sum(1 << i for i, m in enumerate(COMBO_MASK) if m & CARD_BIT[c]) for c in ALL_CARD_IDS
+)
+
+
+def blocks_with_board(combo_index: int, dead_mask: int) -> bool:
+    """コンボがデッドカード（ボード等）とカードが被るかチェック"""
+    return COMBO_MASK[combo_index] & dead_mask != 0
+
+
+def dead_combo_bits(dead_mask: int) -> int:
+    """52bitデッドカードマスク → 被るコンボの1326bitマスク"""
+    bits = 0
+    while dead_mask:
+        low = dead_mask & -dead_mask
+        bits |= CARD_COMBO_BITS[low.bit_length() - 1]
+        dead_mask ^= low
+    return bits
+
+
+@dataclass(frozen=True)
+class ComboRange:
+    """
+    1326bitのコンボ集合。bit i が立っていれば combo_index i（core.cards.COMBOS）を含む。
+    """
+    bits: int = 0
+
+    def __contains__(self, combo_index: int) -> bool:
+        return (self.bits >> combo_index) & 1 == 1
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __iter__(self) -> Iterator[int]:
+        """含まれる combo_index を昇順に返す"""
+        bits = self.bits
+        while bits:
+            low = bits & -bits
+            yield low.bit_length() - 1
+            bits ^= low
+
+    def without(self, dead_mask: int) -> "ComboRange":
+        """
+        52bitデッドカードマスク（core.cards.cards_mask）と被るコンボを一括で除外する。
+        ボード・ターン/リバー・ヒーローのブロッカーなど、カード除外は全てここを通す。
+        """
+        return ComboRange(self.bits & ~dead_combo_bits(dead_mask))
+
+    def combos(self) -> Iterator[Tuple[CardId, CardId]]:
+        """含まれるコンボを (card, card) で返す"""
+        for i in self:
+            yield COMBOS[i]
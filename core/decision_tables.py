@@ -0,0 +1,163 @@
+# core/decision_tables.py
+"""
+プリフロップの判定関数を 169ハンドクラス（core.utils_hand.hand_type_index）の表に展開したもの。
+
+起動時に1回だけ元の関数で全クラスを評価しておき、問題生成では表を引くだけにする。
+元の関数（ranges_*.py / power_number.py）がルールの定義で、表はそのキャッシュ。
+外部レンジファイルを読み込んだ場合の表は core.range_store が持つ。
+
+整合性チェック: python -m core.decision_tables
+"""
+import random
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from core.enums import Position, POSITIONS
+from core.utils_hand import HAND_TYPES, hand_type_combos, hand_type_index
+from core.sampling import AliasSampler
+from core.ranges_open import in_open_range, open_range as builtin_open_range
+from core.ranges_3bet import three_bet_allowed_actions
+from core.ranges_3bet_defence import three_bet_defence_action
+from core.ranges_bb_defence import bb_defence_vs_open
+from core.ranges_sb_open import SB_RAISE, sb_first_in_action
+from core.power_number import assign_power_number
+from core.range_dsl import HandRange
+from core.range_combos import with_derived_ranges
+
+
+@dataclass(frozen=True)
+class DecisionTables:
+    open_range: Dict[Position, Tuple[bool, ...]]
+    bb_defence: Dict[Position, Tuple[bool, ...]]
+    sb_first_in: Tuple[str, ...]
+    three_bet: Dict[Tuple[Position, Position], Tuple[Tuple[str, ...], ...]]
+    three_bet_defence: Dict[Tuple[Position, bool], Tuple[str, ...]]
+    power_number: Dict[Position, Tuple[int, ...]]
+    # オープンレンジ内のハンドをコンボ数で重み付けして抽選（レンジが空なら None）
+    open_samplers: Dict[Position, Optional[AliasSampler]]
+
+    def in_open_range(self, pos: Position, hi: int, lo: int, suited: bool) -> bool:
+        return self.open_range[pos][hand_type_index(hi, lo, suited)]
+
+    def bb_defence_vs_open(self, villain_pos: Position, hi: int, lo: int, suited: bool) -> bool:
+        return self.bb_defence[villain_pos][hand_type_index(hi, lo, suited)]
+
+    def sb_first_in_action(self, hi: int, lo: int, suited: bool) -> str:
+        return self.sb_first_in[hand_type_index(hi, lo, suited)]
+
+    def three_bet_allowed_actions(
+        self, hero_pos: Position, villain_pos: Position, hi: int, lo: int, suited: bool
+    ) -> List[str]:
+        return list(self.three_bet[(hero_pos, villain_pos)][hand_type_index(hi, lo, suited)])
+
+    def three_bet_defence_action(self, hero_pos: Position, in_position: bool, hi: int, lo: int, suited: bool) -> str:
+        return self.three_bet_defence[(hero_pos, in_position)][hand_type_index(hi, lo, suited)]
+
+    def assign_power_number(self, hero_pos: Position, hi: int, lo: int, suited: bool) -> int:
+        return self.power_number[hero_pos][hand_type_index(hi, lo, suited)]
+
+    def random_open_hand(self, pos: Position, rng: Optional[random.Random] = None) -> Optional[Tuple[int, int, bool]]:
+        """pos のオープンレンジ内のハンドを実際のコンボ頻度で1つ返す（レンジが空なら None）"""
+        sampler = self.open_samplers[pos]
+        return sampler.sample(rng) if sampler is not None else None
+
+
+def grid_sampler(grid: Sequence[bool]) -> Optional[AliasSampler]:
+    """169クラスの表で True のハンドを、コンボ数で重み付けして抽選するサンプラー"""
+    hands = [HAND_TYPES[k] for k, included in enumerate(grid) if included]
+    if not hands:
+        return None
+    return AliasSampler(hands, [hand_type_combos(*h) for h in hands])
+
+
+def build_decision_tables(overrides: Optional[Mapping[str, HandRange]] = None) -> DecisionTables:
+    """
+    全ポジション（の組）× 169クラスを元の関数で評価して表にする。
+    overrides（外部レンジファイル、core.range_store）にあるレンジはそちらで置き換える:
+      OPEN_<pos> → オープン、BB_DEFENCE_vs_<pos> → BB defence、
+      3BET_DEFENCE_IP / 3BET_DEFENCE_OOP → 3betディフェンス、SB_RFI → SB first-in の RAISE
+    オープンレンジを元に作る表（パワーナンバー、3betの「一つ上のオープンレンジ」）も上書き後のレンジで作り、
+    派生レンジ（core.range_combos.DERIVED_FROM: SB_RFI ← OPEN_BTN、3BET_DEFENCE_* ← OPEN_UTG1）は
+    元のレンジの上書きに追従する。
+    """
+    overrides = with_derived_ranges(overrides or {})
+    positions = list(Position)
+
+    def open_hand_range(pos: Position) -> Optional[HandRange]:
+        return overrides.get(f"OPEN_{pos.name}", builtin_open_range(pos))
+
+    def grid(name: str, default: Tuple[bool, ...]) -> Tuple[bool, ...]:
+        return overrides[name].grid() if name in overrides else default
+
+    def defence(name: str, default: Tuple[str, ...]) -> Tuple[str, ...]:
+        if name not in overrides:
+            return default
+        return tuple("defend" if d else "fold" for d in overrides[name].grid())
+
+    sb_raise = overrides.get("SB_RFI", SB_RAISE)
+    open_range = {
+        pos: grid(f"OPEN_{pos.name}", tuple(in_open_range(pos, *t) for t in HAND_TYPES)) for pos in positions
+    }
+    return DecisionTables(
+        open_range=open_range,
+        bb_defence={
+            pos: grid(f"BB_DEFENCE_vs_{pos.name}", tuple(bb_defence_vs_open(pos, *t) for t in HAND_TYPES))
+            for pos in positions
+        },
+        sb_first_in=tuple(sb_first_in_action(*t, raise_range=sb_raise) for t in HAND_TYPES),
+        three_bet={
+            (hero, villain): tuple(
+                tuple(three_bet_allowed_actions(hero, villain, *t, open_ranges=open_hand_range)) for t in HAND_TYPES
+            )
+            for hero in positions
+            for villain in POSITIONS  # オープンしたポジション（UTG〜BTN）
+        },
+        three_bet_defence={
+            (pos, ip): defence(
+                "3BET_DEFENCE_IP" if ip else "3BET_DEFENCE_OOP",
+                tuple(three_bet_defence_action(pos, ip, *t) for t in HAND_TYPES),
+            )
+            for pos in positions
+            for ip in (True, False)
+        },
+        power_number={
+            pos: tuple(assign_power_number(pos, *t, open_ranges=open_hand_range) for t in HAND_TYPES) for pos in positions
+        },
+        open_samplers={pos: grid_sampler(open_range[pos]) for pos in positions},
+    )
+
+
+def verify_decision_tables(tables: DecisionTables) -> List[str]:
+    """表と元の関数を全クラスで突き合わせ、不一致の一覧を返す（空なら一致）"""
+    mismatches = []
+    for pos in Position:
+        for hi, lo, suited in HAND_TYPES:
+            hand = (hi, lo, suited)
+            if tables.in_open_range(pos, *hand) != in_open_range(pos, *hand):
+                mismatches.append(f"open {pos.value} {hand}")
+            if tables.bb_defence_vs_open(pos, *hand) != bb_defence_vs_open(pos, *hand):
+                mismatches.append(f"bb_defence {pos.value} {hand}")
+            if tables.assign_power_number(pos, *hand) != assign_power_number(pos, *hand):
+                mismatches.append(f"power_number {pos.value} {hand}")
+            for ip in (True, False):
+                if tables.three_bet_defence_action(pos, ip, *hand) != three_bet_defence_action(pos, ip, *hand):
+                    mismatches.append(f"3bet_defence {pos.value} ip={ip} {hand}")
+            for villain in POSITIONS:
+                if tables.three_bet_allowed_actions(pos, villain, *hand) != three_bet_allowed_actions(pos, villain, *hand):
+                    mismatches.append(f"3bet {pos.value} vs {villain.value} {hand}")
+    for hand in HAND_TYPES:
+        if tables.sb_first_in_action(*hand) != sb_first_in_action(*hand):
+            mismatches.append(f"sb_first_in {hand}")
+    return mismatches
+
+
+# 起動時に1回だけ展開（組み込みレンジのみ）
+DECISION_TABLES = build_decision_tables()
+
+
+if __name__ == "__main__":
+    errors = verify_decision_tables(DECISION_TABLES)
+    for line in errors:
+        print(line)
+    print("ok" if not errors else f"{len(errors)} mismatches")
+    sys.exit(1 if errors else 0)
@@ -1,5 +1,5 @@
 # core/enums.py
-from enum import Enum
+from enum import Enum, IntEnum
 from typing import Tuple
 
 # ==========
@@ -10,6 +10,10 @@ from typing import Tuple
 # 例: (14, 's') = As, (13, 'h') = Kh
 Card = Tuple[int, str]
 
+# 内部カード表現: 0..51 の整数ID（core.cards で相互変換）
+# card_id = (rank - 2) * 4 + suit_index  例: 48 = As, 45 = Kh
+CardId = int
+
 
 # ==========
 # Enum定義
@@ -48,6 +52,19 @@ class Bucket(str, Enum):
     AIR = "Air"
 
 
+# 役カテゴリ（弱い順、core.hand_rank の強さと同じ順序で比較可能）
+class HandCategory(IntEnum):
+    HIGH_CARD = 0
+    ONE_PAIR = 1
+    TWO_PAIR = 2
+    THREE_OF_A_KIND = 3
+    STRAIGHT = 4
+    FLUSH = 5
+    FULL_HOUSE = 6
+    FOUR_OF_A_KIND = 7
+    STRAIGHT_FLUSH = 8
+
+
 # ==========
 # 定数
 # ==========
@@ -0,0 +1,160 @@
+# core/hand_rank.py
+"""
+テーブル駆動のハンドランク評価（5/6/7枚）。
+
+強さは 1..7462 の整数（大きいほど強い）で、5枚役の同値クラスに1つずつ対応する。
+- フラッシュ: 13bitランクマスク → 強さ（FLUSH_TABLE）
+- 5ランクばらばら: 13bitランクマスク → 強さ（UNIQUE5_TABLE）
+- ペア系: ランク素数の積 → 強さ（PAIRED_TABLE）
+6/7枚は5枚組の最大値（best-of-N）。
+"""
+from bisect import bisect_right
+from itertools import combinations
+from typing import Dict, Iterable, List, Tuple
+from core.enums import CardId, HandCategory
+from core.cards import ALL_CARD_IDS, CARD_RANK, CARD_SUIT, RANK_BIT
+
+
+# ランク（2..14）→ 素数
+_RANK_PRIME = {2: 2, 3: 3, 4: 5, 5: 7, 6: 11, 7: 13, 8: 17, 9: 19, 10: 23, 11: 29, 12: 31, 13: 37, 14: 41}
+
+# card_id → ランク素数
+CARD_PRIME: Tuple[int, ...] = tuple(_RANK_PRIME[CARD_RANK[c]] for c in ALL_CARD_IDS)
+
+_RANKS_DESC = list(range(14, 1, -1))
+
+# ストレート（強い順の上位ランク → 5ランク）。ホイールは 5-4-3-2-A
+_STRAIGHTS = [tuple(range(top, top - 5, -1)) for top in range(14, 5, -1)] + [(5, 4, 3, 2, 14)]
+
+
+def _rank_bits(ranks: Iterable[int]) -> int:
+    bits = 0
+    for r in ranks:
+        bits |= 1 << (r - 2)
+    return bits
+
+
+def _rank_product(ranks: Iterable[int]) -> int:
+    product = 1
+    for r in ranks:
+        product *= _RANK_PRIME[r]
+    return product
+
+
+def _build_tables() -> Tuple[List[int], List[int], Dict[int, int], Tuple[int, ...]]:
+    """
+    全7462同値クラスを弱い順に列挙して強さを振る。
+    戻り値: (FLUSH_TABLE, UNIQUE5_TABLE, PAIRED_TABLE, 各カテゴリの開始強さ)
+    """
+    straight_bits = {_rank_bits(s) for s in _STRAIGHTS}
+    # ストレートでない5ランク（強い順 = 降順タプルの辞書順）
+    high_cards = sorted(
+        (c for c in combinations(_RANKS_DESC, 5) if _rank_bits(c) not in straight_bits),
+        reverse=True,
+    )
+
+    # カテゴリごとに（強い順の）ランク列を作る
+    by_category: Dict[HandCategory, List[Tuple[int, ...]]] = {
+        HandCategory.HIGH_CARD: high_cards,
+        HandCategory.ONE_PAIR: [
+            (p, p) + k
+            for p in _RANKS_DESC
+            for k in combinations([r for r in _RANKS_DESC if r != p], 3)
+        ],
+        HandCategory.TWO_PAIR: [
+            (p1, p1, p2, p2, k)
+            for p1, p2 in combinations(_RANKS_DESC, 2)
+            for k in _RANKS_DESC if k not in (p1, p2)
+        ],
+        HandCategory.THREE_OF_A_KIND: [
+            (t, t, t) + k
+            for t in _RANKS_DESC
+            for k in combinations([r for r in _RANKS_DESC if r != t], 2)
+        ],
+        HandCategory.STRAIGHT: _STRAIGHTS,
+        HandCategory.FLUSH: high_cards,
+        HandCategory.FULL_HOUSE: [
+            (t, t, t, p, p) for t in _RANKS_DESC for p in _RANKS_DESC if p != t
+        ],
+        HandCategory.FOUR_OF_A_KIND: [
+            (q, q, q, q, k) for q in _RANKS_DESC for k in _RANKS_DESC if k != q
+        ],
+        HandCategory.STRAIGHT_FLUSH: _STRAIGHTS,
+    }
+
+    flush_table = [0] * (1 << 13)
+    unique5_table = [0] * (1 << 13)
+    paired_table: Dict[int, int] = {}
+    category_start = []
+
+    strength = 0
+    for category in HandCategory:
+        category_start.append(strength + 1)
+        # 弱い順に強さを振る
+        for ranks in reversed(by_category[category]):
+            strength += 1
+            if category in (HandCategory.FLUSH, HandCategory.STRAIGHT_FLUSH):
+                flush_table[_rank_bits(ranks)] = strength
+            elif category in (HandCategory.HIGH_CARD, HandCategory.STRAIGHT):
+                unique5_table[_rank_bits(ranks)] = strength
+            else:
+                paired_table[_rank_product(ranks)] = strength
+
+    return flush_table, unique5_table, paired_table, tuple(category_start)
+
+
+FLUSH_TABLE, UNIQUE5_TABLE, PAIRED_TABLE, CATEGORY_START = _build_tables()
+# CATEGORY_START[category] = そのカテゴリの最小の強さ
+
+NUM_HAND_CLASSES = 7462
+
+
+def rank5(c1: CardId, c2: CardId, c3: CardId, c4: CardId, c5: CardId) -> int:
+    """5枚の強さ（1..7462、大きいほど強い）"""
+    bits = RANK_BIT[c1] | RANK_BIT[c2] | RANK_BIT[c3] | RANK_BIT[c4] | RANK_BIT[c5]
+    s = CARD_SUIT[c1]
+    if s == CARD_SUIT[c2] == CARD_SUIT[c3] == CARD_SUIT[c4] == CARD_SUIT[c5]:
+        return FLUSH_TABLE[bits]
+    strength = UNIQUE5_TABLE[bits]
+    if strength:
+        return strength
+    return PAIRED_TABLE[CARD_PRIME[c1] * CARD_PRIME[c2] * CARD_PRIME[c3] * CARD_PRIME[c4] * CARD_PRIME[c5]]
+
+
+# 6/7枚の best-of-N 結果のメモ
+# フラッシュが無ければ強さはランクの多重集合（素数積）だけで決まり、
+# フラッシュがあればそのスートのランクマスクだけで決まる（7枚以下ではフラッシュ > それ以外の役）
+_MULTISET_BEST: Dict[int, int] = {}
+_FLUSH_BEST: Dict[int, int] = {}
+
+
+def evaluate_cards(cards: List[CardId]) -> int:
+    """5〜7枚の強さ（6/7枚は5枚組の最大値）"""
+    if len(cards) == 5:
+        return rank5(*cards)
+
+    suit_bits = [0, 0, 0, 0]
+    product = 1
+    for c in cards:
+        suit_bits[CARD_SUIT[c]] |= RANK_BIT[c]
+        product *= CARD_PRIME[c]
+
+    for bits in suit_bits:
+        if bits.bit_count() >= 5:
+            strength = _FLUSH_BEST.get(bits)
+            if strength is None:
+                ranks = [r for r in _RANKS_DESC if bits & (1 << (r - 2))]
+                strength = max(FLUSH_TABLE[_rank_bits(five)] for five in combinations(ranks, 5))
+                _FLUSH_BEST[bits] = strength
+            return strength
+
+    strength = _MULTISET_BEST.get(product)
+    if strength is None:
+        strength = max(rank5(*five) for five in combinations(cards, 5))
+        _MULTISET_BEST[product] = strength
+    return strength
+
+
+def hand_category(strength: int) -> HandCategory:
+    """強さ → 役カテゴリ"""
+    return HandCategory(bisect_right(CATEGORY_START, strength) - 1)
@@ -0,0 +1,54 @@
+# core/isomorphism.py
+"""
+スート同型（suit isomorphism）による正準化。
+
+スートの入れ替え（24通り）でボード・コンボを写しても、バケットや役の強さは変わらない。
+ボードを「全スート置換のうち最小のカード列」に写し、その代表（正準ボード）で計算・キャッシュする。
+フロップは 22100 通り → 正準フロップは 1755 通り。
+"""
+from functools import lru_cache
+from itertools import combinations, permutations
+from typing import Iterable, List, Tuple
+from core.enums import CardId
+from core.cards import ALL_CARD_IDS, CARD_SUIT, COMBOS, COMBO_INDEX, DECK
+
+
+# スート置換（perm[元のスート番号] = 写し先のスート番号）
+SUIT_PERMUTATIONS: Tuple[Tuple[int, ...], ...] = tuple(permutations(range(4)))
+
+# 置換index → 逆置換index
+INVERSE_PERMUTATION: Tuple[int, ...] = tuple(
+    SUIT_PERMUTATIONS.index(tuple(perm.index(s) for s in range(4))) for perm in SUIT_PERMUTATIONS
+)
+
+# [置換index][card_id] → 写した card_id
+PERMUTED_CARD: Tuple[Tuple[CardId, ...], ...] = tuple(
+    tuple(c - CARD_SUIT[c] + perm[CARD_SUIT[c]] for c in ALL_CARD_IDS) for perm in SUIT_PERMUTATIONS
+)
+
+# [置換index][combo_index] → 写した combo_index
+PERMUTED_COMBO: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(COMBO_INDEX[(cards[c1], cards[c2])] for c1, c2 in COMBOS) for cards in PERMUTED_CARD
+)
+
+
+def canonicalize_board(board: Iterable[CardId]) -> Tuple[Tuple[CardId, ...], int]:
+    """
+    ボード → (正準ボード, 置換index)。
+    正準ボードは card_id 降順のタプル。コンボは PERMUTED_COMBO[置換index] で正準側に写せる。
+    """
+    board = list(board)
+    best = None
+    best_perm = 0
+    for p, cards in enumerate(PERMUTED_CARD):
+        key = tuple(sorted((cards[c] for c in board), reverse=True))
+        if best is None or key < best:
+            best = key
+            best_perm = p
+    return best, best_perm
+
+
+@lru_cache(maxsize=None)
+def canonical_flops() -> List[Tuple[CardId, ...]]:
+    """全1755正準フロップ（昇順）"""
+    return sorted({canonicalize_board(flop)[0] for flop in combinations(DECK, 3)})
@@ -1,17 +1,19 @@
 # core/power_number.py
+from typing import Callable, Optional
 from core.enums import Position
 from core.utils_hand import is_pocket
-from core.ranges_open import (
-    in_utg_open_range,
-    in_utg12_open_range,
-    in_hjlj_open_range,
-    in_co_open_range,
-    in_btn_open_range,
-)
+from core.range_dsl import HandRange
+from core.ranges_open import open_range
 from core.ranks import RANK_TO_STR
 
 
-def assign_power_number(hero_pos: Position, hi: int, lo: int, suited: bool) -> int:
+def assign_power_number(
+    hero_pos: Position,
+    hi: int,
+    lo: int,
+    suited: bool,
+    open_ranges: Callable[[Position], Optional[HandRange]] = open_range,
+) -> int:
     """
     自作PNルール：
       - UTGオープンレンジ → 999（∞扱い）
@@ -22,29 +24,34 @@ def assign_power_number(hero_pos: Position, hi: int, lo: int, suited: bool) -> i
       - そこまでになくCOレンジ → 10
       - そこまでになくBTNレンジ + KXo + QXo → 5
       - それ以外 → 0（常にフォールド）
+    open_ranges はポジション → オープンレンジ（外部レンジファイルで上書きした表を作る時に差し替える）。
+    UTG+1/2・HJ/LJ の段はそれぞれ2ポジションのどちらかのレンジに入っていれば該当。
     """
+    def in_tier(*positions: Position) -> bool:
+        return any(r is not None and r.contains(hi, lo, suited) for r in map(open_ranges, positions))
+
     # まずUTGオープンレンジ
-    if in_utg_open_range(hi, lo, suited):
+    if in_tier(Position.UTG):
         return 999
 
     # UTG+1/2（A4s, A5s除外）
-    if in_utg12_open_range(hi, lo, suited):
+    if in_tier(Position.UTG1, Position.UTG2):
         if not (suited and hi == 14 and lo in (4, 5)):
             return 50
 
     # HJ/LJ
-    if in_hjlj_open_range(hi, lo, suited):
+    if in_tier(Position.LJ, Position.HJ):
         # KXs で X<=8
         if suited and hi == 13 and lo <= 8:
             return 9 + lo
         return 20
 
     # CO
-    if in_co_open_range(hi, lo, suited):
+    if in_tier(Position.CO):
         return 10
 
     # BTN or KXo/QXo
-    if in_btn_open_range(hi, lo, suited):
+    if in_tier(Position.BTN):
         return 5
 
     # KXo or QXo （どのレンジにも入ってない＋オフスート）
@@ -89,10 +96,14 @@ def should_shove_with_power_number(
     """
     M値 < 6 前提で、PN × 後ろ人数 と M × 後ろ人数 を比較して shove or fold を決める。
     """
+    return shove_with_power_number(hero_pos, assign_power_number(hero_pos, hi, lo, suited), m_value)
+
+
+def shove_with_power_number(hero_pos: Position, pn: int, m_value: float) -> bool:
+    """割り当て済みのPN（core.decision_tables の表など）で shove or fold を決める。"""
     if m_value >= 6:
         return False
 
-    pn = assign_power_number(hero_pos, hi, lo, suited)
     if pn <= 0:
         return False
 
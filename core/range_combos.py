@@ -1,89 +1,110 @@
 # core/range_combos.py
-from typing import Set, Tuple
-from core.enums import Card, Position
-from core.cards import enumerate_all_combos, combo_to_hand_type
-from core.ranges_open import in_open_range
-from core.ranges_3bet_defence import is_in_utg12_defence_core, defend_vs_ip_3bet
-from core.ranges_bb_defence import bb_defence_vs_open
-from core.ranges_sb_open import sb_first_in_action
-from core.ranges_open import in_utg12_open_range
+from functools import lru_cache
+from typing import Callable, Dict, Mapping
+from core.enums import Position, POSITIONS
+from core.cards import ComboRange
+from core.range_dsl import HandRange
+from core.ranges_open import open_range
+from core.ranges_3bet_defence import DEFEND_VS_IP_3BET
+from core.ranges_bb_defence import bb_defence_range
 
 
-def get_range_combos(range_name: str) -> Set[Tuple[Card, Card]]:
+# 使えるレンジ名（外部レンジファイルで上書きできるのも同じ名前）
+RANGE_NAMES = tuple(
+    [f"OPEN_{pos.name}" for pos in POSITIONS]
+    + [f"BB_DEFENCE_vs_{pos.name}" for pos in POSITIONS]
+    + ["3BET_DEFENCE_IP", "3BET_DEFENCE_OOP", "SB_RFI"]
+)
+_RANGE_ALIASES = {"OPEN_UTG+1": "OPEN_UTG1", "OPEN_UTG+2": "OPEN_UTG2"}
+
+# 組み込みでは他のレンジから作るレンジ名 → 元のレンジ名
+# 元のレンジだけが外部レンジファイルで上書きされたら、派生レンジも上書き後のレンジから作り直す
+DERIVED_FROM = {
+    "3BET_DEFENCE_IP": "OPEN_UTG1",
+    "3BET_DEFENCE_OOP": "OPEN_UTG1",
+    "SB_RFI": "OPEN_BTN",
+}
+
+# 外部レンジファイルで上書きされたレンジの取得元。
+# core.range_store が「現在の RangeSet の上書きレンジ」を返す関数を登録する（判定表と同じ1つの参照から引く）
+_override_source: Callable[[], Mapping[str, ComboRange]] = dict
+
+
+def get_range_combos(range_name: str) -> ComboRange:
     """
     指定されたレンジ名に対応する全コンボを返す。
-    レンジ名の例: "OPEN_UTG", "OPEN_CO", "3BET_DEFENCE", "BB_DEFENCE_vs_CO", "SB_RFI"
+    レンジ名の例: "OPEN_UTG", "OPEN_CO", "3BET_DEFENCE_IP", "BB_DEFENCE_vs_CO", "SB_RFI"
+    外部レンジファイルで上書きされていればそちらを、なければ組み込みのレンジを返す。
+    知らないレンジ名は KeyError。
     """
-    all_combos = enumerate_all_combos()
-    result = set()
+    range_name = _RANGE_ALIASES.get(range_name, range_name)
+    if range_name not in RANGE_NAMES:
+        raise KeyError(f"unknown range name: {range_name!r}")
+    override = _override_source().get(range_name)
+    if override is not None:
+        return override
+    return _builtin_range_combos(range_name)
+
+
+@lru_cache(maxsize=len(RANGE_NAMES))
+def _builtin_range_combos(range_name: str) -> ComboRange:
+    """組み込みレンジ。レンジ名ごとに初回だけコンパイルし、以降はプロセス内でキャッシュを返す"""
+    return _builtin_hand_range(range_name).combos()
+
+
+def with_derived_ranges(overrides: Mapping[str, HandRange]) -> Dict[str, HandRange]:
+    """上書きレンジに、上書きされた元レンジから作り直した派生レンジ（DERIVED_FROM）を足したもの"""
+    resolved = dict(overrides)
+    for name, source in DERIVED_FROM.items():
+        if name not in overrides and source in overrides:
+            resolved[name] = _derived_range(name, overrides[source])
+    return resolved
 
-    # オープンレンジ
+
+def set_override_source(source: Callable[[], Mapping[str, ComboRange]]) -> None:
+    """上書きレンジの取得元を登録する（core.range_store が起動時に1回）"""
+    global _override_source
+    _override_source = source
+
+
+def _builtin_hand_range(range_name: str) -> HandRange:
+    """レンジ名 → 組み込みレンジ（ranges_*.py のコンパイル済みレンジ）"""
     if range_name.startswith("OPEN_"):
-        pos_str = range_name.replace("OPEN_", "")
-        if pos_str == "UTG":
-            pos = Position.UTG
-        elif pos_str in ("UTG1", "UTG+1"):
-            pos = Position.UTG1
-        elif pos_str in ("UTG2", "UTG+2"):
-            pos = Position.UTG2
-        elif pos_str == "LJ":
-            pos = Position.LJ
-        elif pos_str == "HJ":
-            pos = Position.HJ
-        elif pos_str == "CO":
-            pos = Position.CO
-        elif pos_str == "BTN":
-            pos = Position.BTN
-        else:
-            return result
-
-        for combo in all_combos:
-            hi, lo, suited = combo_to_hand_type(combo[0], combo[1])
-            if in_open_range(pos, hi, lo, suited):
-                result.add(combo)
-
-    # 3bet defence IP（自分がIP、相手がOOPから3bet）
-    elif range_name == "3BET_DEFENCE_IP":
-        for combo in all_combos:
-            hi, lo, suited = combo_to_hand_type(combo[0], combo[1])
-            # IPの時はUTG+1/2レンジ全体をdefend
-            if in_utg12_open_range(hi, lo, suited):
-                result.add(combo)
-
-    # 3bet defence OOP（自分がOOP、相手がIPから3bet）
-    elif range_name == "3BET_DEFENCE_OOP":
-        for combo in all_combos:
-            hi, lo, suited = combo_to_hand_type(combo[0], combo[1])
-            # OOPの時はタイトに: UTG+1/2レンジ内でさらにdefend_vs_ip_3betを満たすもの
-            if is_in_utg12_defence_core(hi, lo, suited) and defend_vs_ip_3bet(hi, lo, suited):
-                result.add(combo)
-
-    # BB defence（ポジション別）
-    elif range_name.startswith("BB_DEFENCE_vs_"):
-        villain_str = range_name.replace("BB_DEFENCE_vs_", "")
-        villain_pos = None
-        if villain_str == "UTG":
-            villain_pos = Position.UTG
-        elif villain_str in ("UTG1", "UTG2"):
-            villain_pos = Position.UTG1
-        elif villain_str in ("LJ", "HJ"):
-            villain_pos = Position.LJ
-        elif villain_str == "CO":
-            villain_pos = Position.CO
-        elif villain_str == "BTN":
-            villain_pos = Position.BTN
-
-        if villain_pos:
-            for combo in all_combos:
-                hi, lo, suited = combo_to_hand_type(combo[0], combo[1])
-                if bb_defence_vs_open(villain_pos, hi, lo, suited):
-                    result.add(combo)
-
-    # SB first-in（RFIのみ、limpは除く）
-    elif range_name == "SB_RFI":
-        for combo in all_combos:
-            hi, lo, suited = combo_to_hand_type(combo[0], combo[1])
-            if sb_first_in_action(hi, lo, suited) == "raise":
-                result.add(combo)
-
-    return result
+        return open_range(Position[range_name[len("OPEN_"):]]) or HandRange()
+    if range_name.startswith("BB_DEFENCE_vs_"):
+        return bb_defence_range(Position[range_name[len("BB_DEFENCE_vs_"):]]) or HandRange()
+    if range_name in DERIVED_FROM:
+        return _derived_range(range_name, _builtin_hand_range(DERIVED_FROM[range_name]))
+    raise KeyError(range_name)
+
+
+def _derived_range(range_name: str, source: HandRange) -> HandRange:
+    """派生レンジ（DERIVED_FROM）を元のレンジから作る"""
+    if range_name == "3BET_DEFENCE_IP":
+        # IPの時はUTG+1/2レンジ全体をdefend
+        return source
+    if range_name == "3BET_DEFENCE_OOP":
+        # OOPの時はタイトに: UTG+1/2レンジ内でさらにdefend_vs_ip_3betを満たすもの
+        return HandRange(source.bits & DEFEND_VS_IP_3BET.bits)
+    # SB first-in（RFIのみ、limpは除く）: BTNオープンレンジ
+    return source
+
+
+# MDFスポットでベットしてくる相手のレンジ（シングルレイズポット想定: オープナー vs BBディフェンス）
+# 3betポット・SB vs BB は相手側のコンボレンジが無いので対象外
+BETTOR_RANGE = {
+    "OPEN_UTG": "BB_DEFENCE_vs_UTG",
+    "OPEN_UTG1": "BB_DEFENCE_vs_UTG1",
+    "OPEN_UTG2": "BB_DEFENCE_vs_UTG2",
+    "OPEN_LJ": "BB_DEFENCE_vs_LJ",
+    "OPEN_HJ": "BB_DEFENCE_vs_HJ",
+    "OPEN_CO": "BB_DEFENCE_vs_CO",
+    "OPEN_BTN": "BB_DEFENCE_vs_BTN",
+    "BB_DEFENCE_vs_UTG": "OPEN_UTG",
+    "BB_DEFENCE_vs_UTG1": "OPEN_UTG1",
+    "BB_DEFENCE_vs_UTG2": "OPEN_UTG2",
+    "BB_DEFENCE_vs_LJ": "OPEN_LJ",
+    "BB_DEFENCE_vs_HJ": "OPEN_HJ",
+    "BB_DEFENCE_vs_CO": "OPEN_CO",
+    "BB_DEFENCE_vs_BTN": "OPEN_BTN",
+}
@@ -0,0 +1,120 @@
+# core/range_dsl.py
+"""
+レンジ表記（例: "22+, A2s+, KTo+, 76s-54s"）を 169ハンドクラスのビットセットにコンパイルする。
+
+対応する表記（カンマ / 空白区切り）:
+  TT        ペア1つ          TT+     TT〜AA        99-66   99〜66
+  AKs/AKo   suited/offsuit   AK      suited + offsuit
+  A2s+      上のランクを固定して下のランクを上げる（A2s〜AKs）
+  KTo-K7o   上のランク固定で下のランクの範囲
+  76s-54s   ランク差を固定して両方ずらす（コネクター・ギャッパー）
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, List, Tuple
+from core.ranks import STR_TO_RANK
+from core.utils_hand import HAND_TYPES, NUM_HAND_TYPES, hand_type_index, hand_label
+from core.cards import HAND_TYPE_COMBO_BITS, ComboRange
+
+
+@dataclass(frozen=True)
+class HandRange:
+    """
+    169bitのハンドクラス集合。bit k が立っていれば hand_type_index k を含む。
+    """
+    bits: int = 0
+
+    def __contains__(self, hand_type: int) -> bool:
+        return (self.bits >> hand_type) & 1 == 1
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __iter__(self) -> Iterator[int]:
+        for k in range(NUM_HAND_TYPES):
+            if (self.bits >> k) & 1:
+                yield k
+
+    def __or__(self, other: "HandRange") -> "HandRange":
+        return HandRange(self.bits | other.bits)
+
+    def contains(self, hi: int, lo: int, suited: bool) -> bool:
+        return (self.bits >> hand_type_index(hi, lo, suited)) & 1 == 1
+
+    def grid(self) -> Tuple[bool, ...]:
+        """hand_type_index → 含むかどうか（169要素）"""
+        return tuple((self.bits >> k) & 1 == 1 for k in range(NUM_HAND_TYPES))
+
+    def combos(self) -> ComboRange:
+        """1326コンボのビットセットに展開する"""
+        bits = 0
+        for k in self:
+            bits |= HAND_TYPE_COMBO_BITS[k]
+        return ComboRange(bits)
+
+
+@lru_cache(maxsize=None)
+def compile_range(text: str) -> HandRange:
+    """レンジ表記をコンパイルする。解釈できない表記は ValueError"""
+    bits = 0
+    for token in text.replace(",", " ").split():
+        for hi, lo, suited in _expand_token(token):
+            bits |= 1 << hand_type_index(hi, lo, suited)
+    return HandRange(bits)
+
+
+def _parse_hand(token: str, original: str) -> Tuple[int, int, str]:
+    """'AKs' → (14, 13, 's')。suited/offsuit 指定なしは ''"""
+    if len(token) not in (2, 3) or token[0] not in STR_TO_RANK or token[1] not in STR_TO_RANK:
+        raise ValueError(f"invalid hand in range: {original!r}")
+    r1 = STR_TO_RANK[token[0]]
+    r2 = STR_TO_RANK[token[1]]
+    kind = token[2] if len(token) == 3 else ""
+    if kind not in ("", "s", "o") or (r1 == r2 and kind):
+        raise ValueError(f"invalid hand in range: {original!r}")
+    return max(r1, r2), min(r1, r2), kind
+
+
+def _with_kind(hi: int, lo: int, kind: str) -> List[Tuple[int, int, bool]]:
+    if hi == lo:
+        return [(hi, lo, False)]
+    if kind == "s":
+        return [(hi, lo, True)]
+    if kind == "o":
+        return [(hi, lo, False)]
+    return [(hi, lo, True), (hi, lo, False)]
+
+
+def _expand_token(token: str) -> List[Tuple[int, int, bool]]:
+    """1つの表記を (hi, lo, suited) の一覧に展開する"""
+    if token.endswith("+"):
+        hi, lo, kind = _parse_hand(token[:-1], token)
+        if hi == lo:
+            return [h for r in range(lo, 15) for h in _with_kind(r, r, kind)]
+        return [h for r in range(lo, hi) for h in _with_kind(hi, r, kind)]
+
+    if "-" in token:
+        left, right = token.split("-", 1)
+        hi1, lo1, kind1 = _parse_hand(left, token)
+        hi2, lo2, kind2 = _parse_hand(right, token)
+        if kind1 != kind2:
+            raise ValueError(f"mismatched suitedness in range: {token!r}")
+        if hi1 == lo1 and hi2 == lo2:
+            low, high = sorted((lo1, lo2))
+            return [h for r in range(low, high + 1) for h in _with_kind(r, r, kind1)]
+        if hi1 == hi2 and hi1 != lo1 and hi2 != lo2:
+            low, high = sorted((lo1, lo2))
+            return [h for r in range(low, high + 1) for h in _with_kind(hi1, r, kind1)]
+        if hi1 - lo1 == hi2 - lo2 and hi1 != lo1:
+            gap = hi1 - lo1
+            low, high = sorted((lo1, lo2))
+            return [h for r in range(low, high + 1) for h in _with_kind(r + gap, r, kind1)]
+        raise ValueError(f"invalid span in range: {token!r}")
+
+    hi, lo, kind = _parse_hand(token, token)
+    return _with_kind(hi, lo, kind)
+
+
+def format_range(hand_range: HandRange) -> List[str]:
+    """ハンドクラスのラベル一覧（グリッド順）"""
+    return [hand_label(*HAND_TYPES[k]) for k in hand_range]
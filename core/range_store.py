@@ -0,0 +1,166 @@
+# core/range_store.py
+"""
+外部レンジファイル（JSON / YAML）の読み込みとホットリロード。
+
+ファイル形式（レンジ名 → レンジ表記、core.range_dsl）:
+  {"ranges": {"OPEN_UTG": "77+, ATs+, KQs, AQo+", "BB_DEFENCE_vs_BTN": "22+, A2s+, ..."}}
+
+ファイルにあるレンジだけが組み込みのレンジ（ranges_*.py）を上書きする。
+  - get_range_combos（MDF）: 全レンジ名
+  - 判定表（core.decision_tables）: OPEN_* / BB_DEFENCE_vs_* / 3BET_DEFENCE_IP / 3BET_DEFENCE_OOP / SB_RFI（SB first-in の RAISE）
+    オープンレンジから作る表（パワーナンバー・3bet）も上書き後の OPEN_* で作る
+  - ファイルに無い派生レンジ（SB_RFI ← OPEN_BTN、3BET_DEFENCE_* ← OPEN_UTG1）は、元のレンジが上書きされていれば
+    そこから作り直す（core.range_combos.DERIVED_FROM）
+
+パスは環境変数 POKER_RANGE_FILE。watcher が mtime を見て変更を検知し、
+コンパイル済みの新しい RangeSet を参照の付け替え1回で差し替える（処理中のリクエストは古い版を使い切る）。
+差し替えのたびに version が増え、登録されたリスナー（MDFキャッシュの破棄など）が呼ばれる。
+YAML は PyYAML が入っている場合のみ対応。
+"""
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from core.range_dsl import HandRange, compile_range
+from core.range_combos import RANGE_NAMES, ComboRange, set_override_source, with_derived_ranges
+from core.decision_tables import DECISION_TABLES, DecisionTables, build_decision_tables
+
+try:
+    import yaml
+except ImportError:  # YAMLはオプション
+    yaml = None
+
+
+logger = logging.getLogger(__name__)
+
+RANGE_FILE = os.environ.get("POKER_RANGE_FILE")
+RANGE_RELOAD_INTERVAL = float(os.environ.get("POKER_RANGE_RELOAD_INTERVAL", "2.0"))
+
+
+@dataclass(frozen=True)
+class RangeSet:
+    version: int
+    source: Optional[str] = None
+    ranges: Dict[str, HandRange] = field(default_factory=dict)
+    combos: Dict[str, ComboRange] = field(default_factory=dict)  # ranges を展開したもの（get_range_combos 用）
+    tables: DecisionTables = DECISION_TABLES
+
+
+_current = RangeSet(version=0)
+_swap_lock = threading.Lock()
+_listeners: List[Callable[[RangeSet], None]] = []
+
+
+# get_range_combos（core.range_combos）も現在の RangeSet から上書きレンジを引く
+set_override_source(lambda: _current.combos)
+
+
+def current_ranges() -> RangeSet:
+    """現在のレンジ一式（1リクエストの間は同じ参照を使い続ける）"""
+    return _current
+
+
+def decision_tables() -> DecisionTables:
+    """現在の判定表"""
+    return _current.tables
+
+
+def add_reload_listener(listener: Callable[[RangeSet], None]) -> None:
+    """レンジ差し替え後に呼ばれる関数を登録する（キャッシュ破棄など）"""
+    _listeners.append(listener)
+
+
+def parse_range_file(path: str) -> Dict[str, HandRange]:
+    """レンジファイルを読み込んでコンパイルする。形式・レンジ名・表記が不正なら ValueError"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith((".yaml", ".yml")):
+        if yaml is None:
+            raise ValueError(f"PyYAML is required to load {path}")
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"{path}: {e}") from e
+    else:
+        data = json.loads(text)
+
+    if not isinstance(data, dict) or not isinstance(data.get("ranges"), dict):
+        raise ValueError(f"{path}: expected a mapping with a 'ranges' key")
+    ranges = {}
+    for name, notation in data["ranges"].items():
+        if name not in RANGE_NAMES:
+            raise ValueError(f"{path}: unknown range name {name!r}")
+        if isinstance(notation, list):
+            notation = ", ".join(notation)
+        ranges[name] = compile_range(str(notation))
+    return ranges
+
+
+def load_ranges(path: str) -> RangeSet:
+    """ファイルを読み込み、判定表まで作ってから差し替える"""
+    global _current
+    # 元のレンジだけ上書きされた派生レンジ（SB_RFI, 3BET_DEFENCE_*）も作り直しておく
+    ranges = with_derived_ranges(parse_range_file(path))
+    tables = build_decision_tables(ranges)
+    combos = {name: r.combos() for name, r in ranges.items()}
+    with _swap_lock:
+        # 判定表・コンボを1つの RangeSet にまとめて参照1回で差し替える
+        new = RangeSet(version=_current.version + 1, source=path, ranges=ranges, combos=combos, tables=tables)
+        _current = new
+    for listener in _listeners:
+        listener(new)
+    return new
+
+
+class RangeFileWatcher:
+    """レンジファイルの mtime をポーリングし、変わったら読み込み直すスレッド"""
+
+    def __init__(self, path: str, interval: float = RANGE_RELOAD_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._mtime: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="range-file-watcher", daemon=True)
+
+    def start(self) -> None:
+        self.check()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def check(self) -> bool:
+        """変更があれば読み込む。読み込みに失敗したら古い版のまま"""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        try:
+            ranges = load_ranges(self.path)
+        except (OSError, ValueError) as e:
+            logger.warning("range file not loaded, keeping version %d: %s", _current.version, e)
+            return False
+        logger.info("loaded range file %s (version %d)", self.path, ranges.version)
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+
+_watcher: Optional[RangeFileWatcher] = None
+
+
+def start_range_watcher(path: Optional[str] = RANGE_FILE) -> Optional[RangeFileWatcher]:
+    """起動時に呼ぶ。パスが無ければ組み込みレンジのまま何もしない"""
+    global _watcher
+    if not path or _watcher is not None:
+        return _watcher
+    _watcher = RangeFileWatcher(path)
+    _watcher.start()
+    return _watcher
@@ -1,9 +1,8 @@
 # core/ranges_3bet.py
-from typing import List
+from typing import Callable, List, Optional
 from core.enums import Position, POSITIONS
-from core.utils_hand import is_pocket
-from core.ranges_open import in_open_range
-from core.ranks import RANK_TO_STR
+from core.ranges_open import open_range
+from core.range_dsl import HandRange, compile_range
 
 
 def hero_is_blind(hero_pos: Position) -> bool:
@@ -19,78 +18,53 @@ def is_Ax(hi: int, lo: int) -> bool:
     return 14 in (hi, lo) and hi != lo
 
 
-def hand_matches(hi: int, lo: int, suited: bool, pattern: str) -> bool:
-    """
-    パターン文字列（例: 'QQ+', 'AKo', 'AKs', 'A5s' など）とマッチするかを簡易判定。
-    """
-    # ポケット QQ+ など
-    if pattern.endswith("+") and len(pattern) == 3 and pattern[0] == pattern[1]:
-        base_rank_char = pattern[0]
-        base_rank = [k for k, v in RANK_TO_STR.items() if v == base_rank_char][0]
-        if is_pocket(hi, lo) and hi >= base_rank:
-            return True
-        return False
-
-    # AKo / AKs / A5s など
-    if len(pattern) == 3:
-        r1, r2, s = pattern[0], pattern[1], pattern[2]
-        rank1 = [k for k, v in RANK_TO_STR.items() if v == r1][0]
-        rank2 = [k for k, v in RANK_TO_STR.items() if v == r2][0]
-
-        # ペアではないこと前提の2枚
-        if hi == rank1 and lo == rank2:
-            if s == "s" and suited:
-                return True
-            if s == "o" and not suited:
-                return True
-        return False
-
-    return False
+# 3betスポットのレンジ（core.range_dsl でモジュール読み込み時に1回だけコンパイル）
+# ブラインド以外では必ず3bet
+ALWAYS_3BET = compile_range("QQ+, AKs, AKo")
+# オープンが UTG / UTG+1 / UTG+2 のとき
+VS_EARLY_3BET = compile_range("QQ+, AKo, AQs")
+VS_EARLY_CALL = compile_range("AJs, 99-88")
+VS_EARLY_3BET_OR_CALL = compile_range("JJ-TT, KQs")
+VS_EARLY_3BET_OR_FOLD = compile_range("A5s")
 
 
 def three_bet_allowed_actions(
-    hero_pos: Position, villain_pos: Position, hi: int, lo: int, suited: bool
+    hero_pos: Position,
+    villain_pos: Position,
+    hi: int,
+    lo: int,
+    suited: bool,
+    open_ranges: Callable[[Position], Optional[HandRange]] = open_range,
 ) -> List[str]:
     """
     3betスポットで自分ルール上「許容されるアクション」のリストを返す。
     ['3bet'], ['call'], ['3bet', 'call'], ['3bet', 'fold'] など。
+    open_ranges はポジション → オープンレンジ（外部レンジファイルで上書きした表を作る時に差し替える）。
     """
     # デフォルトは「foldのみ許容」
     actions = {"fold"}
 
     # ブラインド以外では QQ+, AKo, AKs は必ず3bet
     if not hero_is_blind(hero_pos):
-        if (
-            hand_matches(hi, lo, suited, "QQ+")
-            or hand_matches(hi, lo, suited, "AKo")
-            or hand_matches(hi, lo, suited, "AKs")
-        ):
+        if ALWAYS_3BET.contains(hi, lo, suited):
             return ["3bet"]
 
     # オープンが UTG / UTG+1 / UTG+2 のときの特別ルール
     if villain_pos in (Position.UTG, Position.UTG1, Position.UTG2):
         # 必ず3bet: AKo, QQ+, AQs+
-        if (
-            hand_matches(hi, lo, suited, "AKo")
-            or hand_matches(hi, lo, suited, "QQ+")
-            or hand_matches(hi, lo, suited, "AQs")
-        ):
+        if VS_EARLY_3BET.contains(hi, lo, suited):
             return ["3bet"]
 
         # 必ずcold call: AJs, 88, 99
-        if hand_matches(hi, lo, suited, "AJs"):
-            return ["call"]
-        if is_pocket(hi, lo) and hi in (8, 9):
+        if VS_EARLY_CALL.contains(hi, lo, suited):
             return ["call"]
 
         # call or 3bet: TT, JJ, KQs
-        if is_pocket(hi, lo) and hi in (10, 11):
-            actions = {"3bet", "call"}
-        if hand_matches(hi, lo, suited, "KQs"):
+        if VS_EARLY_3BET_OR_CALL.contains(hi, lo, suited):
             actions = {"3bet", "call"}
 
         # 3bet or fold: A5s
-        if hand_matches(hi, lo, suited, "A5s"):
+        if VS_EARLY_3BET_OR_FOLD.contains(hi, lo, suited):
             actions = {"3bet", "fold"}
 
         return sorted(actions)
@@ -107,7 +81,8 @@ def three_bet_allowed_actions(
     else:
         upper_pos = Position.UTG
 
-    if in_open_range(upper_pos, hi, lo, suited):
+    upper_range = open_ranges(upper_pos)
+    if upper_range is not None and upper_range.contains(hi, lo, suited):
         actions = {"3bet", "call"}
     else:
         actions = {"fold"}
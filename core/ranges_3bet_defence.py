@@ -1,12 +1,19 @@
 # core/ranges_3bet_defence.py
 from core.enums import Position
-from core.utils_hand import is_pocket
-from core.ranges_open import in_utg12_open_range
+from core.range_dsl import compile_range
+from core.ranges_open import UTG12_OPEN
+
+
+# 3betディフェンスのレンジ（core.range_dsl）
+# 自分がIP（相手OOPから3bet）: UTG+1/2オープンレンジ内は全部defend
+DEFENCE_VS_OOP_3BET = UTG12_OPEN
+# 自分がOOP（相手がIPから3bet）: ポケット77+, AJs+, A5s, AQo+
+DEFEND_VS_IP_3BET = compile_range("77+, AJs+, A5s, AQo+")
 
 
 def is_in_utg12_defence_core(hi: int, lo: int, suited: bool) -> bool:
     """"UTG+1/2オープンレンジに入るか"を再利用（ベースディフェンスレンジ）"""
-    return in_utg12_open_range(hi, lo, suited)
+    return UTG12_OPEN.contains(hi, lo, suited)
 
 
 def defend_vs_ip_3bet(hi: int, lo: int, suited: bool) -> bool:
@@ -16,24 +23,7 @@ def defend_vs_ip_3bet(hi: int, lo: int, suited: bool) -> bool:
     - スーテッドAXは AJs+, A5s
     - ポケットは 77+
     """
-    # ポケット
-    if is_pocket(hi, lo):
-        return hi >= 7
-
-    if suited:
-        # AXs
-        if hi == 14:
-            # AJs+ or A5s
-            if lo >= 11:
-                return True
-            if lo == 5:
-                return True
-        return False
-    else:
-        # オフスート AQo+
-        if hi == 14 and lo >= 12:  # AQ, AK
-            return True
-        return False
+    return DEFEND_VS_IP_3BET.contains(hi, lo, suited)
 
 
 def three_bet_defence_action(
@@ -1,108 +1,36 @@
 # core/ranges_bb_defence.py
+from typing import Optional
 from core.enums import Position
-from core.utils_hand import is_pocket
+from core.range_dsl import HandRange, compile_range
 
 
-def bb_defence_vs_open(villain_pos: Position, hi: int, lo: int, suited: bool) -> bool:
-    """
-    BBでVillainのオープンに対して defend(call) するか / fold するか。
-    """
-    # vs UTG
-    if villain_pos == Position.UTG:
-        # ポケット：66+
-        if is_pocket(hi, lo):
-            return hi >= 6
+# BB defence のレンジ（core.range_dsl）
+# vs UTG: ポケット66+ / O: AQo+ / S: ATs+, 両方11以上, コネ（下7以上・gap1以下）
+VS_UTG = compile_range("66+, ATs+, KJs+, QJs, JTs, T9s, 98s, 87s, AQo+")
+# vs UTG+1 / UTG+2: ポケット55+ / O: AJo+, 両方12以上 / S: Axs全部, 両方10以上, コネ（下6以上・gap1以下）
+VS_UTG12 = compile_range("55+, A2s+, KTs+, QTs+, JTs, T9s, 98s, 87s, 76s, AJo+, KQo")
+# vs LJ / HJ: ポケット全部 / O: ATo+, 両方11以上 / S: Axs全部, 両方8以上, コネ/ギャッパ（下4以上・gap2以下）
+VS_HJLJ = compile_range("22+, A2s+, K8s+, Q8s+, J8s+, T8s+, 98s, 87s-54s, 97s-64s, ATo+, KJo+, QJo")
+# vs CO / BTN: ポケット全部 / O: A8o+, 両方10以上 / S: Axs全部, 両方7以上, コネ/ギャッパ（下4以上・gap2以下）
+VS_LATE = compile_range("22+, A2s+, K7s+, Q7s+, J7s+, T7s+, 97s+, 87s, 76s-54s, 86s-64s, A8o+, KTo+, QTo+, JTo")
 
-        if not suited:
-            # Offsuit: AQo+ (Axo where x≥12)
-            if hi == 14 and lo >= 12:
-                return True
-            return False
-        else:
-            # Suited Axs: ATs+
-            if hi == 14 and lo >= 10:
-                return True
-            # Suited 両方≥11
-            if hi >= 11 and lo >= 11:
-                return True
-            # Suited コネ: 下≥7 & gap≤1
-            if lo >= 7 and (hi - lo) <= 1:
-                return True
-            return False
 
-    # vs UTG+1 / UTG+2
+def bb_defence_range(villain_pos: Position) -> Optional[HandRange]:
+    """Villainのポジション → BBのディフェンスレンジ（SB / BB は None）"""
+    if villain_pos == Position.UTG:
+        return VS_UTG
     if villain_pos in (Position.UTG1, Position.UTG2):
-        # ポケット：55+
-        if is_pocket(hi, lo):
-            return hi >= 5
-
-        if not suited:
-            # Offsuit: AJo+ + 両方≥12
-            if hi == 14 and lo >= 11:  # AJo+
-                return True
-            if hi >= 12 and lo >= 12:  # QQ+ は pocket でカバー済みなので実質 KQ, KJ, QJ など
-                return True
-            return False
-        else:
-            # Suited Axs: 全部
-            if hi == 14:
-                return True
-            # Suited 両方≥10
-            if hi >= 10 and lo >= 10:
-                return True
-            # Suited コネ: 下≥6 & gap≤1
-            if lo >= 6 and (hi - lo) <= 1:
-                return True
-            return False
-
-    # vs LJ / HJ
+        return VS_UTG12
     if villain_pos in (Position.LJ, Position.HJ):
-        # ポケット：22+ (全部)
-        if is_pocket(hi, lo):
-            return True
-
-        if not suited:
-            # Offsuit: ATo+ + 両方≥11
-            if hi == 14 and lo >= 10:
-                return True
-            if hi >= 11 and lo >= 11:
-                return True
-            return False
-        else:
-            # Suited Axs: 全部
-            if hi == 14:
-                return True
-            # Suited 両方≥8
-            if hi >= 8 and lo >= 8:
-                return True
-            # Suited コネ/ギャッパ: 下≥4 & gap≤2
-            if lo >= 4 and (hi - lo) <= 2:
-                return True
-            return False
-
-    # vs CO / BTN
+        return VS_HJLJ
     if villain_pos in (Position.CO, Position.BTN):
-        # ポケット：22+ (全部)
-        if is_pocket(hi, lo):
-            return True
+        return VS_LATE
+    return None
 
-        if not suited:
-            # Offsuit: A8o+ + 両方≥10
-            if hi == 14 and lo >= 8:
-                return True
-            if hi >= 10 and lo >= 10:
-                return True
-            return False
-        else:
-            # Suited Axs: 全部
-            if hi == 14:
-                return True
-            # Suited 両方≥7
-            if hi >= 7 and lo >= 7:
-                return True
-            # Suited コネ/ギャッパ: 下≥4 & gap≤2
-            if lo >= 4 and (hi - lo) <= 2:
-                return True
-            return False
 
-    return False
+def bb_defence_vs_open(villain_pos: Position, hi: int, lo: int, suited: bool) -> bool:
+    """
+    BBでVillainのオープンに対して defend(call) するか / fold するか。
+    """
+    hand_range = bb_defence_range(villain_pos)
+    return hand_range is not None and hand_range.contains(hi, lo, suited)
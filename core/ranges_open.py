@@ -1,128 +1,67 @@
 # core/ranges_open.py
+from typing import Optional
 from core.enums import Position
-from core.utils_hand import is_pocket, is_broadway
+from core.range_dsl import HandRange, compile_range
+
+
+# オープンレンジ（core.range_dsl でモジュール読み込み時に1回だけコンパイル）
+# UTG: ポケット88+ / O: 足して26以上 / S: 足して24以上
+UTG_OPEN = compile_range("88+, ATs+, KJs+, AQo+")
+# UTG+1 / UTG+2: ポケット55+ / O: 足して25以上 / S: BWs, A9s以上, A4s, A5s
+UTG12_OPEN = compile_range("55+, A9s+, A5s-A4s, KTs+, QTs+, JTs, AJo+, KQo")
+# LJ / HJ: ポケット全部 / O: 足して23以上 / S: AXs, KXs, 両方8以上
+HJLJ_OPEN = compile_range("22+, A2s+, K2s+, Q8s+, J8s+, T8s+, 98s, A9o+, KTo+, QJo")
+# CO: ポケット全部 / O: 両方9以上, A8o+ / S: A〜QXs, 両方7以上, コネ/ギャッパ 45s以上
+CO_OPEN = compile_range(
+    "22+, A2s+, K2s+, Q2s+, J7s+, T7s+, 97s+, 87s, 76s-54s, 86s-64s, 96s-74s, A8o+, K9o+, Q9o+, J9o+, T9o"
+)
+# BTN: ポケット全部 / O: 両方8以上, Axo全部 / S: A〜TXs, 両方5以上, コネ/ギャッパ 45s, 46s以上
+BTN_OPEN = compile_range(
+    "22+, A2s+, K2s+, Q2s+, J2s+, T2s+, 95s+, 85s+, 75s+, 65s, 64s, 54s, A2o+, K8o+, Q8o+, J8o+, T8o+, 98o"
+)
+
+
+def open_range(pos: Position) -> Optional[HandRange]:
+    """ポジション → オープンレンジ（SB / BB は None）"""
+    if pos == Position.UTG:
+        return UTG_OPEN
+    if pos in (Position.UTG1, Position.UTG2):
+        return UTG12_OPEN
+    if pos in (Position.LJ, Position.HJ):
+        return HJLJ_OPEN
+    if pos == Position.CO:
+        return CO_OPEN
+    if pos == Position.BTN:
+        return BTN_OPEN
+    return None
 
 
 def in_utg_open_range(hi: int, lo: int, suited: bool) -> bool:
-    # ポケット
-    if is_pocket(hi, lo):
-        return hi >= 8
-    total = hi + lo
-    if not suited:
-        # O: 足して26以上
-        return total >= 26
-    else:
-        # S: 強い系 足して24以上
-        return total >= 24
+    return UTG_OPEN.contains(hi, lo, suited)
 
 
 def in_utg12_open_range(hi: int, lo: int, suited: bool) -> bool:
     """
     UTG+1 / UTG+2 共通のオープンレンジ
     """
-    # ポケット
-    if is_pocket(hi, lo):
-        return hi >= 5
-    total = hi + lo
-    if not suited:
-        # O: 足して25以上
-        return total >= 25
-    else:
-        # S: 強い系 BWs, A9s以上, A4s, A5s
-        if hi == 14:
-            # A9s+
-            if lo >= 9:
-                return True
-            # A4s, A5s
-            if lo in (4, 5):
-                return True
-        # BWs（ブロードウェイスーテッド）
-        if is_broadway(hi) and is_broadway(lo):
-            return True
-        return False
+    return UTG12_OPEN.contains(hi, lo, suited)
 
 
 def in_hjlj_open_range(hi: int, lo: int, suited: bool) -> bool:
     """
     LJ / HJ 共通のオープンレンジ
     """
-    # ポケット：全部
-    if is_pocket(hi, lo):
-        return True
-
-    total = hi + lo
-    if not suited:
-        # O: 足して23以上
-        return total >= 23
-    else:
-        # S: 強い系 AXs, KXs
-        if hi in (14, 13):
-            return True
-        # S: 両方x以上 (x=8)
-        if hi >= 8 and lo >= 8:
-            return True
-        return False
+    return HJLJ_OPEN.contains(hi, lo, suited)
 
 
 def in_co_open_range(hi: int, lo: int, suited: bool) -> bool:
-    # ポケット：全部
-    if is_pocket(hi, lo):
-        return True
-
-    if not suited:
-        # O: 9以上, Ax(x≧8)
-        if hi >= 9 and lo >= 9:
-            return True
-        if hi == 14 and lo >= 8:
-            return True
-        return False
-    else:
-        # S: 強い系 A〜QXs
-        if hi in (14, 13, 12):
-            return True
-        # S: 両方x以上 (x=7)
-        if hi >= 7 and lo >= 7:
-            return True
-        # S: コネ/ギャッパ 45s以上
-        if lo >= 4 and (hi - lo) <= 3:
-            return True
-        return False
+    return CO_OPEN.contains(hi, lo, suited)
 
 
 def in_btn_open_range(hi: int, lo: int, suited: bool) -> bool:
-    # ポケット：全部
-    if is_pocket(hi, lo):
-        return True
-
-    if not suited:
-        # O: 両方x以上, Ax (x=8)
-        if hi >= 8 and lo >= 8:
-            return True
-        if hi == 14:
-            return True  # Axo全部
-        return False
-    else:
-        # S: 強い系 A〜TXs
-        if hi >= 10:
-            return True
-        # S: 両方x以上 (x=5)
-        if hi >= 5 and lo >= 5:
-            return True
-        # S: コネ/ギャッパ 45s, 46s以上
-        if lo >= 4 and (hi - lo) <= 2:
-            return True
-        return False
+    return BTN_OPEN.contains(hi, lo, suited)
 
 
 def in_open_range(pos: Position, hi: int, lo: int, suited: bool) -> bool:
-    if pos == Position.UTG:
-        return in_utg_open_range(hi, lo, suited)
-    elif pos in (Position.UTG1, Position.UTG2):
-        return in_utg12_open_range(hi, lo, suited)
-    elif pos in (Position.LJ, Position.HJ):
-        return in_hjlj_open_range(hi, lo, suited)
-    elif pos == Position.CO:
-        return in_co_open_range(hi, lo, suited)
-    elif pos == Position.BTN:
-        return in_btn_open_range(hi, lo, suited)
-    return False
+    hand_range = open_range(pos)
+    return hand_range is not None and hand_range.contains(hi, lo, suited)
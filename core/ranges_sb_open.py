@@ -1,18 +1,23 @@
 # core/ranges_sb_open.py
-from core.ranges_open import in_btn_open_range
+from core.range_dsl import HandRange
+from core.ranges_open import BTN_OPEN
 
 
-def sb_first_in_action(hi: int, lo: int, suited: bool) -> str:
+# SB first-in の RAISE レンジ（core.range_dsl）: BTNオープンレンジ
+SB_RAISE = BTN_OPEN
+
+
+def sb_first_in_action(hi: int, lo: int, suited: bool, raise_range: HandRange = SB_RAISE) -> str:
     """
     SB first-in（全員フォールド）での RAISE / LIMP / FOLD を返す。
     ルール：
-    1. BTNオープンレンジに入るなら RAISE
+    1. RAISEレンジ（組み込みはBTNオープンレンジ、外部レンジファイルの SB_RFI で上書き可）に入るなら RAISE
     2. それ以外でオフスートなら FOLD
-    3. それ以外（スーテッド）で下が3以下なら FOLD（ただしA3s/A2sはBTNレンジでRAISEなので除外済み）
+    3. それ以外（スーテッド）で下が3以下なら FOLD
     4. 上記以外の残りスーテッドは LIMP
     """
-    # 1. BTNオープンレンジに入るなら RAISE
-    if in_btn_open_range(hi, lo, suited):
+    # 1. RAISEレンジに入るなら RAISE
+    if raise_range.contains(hi, lo, suited):
         return "raise"
 
     # 2. オフスートは FOLD
@@ -16,3 +16,6 @@ RANK_TO_STR = {
     3: "3",
     2: "2",
 }
+
+# 文字列→数値（レンジ表記のパース用）
+STR_TO_RANK = {v: k for k, v in RANK_TO_STR.items()}
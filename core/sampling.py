@@ -0,0 +1,45 @@
+# core/sampling.py
+"""
+重み付きサンプリング（Walker / Vose のエイリアス法）。
+
+構築は O(n) で1回だけ、1回のサンプルは乱数2回の O(1)。
+問題生成のハンド抽選（コンボ数で重み付け、レンジ内からの抽選）に使う。
+"""
+import random
+from typing import Generic, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class AliasSampler(Generic[T]):
+    def __init__(self, items: Sequence[T], weights: Sequence[float]):
+        if len(items) != len(weights):
+            raise ValueError("items and weights must have the same length")
+        total = float(sum(weights))
+        if not items or total <= 0:
+            raise ValueError("AliasSampler needs at least one positive weight")
+
+        n = len(items)
+        self.items: List[T] = list(items)
+        self.prob: List[float] = [0.0] * n
+        self.alias: List[int] = list(range(n))
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            g = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = g
+            scaled[g] -= 1.0 - scaled[s]
+            (small if scaled[g] < 1.0 else large).append(g)
+        # 残りは誤差で 1.0 付近のものだけ
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def sample(self, rng: Optional[random.Random] = None) -> T:
+        """1つ抽選する（rng 省略時は random モジュールのグローバル乱数）"""
+        r = rng or random
+        i = int(r.random() * len(self.items))
+        return self.items[i] if r.random() < self.prob[i] else self.items[self.alias[i]]
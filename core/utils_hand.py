@@ -1,7 +1,8 @@
 # core/utils_hand.py
 import random
-from typing import Tuple
+from typing import Optional, Tuple
 from core.ranks import RANK_TO_STR
+from core.sampling import AliasSampler
 
 
 def hand_label(hi: int, lo: int, suited: bool) -> str:
@@ -12,15 +13,49 @@ def hand_label(hi: int, lo: int, suited: bool) -> str:
     return f"{RANK_TO_STR[hi]}{RANK_TO_STR[lo]}{s}"
 
 
-def random_hand() -> Tuple[int, int, bool]:
-    """ランダムなハンド（hi, lo, suited）を返す。"""
-    ranks = list(RANK_TO_STR.keys())
-    hi = random.choice(ranks)
-    lo = random.choice(ranks)
-    if lo > hi:
-        hi, lo = lo, hi
-    suited = (hi != lo) and (random.random() < 0.5)
-    return hi, lo, suited
+# 169ハンドクラス（13×13グリッド順：行=高いランク、suitedは対角より右上・offsuitは左下）
+NUM_HAND_TYPES = 169
+
+
+def hand_type_index(hi: int, lo: int, suited: bool) -> int:
+    """(hi, lo, suited) → 0..168（グリッドの行 * 13 + 列）"""
+    row = 14 - hi
+    col = 14 - lo
+    if suited:
+        return row * 13 + col
+    return col * 13 + row
+
+
+def _build_hand_types() -> Tuple[Tuple[int, int, bool], ...]:
+    types = [None] * NUM_HAND_TYPES
+    for hi in range(2, 15):
+        for lo in range(2, hi + 1):
+            types[hand_type_index(hi, lo, False)] = (hi, lo, False)
+            if hi != lo:
+                types[hand_type_index(hi, lo, True)] = (hi, lo, True)
+    return tuple(types)
+
+
+# hand_type_index → (hi, lo, suited)
+HAND_TYPES: Tuple[Tuple[int, int, bool], ...] = _build_hand_types()
+
+
+def hand_type_combos(hi: int, lo: int, suited: bool) -> int:
+    """ハンドクラスのコンボ数（ペア6 / suited4 / offsuit12）"""
+    if hi == lo:
+        return 6
+    return 4 if suited else 12
+
+
+# 全169クラスをコンボ数（ペア6 / suited4 / offsuit12）で重み付けしたサンプラー
+_HAND_SAMPLER: AliasSampler[Tuple[int, int, bool]] = AliasSampler(
+    HAND_TYPES, [hand_type_combos(*t) for t in HAND_TYPES]
+)
+
+
+def random_hand(rng: Optional[random.Random] = None) -> Tuple[int, int, bool]:
+    """ランダムなハンド（hi, lo, suited）を実際のコンボ頻度で返す。"""
+    return _HAND_SAMPLER.sample(rng)
 
 
 def is_pocket(hi: int, lo: int) -> bool:
@@ -0,0 +1 @@
+# equity package
@@ -0,0 +1,98 @@
+# equity/exact.py
+"""
+レンジ vs レンジのエクイティ（全列挙）。
+
+ランアウトごとに両レンジの生存コンボの強さを1回ずつ評価し、
+ヴィラン側をソートした強さ配列に対する二分探索で勝ち/引き分け数をまとめて数える。
+ヒーローのカードと被るヴィランのコンボ（カード除外）はカード別の一覧で差し引く。
+"""
+from bisect import bisect_left, bisect_right
+from itertools import combinations
+from math import comb
+from typing import Dict, List, Sequence, Tuple
+from core.enums import CardId
+from core.cards import CARD_BIT, COMBOS, COMBO_MASK, DECK, cards_mask
+from core.hand_rank import evaluate_cards
+from core.range_combos import ComboRange
+from equity.monte_carlo import EquityResult, live_combo_indices
+
+
+def count_runouts(board: Sequence[CardId], dead: Sequence[CardId] = ()) -> int:
+    """残りボードの組み合わせ数"""
+    known = cards_mask(board) | cards_mask(dead)
+    return comb(len(DECK) - known.bit_count(), 5 - len(board))
+
+
+def exact_work(hero: ComboRange, villain: ComboRange, board: Sequence[CardId], dead: Sequence[CardId] = ()) -> int:
+    """全列挙のコスト見積もり（ランアウト数 × 評価するコンボ数）"""
+    dead_mask = cards_mask(board) | cards_mask(dead)
+    n_combos = len(ComboRange(hero.bits | villain.bits).without(dead_mask))
+    return count_runouts(board, dead) * n_combos
+
+
+def exact_equity(
+    hero: ComboRange,
+    villain: ComboRange,
+    board: Sequence[CardId] = (),
+    dead: Sequence[CardId] = (),
+) -> EquityResult:
+    """ヒーローレンジ vs ヴィランレンジのエクイティを全ランアウト・全コンボ組で厳密に計算する"""
+    board = list(board)
+    dead_mask = cards_mask(board) | cards_mask(dead)
+    hero_indices = live_combo_indices(hero, dead_mask)
+    villain_indices = live_combo_indices(villain, dead_mask)
+    live_deck = [c for c in DECK if not dead_mask & CARD_BIT[c]]
+
+    won = 0.0
+    showdowns = 0
+    for runout in combinations(live_deck, 5 - len(board)):
+        runout_mask = cards_mask(runout)
+        full_board = board + list(runout)
+
+        # このランアウトで生存するコンボの強さ（両レンジで共有）
+        strengths: Dict[int, int] = {}
+        for i in hero_indices:
+            if not COMBO_MASK[i] & runout_mask:
+                strengths[i] = evaluate_cards(list(COMBOS[i]) + full_board)
+        villain_live: List[Tuple[int, int]] = []
+        for i in villain_indices:
+            if not COMBO_MASK[i] & runout_mask:
+                s = strengths.get(i)
+                if s is None:
+                    s = strengths[i] = evaluate_cards(list(COMBOS[i]) + full_board)
+                villain_live.append((i, s))
+        if not villain_live:
+            continue
+
+        villain_sorted = sorted(s for _, s in villain_live)
+        # カード → そのカードを含むヴィランコンボ (index, 強さ)
+        by_card: Dict[CardId, List[Tuple[int, int]]] = {}
+        for i, s in villain_live:
+            c1, c2 = COMBOS[i]
+            by_card.setdefault(c1, []).append((i, s))
+            by_card.setdefault(c2, []).append((i, s))
+
+        for h in hero_indices:
+            if COMBO_MASK[h] & runout_mask:
+                continue
+            s_h = strengths[h]
+            less = bisect_left(villain_sorted, s_h)
+            equal = bisect_right(villain_sorted, s_h) - less
+            total = len(villain_sorted)
+
+            # ヒーローのカードと被るヴィランコンボを差し引く（同一コンボは1回だけ）
+            c1, c2 = COMBOS[h]
+            conflicts = by_card.get(c1, []) + [x for x in by_card.get(c2, []) if x[0] != h]
+            for _, s in conflicts:
+                total -= 1
+                if s < s_h:
+                    less -= 1
+                elif s == s_h:
+                    equal -= 1
+
+            won += less + equal * 0.5
+            showdowns += total
+
+    if showdowns == 0:
+        return EquityResult(equity=0.0, std_error=0.0, samples=0, exact=True)
+    return EquityResult(equity=won / showdowns, std_error=0.0, samples=showdowns, exact=True)
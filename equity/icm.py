@@ -0,0 +1,110 @@
+# equity/icm.py
+"""
+ICM（Malmuth-Harville）による賞金期待値。
+
+順位 k の確率は「残っているプレイヤーのチップ比」で決まるので、
+上位に入ったプレイヤーの集合（bitmask）ごとに到達確率を1回だけ求めて使い回す。
+9人・全員インマネーでも 2^9 状態 × 9 で済む（順列 9! を列挙しない）。
+"""
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+
+ICM_CACHE_SIZE = 4096
+
+# パワーナンバー問題で使う想定（9人のファイナルテーブル、上位3人に配当）
+DEFAULT_PAYOUTS: Tuple[float, ...] = (0.50, 0.30, 0.20)
+
+
+def icm_equities(stacks: Sequence[float], payouts: Sequence[float]) -> List[float]:
+    """各プレイヤーの賞金期待値（payouts と同じ単位）。スタック0のプレイヤーは0"""
+    return list(_icm(tuple(float(s) for s in stacks), tuple(payouts)))
+
+
+def icm_equities_batch(stack_configs: Sequence[Sequence[float]], payouts: Sequence[float]) -> List[List[float]]:
+    """複数のスタック構成をまとめて計算する（同じ構成はキャッシュから返る）"""
+    payouts = tuple(payouts)
+    return [list(_icm(tuple(float(s) for s in stacks), payouts)) for stacks in stack_configs]
+
+
+@lru_cache(maxsize=ICM_CACHE_SIZE)
+def _icm(stacks: Tuple[float, ...], payouts: Tuple[float, ...]) -> Tuple[float, ...]:
+    n = len(stacks)
+    total = sum(stacks)
+    equities = [0.0] * n
+    if total <= 0:
+        return tuple(equities)
+
+    # 上位に入ったプレイヤー集合 → (到達確率, その集合のチップ合計)
+    layer: Dict[int, Tuple[float, float]] = {0: (1.0, 0.0)}
+    for payout in payouts[:n]:
+        next_layer: Dict[int, Tuple[float, float]] = {}
+        for placed, (prob, placed_chips) in layer.items():
+            remaining = total - placed_chips
+            if remaining <= 0:
+                continue
+            for i in range(n):
+                bit = 1 << i
+                if placed & bit or stacks[i] <= 0:
+                    continue
+                p = prob * stacks[i] / remaining
+                equities[i] += p * payout
+                key = placed | bit
+                if key in next_layer:
+                    next_layer[key] = (next_layer[key][0] + p, next_layer[key][1])
+                else:
+                    next_layer[key] = (p, placed_chips + stacks[i])
+        layer = next_layer
+    return tuple(equities)
+
+
+def called_shove(
+    hero_stack: float, caller_stack: float, hero_blind: float, caller_blind: float, pot: float
+) -> Tuple[float, float, float]:
+    """
+    hero のオールインに caller がコールしたときの (hero の追加額, caller の追加額, 決着時のポット)。
+    スタックはブラインドを出す前で、BBアンティはスタックの外（pot に入っているデッドマネー）とする。
+    pot はシャブ前にポットにあるチップ（ブラインド + アンティ）。
+    equity.push_fold の均衡計算もこの定義を使う。
+    """
+    cap = min(hero_stack, caller_stack)
+    risk = cap - hero_blind
+    call = cap - caller_blind
+    return risk, call, pot + risk + call
+
+
+def called_shove_thresholds(
+    stacks: Sequence[float],
+    blinds: Sequence[float],
+    payouts: Sequence[float],
+    hero: int,
+    caller: int,
+    pot: float,
+) -> Tuple[float, float]:
+    """
+    hero のオールインに caller がコールしたとき、フォールドと同じ価値になる勝率。
+    stacks・blinds・pot の定義は called_shove と同じ（blinds は各席が出したブラインド）。
+    フォールド時は pot を caller が取る前提。
+    Returns: (チップEVでの必要勝率, ICMでの必要勝率)
+    """
+    risk, call, called_pot = called_shove(stacks[hero], stacks[caller], blinds[hero], blinds[caller], pot)
+    behind = [s - b for s, b in zip(stacks, blinds)]
+
+    fold = list(behind)
+    fold[caller] += pot
+    win = list(behind)
+    win[hero] += called_pot - risk
+    win[caller] -= call
+    lose = list(behind)
+    lose[hero] -= risk
+    lose[caller] += called_pot - call
+
+    chip = _break_even(fold[hero], win[hero], lose[hero])
+    ev_fold, ev_win, ev_lose = (e[hero] for e in icm_equities_batch([fold, win, lose], payouts))
+    return chip, _break_even(ev_fold, ev_win, ev_lose)
+
+
+def _break_even(fold: float, win: float, lose: float) -> float:
+    if win <= lose:
+        return 1.0
+    return min(max((fold - lose) / (win - lose), 0.0), 1.0)
@@ -0,0 +1,206 @@
+# equity/monte_carlo.py
+"""
+レンジ vs レンジのエクイティ（モンテカルロ）。
+
+1試行 = ヒーローのコンボ・ヴィランのコンボ（カードが被らない組を一様に）＋ 残りボードを配って勝敗を見る。
+試行はバッチ単位で ProcessPoolExecutor に分散し、標準誤差が目標に届くか、
+試行数・時間の上限に達したら打ち切る。
+"""
+import math
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Set, Tuple
+from core.enums import CardId
+from core.cards import CARD_BIT, COMBOS, COMBO_MASK, DECK, cards_mask
+from core.hand_rank import evaluate_cards
+from core.range_combos import ComboRange
+
+
+# 1バッチあたりの試行数
+DEFAULT_BATCH_SIZE = 2000
+
+
+@dataclass(frozen=True)
+class EquityResult:
+    equity: float       # ヒーローのエクイティ（0..1、引き分けは0.5）
+    std_error: float    # 標準誤差（厳密計算なら 0）
+    samples: int        # 試行数（厳密計算なら評価したショーダウン数）
+    exact: bool = False
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    """
+    プロセスプールはワーカー数ごとに使い回す（複数スレッドから呼ばれてもよい）。
+    スレッドを持つプロセス（Webサーバー）から fork すると固まりうるので spawn で起動する。
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _executor_workers = workers
+        return _executor
+
+
+def simulate_batch(
+    hero_indices: Sequence[int],
+    villain_indices: Sequence[int],
+    board: Sequence[CardId],
+    dead_mask: int,
+    samples: int,
+    seed: int,
+) -> Tuple[float, float, int]:
+    """
+    1バッチ分の試行を行う（ワーカープロセスで実行される）。
+    Returns: (結果の合計, 結果の2乗の合計, 試行数)  結果は 勝ち=1 / 引き分け=0.5 / 負け=0
+    """
+    rng = random.Random(seed)
+    board = list(board)
+    need = 5 - len(board)
+    known = dead_mask | cards_mask(board)
+    live_deck = [c for c in DECK if not known & CARD_BIT[c]]
+    n_hero = len(hero_indices)
+    n_villain = len(villain_indices)
+    n_deck = len(live_deck)
+
+    total = 0.0
+    total_sq = 0.0
+    for _ in range(samples):
+        # ヒーロー・ヴィランのコンボ（被ったら両方引き直し = 被らない組で一様）
+        while True:
+            h = hero_indices[int(rng.random() * n_hero)]
+            v = villain_indices[int(rng.random() * n_villain)]
+            if not COMBO_MASK[h] & COMBO_MASK[v]:
+                break
+        used = COMBO_MASK[h] | COMBO_MASK[v]
+
+        # 残りボード
+        runout = []
+        while len(runout) < need:
+            c = live_deck[int(rng.random() * n_deck)]
+            if not used & CARD_BIT[c]:
+                used |= CARD_BIT[c]
+                runout.append(c)
+
+        full_board = board + runout
+        hero_strength = evaluate_cards(list(COMBOS[h]) + full_board)
+        villain_strength = evaluate_cards(list(COMBOS[v]) + full_board)
+        if hero_strength > villain_strength:
+            total += 1.0
+            total_sq += 1.0
+        elif hero_strength == villain_strength:
+            total += 0.5
+            total_sq += 0.25
+    return total, total_sq, samples
+
+
+def live_combo_indices(range_combos: ComboRange, dead_mask: int) -> List[int]:
+    """デッドカード（ボード等）と被らないコンボ"""
+    return list(range_combos.without(dead_mask))
+
+
+def _has_valid_pair(hero_indices: Sequence[int], villain_indices: Sequence[int]) -> bool:
+    villain_masks: Set[int] = {COMBO_MASK[v] for v in villain_indices}
+    return any(not COMBO_MASK[h] & m for h in hero_indices for m in villain_masks)
+
+
+def monte_carlo_equity(
+    hero: ComboRange,
+    villain: ComboRange,
+    board: Sequence[CardId] = (),
+    dead: Sequence[CardId] = (),
+    samples: int = 20000,
+    target_std_error: Optional[float] = None,
+    time_budget: Optional[float] = None,
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    seed: Optional[int] = None,
+) -> EquityResult:
+    """
+    ヒーローレンジ vs ヴィランレンジのエクイティをモンテカルロで推定する。
+
+    Args:
+        board: 既知のボード（0〜5枚）
+        dead: その他のデッドカード
+        samples: 試行数の上限
+        target_std_error: 標準誤差がこれ以下になったら打ち切る
+        time_budget: 秒数の上限（超えたら実行中のバッチを待たずに打ち切る）
+        workers: プロセス数（None = CPU数、1以下 = 同一プロセスで実行）
+    """
+    dead_mask = cards_mask(board) | cards_mask(dead)
+    hero_indices = live_combo_indices(hero, dead_mask)
+    villain_indices = live_combo_indices(villain, dead_mask)
+    if not hero_indices or not villain_indices or not _has_valid_pair(hero_indices, villain_indices):
+        return EquityResult(equity=0.0, std_error=0.0, samples=0)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    rng = random.Random(seed)
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+
+    total = 0.0
+    total_sq = 0.0
+    n = 0
+
+    def done() -> bool:
+        if n >= samples:
+            return True
+        if deadline is not None and time.monotonic() >= deadline:
+            return True
+        if target_std_error is not None and n >= batch_size:
+            return _std_error(total, total_sq, n) <= target_std_error
+        return False
+
+    def batch_args(size: int) -> tuple:
+        return hero_indices, villain_indices, list(board), dead_mask, size, rng.getrandbits(64)
+
+    if workers <= 1:
+        while not done():
+            t, t_sq, k = simulate_batch(*batch_args(min(batch_size, samples - n)))
+            total += t
+            total_sq += t_sq
+            n += k
+    else:
+        executor = _get_executor(workers)
+        pending: Set[Future] = set()
+        scheduled = 0
+        while True:
+            # 実行中のバッチをワーカー数の2倍まで積む
+            while len(pending) < workers * 2 and scheduled < samples and not done():
+                size = min(batch_size, samples - scheduled)
+                pending.add(executor.submit(simulate_batch, *batch_args(size)))
+                scheduled += size
+            if not pending:
+                break
+            timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            finished, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in finished:
+                t, t_sq, k = future.result()
+                total += t
+                total_sq += t_sq
+                n += k
+            if done():
+                for future in pending:
+                    future.cancel()
+                break
+
+    if n == 0:
+        return EquityResult(equity=0.0, std_error=0.0, samples=0)
+    return EquityResult(equity=total / n, std_error=_std_error(total, total_sq, n), samples=n)
+
+
+def _std_error(total: float, total_sq: float, n: int) -> float:
+    mean = total / n
+    variance = max(total_sq / n - mean * mean, 0.0)
+    return math.sqrt(variance / n)
@@ -0,0 +1,55 @@
+# equity/planner.py
+"""
+エクイティ計算の自動選択（全列挙 or モンテカルロ）。
+
+プリフロップ（ボード・デッドカード無し）はエクイティ行列（equity.preflop）を引くだけ。
+全列挙のコスト（ランアウト数 × 評価コンボ数）が上限（time_budget があればその時間で終わる量まで）以下なら厳密計算、
+それ以外はモンテカルロ（試行数・標準誤差・時間の上限付き）。
+"""
+from typing import Optional, Sequence
+from core.enums import CardId
+from core.range_combos import ComboRange
+from equity.exact import exact_equity, exact_work
+from equity.monte_carlo import EquityResult, monte_carlo_equity
+from equity.preflop import preflop_range_equity
+
+
+# 全列挙を選ぶコスト上限（7枚評価の回数の目安、1CPUで0.4秒程度）
+MAX_EXACT_WORK = 50_000
+
+# 全列挙の処理速度（コスト / 秒、1CPUでの実測 約12万 を控えめに）
+EXACT_WORK_PER_SECOND = 100_000
+
+
+def range_equity(
+    hero: ComboRange,
+    villain: ComboRange,
+    board: Sequence[CardId] = (),
+    dead: Sequence[CardId] = (),
+    max_exact_work: int = MAX_EXACT_WORK,
+    samples: int = 20000,
+    target_std_error: Optional[float] = None,
+    time_budget: Optional[float] = None,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> EquityResult:
+    """コスト見積もりで全列挙とモンテカルロを切り替えてエクイティを計算する"""
+    if not board and not dead:
+        result = preflop_range_equity(hero, villain)
+        if result is not None:
+            return result
+    if time_budget is not None:
+        max_exact_work = min(max_exact_work, int(time_budget * EXACT_WORK_PER_SECOND))
+    if exact_work(hero, villain, board, dead) <= max_exact_work:
+        return exact_equity(hero, villain, board, dead)
+    return monte_carlo_equity(
+        hero,
+        villain,
+        board=board,
+        dead=dead,
+        samples=samples,
+        target_std_error=target_std_error,
+        time_budget=time_budget,
+        workers=workers,
+        seed=seed,
+    )
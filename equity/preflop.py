@@ -0,0 +1,235 @@
+# equity/preflop.py
+"""
+プリフロップ・オールインのエクイティ行列（169ハンドクラス × 169ハンドクラス）。
+
+EQUITY[i][j] は クラスi vs クラスj のエクイティ（カードが被らないコンボ組の平均）、
+PAIRS[i][j] は被らないコンボ組の数。レンジ vs レンジは行列 × ベクトルで求まる。
+
+ファイル形式（data/preflop_equity.bin、リトルエンディアン）:
+  header : b"PFEQ" + version(uint16) + クラス数(uint16) + 1組あたりの試行数(uint32)
+  equity : 169 × 169 × float32
+  pairs  : 169 × 169 × uint16
+
+ビルド: python -m equity.preflop [出力パス] [1組あたりの試行数]
+（モンテカルロ、プロセス並列。1CPUで数分かかるのでファイルはリポジトリに含める）
+"""
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from operator import mul
+from typing import List, Optional, Sequence, Tuple
+from core.cards import COMBO_MASK, HAND_TYPE_COMBO_BITS
+from core.range_combos import ComboRange
+from core.utils_hand import NUM_HAND_TYPES
+from equity.monte_carlo import EquityResult, simulate_batch
+
+
+logger = logging.getLogger(__name__)
+
+
+EQUITY_PATH = os.environ.get(
+    "PREFLOP_EQUITY_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "preflop_equity.bin"),
+)
+
+MAGIC = b"PFEQ"
+FORMAT_VERSION = 1
+DEFAULT_SAMPLES_PER_PAIR = 3000
+
+_HEADER = struct.Struct("<4sHHI")
+
+# hand_type_index → そのクラスの combo_index 一覧
+_TYPE_COMBOS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(i for i in range(bits.bit_length()) if (bits >> i) & 1) for bits in HAND_TYPE_COMBO_BITS
+)
+
+
+class PreflopEquity:
+    """mmapしたエクイティ行列"""
+
+    def __init__(self, buf: mmap.mmap, samples_per_pair: int):
+        n = NUM_HAND_TYPES * NUM_HAND_TYPES
+        self._buf = buf
+        self.samples_per_pair = samples_per_pair
+        self.equity = memoryview(buf)[_HEADER.size:_HEADER.size + n * 4].cast("f")
+        self.pairs = memoryview(buf)[_HEADER.size + n * 4:_HEADER.size + n * 6].cast("H")
+        self._won_rows: Optional[List[List[float]]] = None
+        self._pair_rows: Optional[List[List[float]]] = None
+        self._var_rows: Optional[List[List[float]]] = None
+
+    def hand_vs_hand(self, hero_type: int, villain_type: int) -> float:
+        """クラス vs クラスのエクイティ"""
+        return self.equity[hero_type * NUM_HAND_TYPES + villain_type]
+
+    def _rows(self) -> Tuple[List[List[float]], List[List[float]]]:
+        """行ごとの (組数 × エクイティ, 組数)。初回だけ展開する"""
+        if self._won_rows is None:
+            n = NUM_HAND_TYPES
+            pairs = self.pairs.tolist()
+            won = [p * e for p, e in zip(pairs, self.equity.tolist())]
+            self._won_rows = [won[i * n:(i + 1) * n] for i in range(n)]
+            self._pair_rows = [[float(p) for p in pairs[i * n:(i + 1) * n]] for i in range(n)]
+        return self._won_rows, self._pair_rows
+
+    def hand_equities(self, villain_weights: Sequence[float]) -> Tuple[List[float], List[float]]:
+        """
+        ヴィランのレンジ（クラスごとの重み 0..1）に対する、各クラスのエクイティと対戦コンボ組数。
+        Returns: (equities, pair_weights)  対戦相手がいないクラスはエクイティ 0
+        """
+        won_rows, pair_rows = self._rows()
+        weights = list(villain_weights)
+        equities = []
+        pair_weights = []
+        for won_row, pair_row in zip(won_rows, pair_rows):
+            won = sum(map(mul, won_row, weights))
+            pairs = sum(map(mul, pair_row, weights))
+            equities.append(won / pairs if pairs else 0.0)
+            pair_weights.append(pairs)
+        return equities, pair_weights
+
+    def range_equity(self, hero_weights: Sequence[float], villain_weights: Sequence[float]) -> float:
+        """レンジ vs レンジのエクイティ（クラスごとの重み）"""
+        equities, pair_weights = self.hand_equities(villain_weights)
+        won = sum(h * e * p for h, e, p in zip(hero_weights, equities, pair_weights))
+        total = sum(h * p for h, p in zip(hero_weights, pair_weights))
+        return won / total if total else 0.0
+
+    def range_std_error(self, hero_weights: Sequence[float], villain_weights: Sequence[float]) -> float:
+        """
+        range_equity の標準誤差（行列の各要素は samples_per_pair 回のモンテカルロ推定）。
+        要素 (i, j) と (j, i) は同じ推定（e と 1-e）なので、重み w_ij - w_ji で効く:
+          Var = Σ_{i<j} (h_i v_j - h_j v_i)^2 c_ij / W^2,  c_ij = p_ij^2 e_ij (1 - e_ij) / n
+        """
+        if self._var_rows is None:
+            n = NUM_HAND_TYPES
+            samples = max(self.samples_per_pair, 1)
+            cells = [p * p * e * (1.0 - e) / samples for p, e in zip(self.pairs.tolist(), self.equity.tolist())]
+            self._var_rows = [cells[i * n:(i + 1) * n] for i in range(n)]
+        _, pair_rows = self._rows()
+        hero = list(hero_weights)
+        villain = list(villain_weights)
+        villain_sq = [v * v for v in villain]
+        both = [h * v for h, v in zip(hero, villain)]
+        total = sum(h * sum(map(mul, row, villain)) for h, row in zip(hero, pair_rows) if h)
+        if not total:
+            return 0.0
+        variance = sum(
+            h * h * sum(map(mul, row, villain_sq)) - hv * sum(map(mul, row, both))
+            for h, hv, row in zip(hero, both, self._var_rows)
+            if h
+        )
+        return math.sqrt(max(variance, 0.0)) / total
+
+
+def hand_type_weights(range_combos: ComboRange) -> List[float]:
+    """ComboRange → クラスごとの重み（クラス内でレンジに含まれるコンボの割合）"""
+    return [
+        (range_combos.bits & bits).bit_count() / bits.bit_count() for bits in HAND_TYPE_COMBO_BITS
+    ]
+
+
+def preflop_range_equity(hero: ComboRange, villain: ComboRange) -> Optional[EquityResult]:
+    """プリフロップ・オールインのレンジ vs レンジ。行列ファイルが無ければ None"""
+    if PREFLOP_EQUITY is None:
+        return None
+    hero_weights = hand_type_weights(hero)
+    villain_weights = hand_type_weights(villain)
+    return EquityResult(
+        equity=PREFLOP_EQUITY.range_equity(hero_weights, villain_weights),
+        std_error=PREFLOP_EQUITY.range_std_error(hero_weights, villain_weights),
+        samples=PREFLOP_EQUITY.samples_per_pair,
+    )
+
+
+def _pair_count(i: int, j: int) -> int:
+    """クラスi・クラスjでカードが被らないコンボ組の数"""
+    return sum(1 for a in _TYPE_COMBOS[i] for b in _TYPE_COMBOS[j] if not COMBO_MASK[a] & COMBO_MASK[b])
+
+
+def _simulate_pairs(pairs: Sequence[Tuple[int, int]], samples: int) -> List[float]:
+    """クラス組ごとのエクイティ（ワーカープロセスで実行される）"""
+    results = []
+    for i, j in pairs:
+        total, _, n = simulate_batch(_TYPE_COMBOS[i], _TYPE_COMBOS[j], [], 0, samples, i * NUM_HAND_TYPES + j)
+        results.append(total / n)
+    return results
+
+
+def build_preflop_equity(
+    path: str = EQUITY_PATH, samples_per_pair: int = DEFAULT_SAMPLES_PER_PAIR, workers: Optional[int] = None
+) -> None:
+    """全クラス組のエクイティを計算してファイルに書き出す（i < j だけ計算し、残りは対称性で埋める）"""
+    n = NUM_HAND_TYPES
+    equity = array("f", [0.5]) * (n * n)
+    pairs = array("H", [_pair_count(i, j) for i in range(n) for j in range(n)])
+
+    upper = [(i, j) for i in range(n) for j in range(i + 1, n)]
+    chunks = [upper[k:k + 64] for k in range(0, len(upper), 64)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        chunk_results = [_simulate_pairs(chunk, samples_per_pair) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunk_results = list(executor.map(_simulate_pairs, chunks, [samples_per_pair] * len(chunks)))
+    for chunk, results in zip(chunks, chunk_results):
+        for (i, j), e in zip(chunk, results):
+            equity[i * n + j] = e
+            equity[j * n + i] = 1.0 - e
+
+    if sys.byteorder != "little":
+        equity.byteswap()
+        pairs.byteswap()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, n, samples_per_pair))
+        f.write(equity.tobytes())
+        f.write(pairs.tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_preflop_equity(path: str = EQUITY_PATH) -> Optional[PreflopEquity]:
+    """行列を読み取り専用でmmapする。ファイルが無い・壊れている・形式が違う場合は None"""
+    try:
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+    except ValueError:  # 空ファイルは mmap できない
+        logger.warning("%s is empty, ignoring it", path)
+        return None
+
+    if len(buf) < _HEADER.size:
+        logger.warning("%s is truncated, ignoring it", path)
+        buf.close()
+        return None
+    magic, version, num_types, samples_per_pair = _HEADER.unpack_from(buf, 0)
+    expected = _HEADER.size + NUM_HAND_TYPES * NUM_HAND_TYPES * 6
+    if (
+        magic != MAGIC
+        or version != FORMAT_VERSION
+        or num_types != NUM_HAND_TYPES
+        or len(buf) != expected
+        or sys.byteorder != "little"
+    ):
+        logger.warning("%s has an unexpected format or size, ignoring it", path)
+        buf.close()
+        return None
+    return PreflopEquity(buf, samples_per_pair)
+
+
+# 起動時に1回だけmmap
+PREFLOP_EQUITY = load_preflop_equity()
+
+
+if __name__ == "__main__":
+    out_path = sys.argv[1] if len(sys.argv) > 1 else EQUITY_PATH
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_SAMPLES_PER_PAIR
+    build_preflop_equity(out_path, samples)
+    print(f"wrote {out_path}")
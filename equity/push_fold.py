@@ -0,0 +1,237 @@
+# equity/push_fold.py
+"""
+プッシュ/フォールドの均衡（ナッシュ）チャート。
+
+各ポジションからのオープンシャブ（後ろのプレイヤーは最初にコールした1人だけと対戦）と、
+SB vs BB のヘッズアップを、169ハンドクラス上の fictitious play（最適応答の平均化）で解く。
+エクイティはプリフロップ行列（equity.preflop）を引くだけなので、1スポット数秒で収束する。
+
+ブラインド・アンティ: SB 0.5BB, BB 1BB, BBアンティ 1BB（M = スタック / 2.5BB）
+スタックはブラインドを出す前の額で、BBアンティはスタックの外のデッドマネーとして扱う
+（ポットとリスクは equity.icm.called_shove。quiz.generators.icm_shove_thresholds も同じ定義）。
+全員のスタックは同じ（エフェクティブ）とし、コーラーの種類は
+「ブラインド以外」「SB」「BB」の3つ（同じ種類のコーラーは同じレンジになる）。
+
+ファイル形式（data/push_fold.bin、リトルエンディアン）:
+  header : b"PUSH" + version(uint16) + ポジション数(uint16) + スタック数(uint16)
+  stacks : スタック数 × float32（BB単位）
+  charts : ポジション × スタック × (シャブ, コール[ブラインド以外], コール[SB], コール[BB]) × 169 × uint8（頻度 × 255）
+
+ビルド: python -m equity.push_fold [出力パス]
+"""
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+from core.enums import Position
+from core.power_number import players_behind
+from core.utils_hand import NUM_HAND_TYPES, HAND_TYPES, hand_type_combos, hand_type_index
+from equity.icm import called_shove
+from equity.preflop import PREFLOP_EQUITY, PreflopEquity
+
+
+logger = logging.getLogger(__name__)
+
+
+CHARTS_PATH = os.environ.get(
+    "PUSH_FOLD_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "push_fold.bin"),
+)
+
+MAGIC = b"PUSH"
+FORMAT_VERSION = 1
+
+# ブラインド・アンティ（BB単位）
+SMALL_BLIND = 0.5
+BIG_BLIND = 1.0
+BB_ANTE = 1.0
+DEAD_MONEY = SMALL_BLIND + BIG_BLIND + BB_ANTE
+
+# 解くスポット（シャブするポジション）とスタック（BB単位）
+PUSH_POSITIONS: List[Position] = [
+    Position.UTG,
+    Position.UTG1,
+    Position.UTG2,
+    Position.LJ,
+    Position.HJ,
+    Position.CO,
+    Position.BTN,
+    Position.SB,
+]
+STACK_GRID: List[float] = [float(s) for s in range(1, 21)]
+
+# コーラーの種類
+CALLER_OTHER = 0
+CALLER_SB = 1
+CALLER_BB = 2
+CALLER_BLINDS = (0.0, SMALL_BLIND, BIG_BLIND)
+
+DEFAULT_ITERATIONS = 150
+
+_HEADER = struct.Struct("<4sHHH")
+
+# 1コンボあたりの相手コンボ数（52 - 2 枚から2枚）
+_OPPONENT_COMBOS = 1225
+_TYPE_COMBOS = [hand_type_combos(*t) for t in HAND_TYPES]
+
+
+def position_blind(pos: Position) -> float:
+    if pos == Position.SB:
+        return SMALL_BLIND
+    if pos == Position.BB:
+        return BIG_BLIND
+    return 0.0
+
+
+def caller_order(pos: Position) -> List[int]:
+    """シャブしたポジションの後ろのコーラー（アクション順）"""
+    behind = players_behind(pos)
+    if pos == Position.SB:
+        return [CALLER_BB]
+    return [CALLER_OTHER] * (behind - 2) + [CALLER_SB, CALLER_BB]
+
+
+def _pot(stack: float, hero_blind: float, caller_blind: float) -> float:
+    """オールイン同士のポット（equity.icm.called_shove の定義。BBアンティはスタックの外）"""
+    return called_shove(stack, stack, hero_blind, caller_blind, DEAD_MONEY)[2]
+
+
+def solve_push_fold(
+    pos: Position,
+    stack: float,
+    iterations: int = DEFAULT_ITERATIONS,
+    matrix: Optional[PreflopEquity] = None,
+) -> Tuple[List[float], Dict[int, List[float]]]:
+    """
+    fictitious play でシャブレンジとコールレンジを求める。
+    Returns: (シャブ頻度[169], {コーラー種類: コール頻度[169]})
+    """
+    matrix = matrix or PREFLOP_EQUITY
+    if matrix is None:
+        raise RuntimeError("preflop equity matrix is not available (python -m equity.preflop)")
+
+    hero_blind = position_blind(pos)
+    order = caller_order(pos)
+    caller_types = sorted(set(order))
+
+    push = [1.0] * NUM_HAND_TYPES
+    calls = {k: [0.0] * NUM_HAND_TYPES for k in caller_types}
+    for t in range(1, iterations + 1):
+        # コーラーの最適応答（シャブレンジに対して）
+        equities_vs_push, _ = matrix.hand_equities(push)
+        for k in caller_types:
+            pot = _pot(stack, hero_blind, CALLER_BLINDS[k])
+            best = [1.0 if e * pot - stack > -CALLER_BLINDS[k] else 0.0 for e in equities_vs_push]
+            calls[k] = [c + (b - c) / (t + 1) for c, b in zip(calls[k], best)]
+
+        # シャブの最適応答（コールレンジに対して）
+        vs_caller = {k: matrix.hand_equities(calls[k]) for k in caller_types}
+        best = []
+        for i in range(NUM_HAND_TYPES):
+            reach = 1.0
+            ev = 0.0
+            for k in order:
+                equities, pair_weights = vs_caller[k]
+                q = pair_weights[i] / (_TYPE_COMBOS[i] * _OPPONENT_COMBOS)
+                ev += reach * q * (equities[i] * _pot(stack, hero_blind, CALLER_BLINDS[k]) - stack)
+                reach *= 1.0 - q
+            ev += reach * (DEAD_MONEY - hero_blind)
+            best.append(1.0 if ev > -hero_blind else 0.0)
+        push = [p + (b - p) / (t + 1) for p, b in zip(push, best)]
+
+    return push, calls
+
+
+class PushFoldCharts:
+    """mmapしたプッシュ/フォールドチャート"""
+
+    def __init__(self, buf: mmap.mmap, stacks: Sequence[float], charts_offset: int):
+        self._buf = buf
+        self.stacks = list(stacks)
+        self._charts = memoryview(buf)[charts_offset:]
+
+    def _offset(self, pos: Position, stack: float) -> int:
+        # 最も近いグリッドのスタック
+        s = min(range(len(self.stacks)), key=lambda k: abs(self.stacks[k] - stack))
+        return (PUSH_POSITIONS.index(pos) * len(self.stacks) + s) * 4 * NUM_HAND_TYPES
+
+    def push_frequency(self, pos: Position, stack: float, hand_type: int) -> float:
+        """シャブ頻度（0..1）"""
+        return self._charts[self._offset(pos, stack) + hand_type] / 255
+
+    def call_frequency(self, pos: Position, stack: float, caller: int, hand_type: int) -> float:
+        """pos のシャブに対するコール頻度（0..1）"""
+        return self._charts[self._offset(pos, stack) + (1 + caller) * NUM_HAND_TYPES + hand_type] / 255
+
+
+def build_push_fold_charts(path: str = CHARTS_PATH, iterations: int = DEFAULT_ITERATIONS) -> None:
+    """全ポジション × 全スタックを解いてファイルに書き出す"""
+    charts = bytearray()
+    for pos in PUSH_POSITIONS:
+        for stack in STACK_GRID:
+            push, calls = solve_push_fold(pos, stack, iterations)
+            for freqs in [push] + [calls.get(k, [0.0] * NUM_HAND_TYPES) for k in (CALLER_OTHER, CALLER_SB, CALLER_BB)]:
+                charts.extend(round(f * 255) for f in freqs)
+
+    stacks = array("f", STACK_GRID)
+    if sys.byteorder != "little":
+        stacks.byteswap()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(PUSH_POSITIONS), len(STACK_GRID)))
+        f.write(stacks.tobytes())
+        f.write(charts)
+    os.replace(tmp_path, path)
+
+
+def load_push_fold_charts(path: str = CHARTS_PATH) -> Optional[PushFoldCharts]:
+    """チャートを読み取り専用でmmapする。ファイルが無い・壊れている・形式が違う場合は None"""
+    try:
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+    except ValueError:  # 空ファイルは mmap できない
+        logger.warning("%s is empty, ignoring it", path)
+        return None
+
+    if len(buf) < _HEADER.size:
+        logger.warning("%s is truncated, ignoring it", path)
+        buf.close()
+        return None
+    magic, version, num_positions, num_stacks = _HEADER.unpack_from(buf, 0)
+    charts_offset = _HEADER.size + num_stacks * 4
+    expected = charts_offset + num_positions * num_stacks * 4 * NUM_HAND_TYPES
+    if (
+        magic != MAGIC
+        or version != FORMAT_VERSION
+        or num_positions != len(PUSH_POSITIONS)
+        or len(buf) != expected
+        or sys.byteorder != "little"
+    ):
+        logger.warning("%s has an unexpected format or size, ignoring it", path)
+        buf.close()
+        return None
+    stacks = memoryview(buf)[_HEADER.size:charts_offset].cast("f").tolist()
+    return PushFoldCharts(buf, stacks, charts_offset)
+
+
+def nash_shove_frequency(pos: Position, hi: int, lo: int, suited: bool, m_value: float) -> Optional[float]:
+    """M値のスポットでの均衡シャブ頻度（0..1）。チャートが無ければ None"""
+    if PUSH_FOLD_CHARTS is None or pos not in PUSH_POSITIONS:
+        return None
+    return PUSH_FOLD_CHARTS.push_frequency(pos, m_value * DEAD_MONEY, hand_type_index(hi, lo, suited))
+
+
+# 起動時に1回だけmmap（無ければ均衡との比較は出さない）
+PUSH_FOLD_CHARTS = load_push_fold_charts()
+
+
+if __name__ == "__main__":
+    out_path = sys.argv[1] if len(sys.argv) > 1 else CHARTS_PATH
+    build_push_fold_charts(out_path)
+    print(f"wrote {out_path}")
@@ -1,8 +1,33 @@
 # main.py
 from fastapi import FastAPI
 from web.routes import router
+from core.range_store import start_range_watcher
+from quiz.pool import QUESTION_POOL
+from web.executor import shutdown_mdf_executor
 
 app = FastAPI()
 
 # ルーターをインクルード
 app.include_router(router)
+
+
+@app.on_event("startup")
+def watch_range_file() -> None:
+    # POKER_RANGE_FILE があればレンジファイルを読み込み、変更を監視する
+    start_range_watcher()
+
+
+@app.on_event("startup")
+def start_question_pool() -> None:
+    # モードごとの問題ストックをバックグラウンドで補充する
+    QUESTION_POOL.start()
+
+
+@app.on_event("shutdown")
+def stop_question_pool() -> None:
+    QUESTION_POOL.stop()
+
+
+@app.on_event("shutdown")
+def stop_mdf_executor() -> None:
+    shutdown_mdf_executor()
@@ -1,12 +1,84 @@
 # mdf/analysis.py
 import math
-from typing import Dict, Any, Set, Tuple, List
-from core.enums import Card, Bucket, BUCKET_ORDER
-from core.cards import blocks_with_board, card_to_str
-from mdf.evaluator import evaluate_hand_strength
+from array import array
+from functools import lru_cache
+from typing import Dict, Any, List, Sequence, Tuple
+from core.enums import CardId, Bucket, BUCKET_ORDER
+from core.cards import COMBOS, cards_mask, card_to_str, parse_board
+from core.isomorphism import canonicalize_board, INVERSE_PERMUTATION, PERMUTED_COMBO
+from core.range_combos import ComboRange, get_range_combos
+from core.range_store import add_reload_listener
+from mdf.evaluator import evaluate_range_buckets, board_suit_counts, bucket_class_table
+from mdf.bucket_db import BUCKET_DB, BLOCKED
+from equity.planner import range_equity
 
 
-def calculate_mdf_analysis(range_combos: Set[Tuple[Card, Card]], board: List[Card], bet_size: float) -> Dict[str, Any]:
+# (レンジ, 正準ボード) → バケット分布 のLRUキャッシュ上限
+BUCKET_CACHE_SIZE = 4096
+
+# 出題した (レンジ名, ボード, bet size) → MDF分析結果 のLRUキャッシュ上限
+ANALYSIS_CACHE_SIZE = 4096
+
+# バケット別エクイティの試行数・時間の上限（全バケット合計）
+EQUITY_SAMPLES_PER_BUCKET = 4000
+EQUITY_TARGET_STD_ERROR = 0.01
+EQUITY_TIME_BUDGET = 1.5
+
+
+@lru_cache(maxsize=BUCKET_CACHE_SIZE)
+def bucket_distribution(range_combos: ComboRange, canonical_board: Tuple[CardId, ...]) -> Tuple[array, ...]:
+    """
+    正準ボード上でのバケット分類結果（BUCKET_ORDER順、各バケットの combo_index 配列）。
+    bet size に依存しないので (レンジ, 正準ボード) でキャッシュする。
+    レンジはスート対称（ハンドクラス単位で定義）である前提。
+    """
+    # 事前計算DBがあればテーブル参照のみ
+    row = BUCKET_DB.row(canonical_board) if BUCKET_DB is not None else None
+    if row is not None:
+        distribution = tuple(array('H') for _ in BUCKET_ORDER)
+        for i in range_combos:
+            code = row[i]
+            if code != BLOCKED:
+                distribution[code].append(i)
+        return distribution
+
+    valid_indices = list(range_combos.without(cards_mask(canonical_board)))
+    bucket_combos: Dict[Bucket, array] = {b: array('H') for b in BUCKET_ORDER}
+    for i, bucket in zip(valid_indices, _evaluate_by_class(canonical_board, valid_indices)):
+        bucket_combos[bucket].append(i)
+    return tuple(bucket_combos[b] for b in BUCKET_ORDER)
+
+
+def _evaluate_by_class(board: List[CardId], valid_indices: List[int]) -> List[Bucket]:
+    """
+    コンボをバケット同値クラスにまとめ、クラスごとに代表1コンボだけ評価して展開する。
+    代表はボードと被らないコンボから選ぶ。
+    ターン・リバーも代表だけを直接評価する。フロップの状態からの差分更新（mdf.streets）は
+    同じボードから多数のランアウトを見る /mdf/runouts 用で、1ボードだと代表ごとの評価回数が
+    減らず、かえって遅い（リバーで約1.7倍）。
+    """
+    class_of = bucket_class_table(board_suit_counts(board))
+    representatives: Dict[int, int] = {}
+    for i in valid_indices:
+        representatives.setdefault(class_of[i], i)
+    class_bucket = dict(zip(
+        representatives.keys(),
+        evaluate_range_buckets(board, list(representatives.values())),
+    ))
+    return [class_bucket[class_of[i]] for i in valid_indices]
+
+
+def clear_bucket_cache() -> None:
+    """バケット分布キャッシュ・MDF分析キャッシュを破棄する"""
+    bucket_distribution.cache_clear()
+    _cached_mdf_analysis.cache_clear()
+
+
+# レンジファイルが差し替わったら古いレンジのエントリを捨てる
+add_reload_listener(lambda ranges: clear_bucket_cache())
+
+
+def calculate_mdf_analysis(range_combos: ComboRange, board: List[CardId], bet_size: float) -> Dict[str, Any]:
     """
     レンジ × ボード から、バケット分布、MDF、カットオフを計算する。
 
@@ -30,9 +102,11 @@ def calculate_mdf_analysis(range_combos: Set[Tuple[Card, Card]], board: List[Car
             ]
         }
     """
-    # ボードと被るコンボを除外
-    valid_combos = [c for c in range_combos if not blocks_with_board(c, board)]
-    total_combos = len(valid_combos)
+    # 正準ボードでバケット分布を取得（キャッシュ）
+    # ハンド一覧は含めない（bucket_hands で必要な分だけ取得する）
+    canonical_board, _ = canonicalize_board(board)
+    distribution = bucket_distribution(range_combos, canonical_board)
+    total_combos = sum(len(indices) for indices in distribution)
 
     if total_combos == 0:
         # ボードがレンジを全部ブロックしてしまう稀なケース
@@ -46,26 +120,11 @@ def calculate_mdf_analysis(range_combos: Set[Tuple[Card, Card]], board: List[Car
             'buckets': []
         }
 
-    # MDF計算
-    mdf = 1.0 / (1.0 + bet_size)
-    need_defend = math.ceil(total_combos * mdf)
-
-    # バケット分類
-    bucket_combos: Dict[Bucket, List] = {b: [] for b in BUCKET_ORDER}
-    for combo in valid_combos:
-        bucket = evaluate_hand_strength(combo, board)
-        bucket_combos[bucket].append(combo)
-
     # バケット集計（強い順）
     bucket_list = []
     cum_count = 0
-    prev_cum = 0
-    cutoff_bucket = None
-    mix_required = False
-    mix_ratio = None
-
-    for bucket in BUCKET_ORDER:
-        count = len(bucket_combos[bucket])
+    for bucket, canonical_indices in zip(BUCKET_ORDER, distribution):
+        count = len(canonical_indices)
         pct = (count / total_combos * 100) if total_combos > 0 else 0.0
         cum_count += count
         cum_pct = (cum_count / total_combos * 100) if total_combos > 0 else 0.0
@@ -78,26 +137,117 @@ def calculate_mdf_analysis(range_combos: Set[Tuple[Card, Card]], board: List[Car
             'cum_pct': round(cum_pct, 1)
         }
 
-        # 常にハンド一覧を生成（トグル表示用）
-        if count > 0:
-            hands = []
-            for combo in bucket_combos[bucket]:
-                c1, c2 = combo
-                hand_str = f"{card_to_str(c1)}{card_to_str(c2)}"
-                hands.append(hand_str)
-            bucket_data['hands'] = hands
-
         bucket_list.append(bucket_data)
 
+    cutoff = mdf_cutoff([len(indices) for indices in distribution], bet_size)
+
+    return {
+        'mdf': cutoff['mdf'],
+        'total_combos': total_combos,
+        'need_defend_combos': cutoff['need_defend_combos'],
+        'cutoff_bucket': cutoff['cutoff_bucket'],
+        'mix_required': cutoff['mix_required'],
+        'mix_ratio': cutoff['mix_ratio'],
+        'buckets': bucket_list
+    }
+
+
+def question_mdf_analysis(range_name: str, board_raw: str, bet_size: float) -> Dict[str, Any]:
+    """
+    問題の (レンジ名, board_raw, bet size) に対する calculate_mdf_analysis の結果。
+    出題時に計算したものを、採点・共有URLからの復元ではキャッシュから引くだけにする。
+    キャッシュはレンジ名ではなく現在のコンボ集合で引くので、レンジ差し替えの前に始まった計算が
+    後から古いレンジの結果を入れても、新しいレンジの問い合わせには当たらない。
+    返り値は共有されるので変更しないこと。
+    """
+    return _cached_mdf_analysis(get_range_combos(range_name), board_raw, bet_size)
+
+
+@lru_cache(maxsize=ANALYSIS_CACHE_SIZE)
+def _cached_mdf_analysis(range_combos: ComboRange, board_raw: str, bet_size: float) -> Dict[str, Any]:
+    return calculate_mdf_analysis(range_combos, parse_board(board_raw), bet_size)
+
+
+def bucket_hands(
+    range_combos: ComboRange, board: List[CardId], bucket: Bucket, offset: int = 0, limit: int = 200
+) -> Tuple[int, List[str]]:
+    """
+    指定バケットのハンド一覧（表示用文字列）をページ単位で返す。
+    Returns: (バケット内の総コンボ数, offset から最大 limit 件のハンド文字列)
+    """
+    canonical_board, perm = canonicalize_board(board)
+    canonical_indices = bucket_distribution(range_combos, canonical_board)[BUCKET_ORDER.index(bucket)]
+    # 元のスートに戻してデッキ順に並べる
+    to_original = PERMUTED_COMBO[INVERSE_PERMUTATION[perm]]
+    indices = sorted(to_original[ci] for ci in canonical_indices)
+
+    hands = []
+    for i in indices[offset:offset + limit]:
+        c1, c2 = COMBOS[i]
+        hands.append(f"{card_to_str(c1)}{card_to_str(c2)}")
+    return len(indices), hands
+
+
+def calculate_mdf_curve(range_combos: ComboRange, board: List[CardId], bet_sizes: Sequence[float]) -> List[Dict[str, Any]]:
+    """
+    バケット分類を1回だけ行い、複数の bet size それぞれのカットオフを返す（ディフェンスカーブ）。
+
+    Returns:
+        [
+            {
+                'bet_size': float,
+                'mdf': float,
+                'need_defend_combos': int,
+                'cutoff_bucket': str,
+                'mix_required': bool,
+                'mix_ratio': float or None,
+            },
+            ...
+        ]
+    """
+    canonical_board, _ = canonicalize_board(board)
+    counts = [len(indices) for indices in bucket_distribution(range_combos, canonical_board)]
+    return [{'bet_size': bet_size, **mdf_cutoff(counts, bet_size)} for bet_size in bet_sizes]
+
+
+def mdf_cutoff(counts: Sequence[int], bet_size: float) -> Dict[str, Any]:
+    """
+    バケットごとのコンボ数（BUCKET_ORDER順）と bet size から、MDFとカットオフを計算する。
+    バケット分布は bet size に依存しないので、分類結果を使い回せる。
+    """
+    total_combos = sum(counts)
+    if total_combos == 0:
+        # ボードがレンジを全部ブロックしてしまう稀なケース
+        return {
+            'mdf': 0.0,
+            'need_defend_combos': 0,
+            'cutoff_bucket': 'N/A',
+            'mix_required': False,
+            'mix_ratio': None,
+        }
+
+    # MDF計算
+    mdf = 1.0 / (1.0 + bet_size)
+    need_defend = math.ceil(total_combos * mdf)
+
+    cum_count = 0
+    prev_cum = 0
+    cutoff_bucket = None
+    mix_required = False
+    mix_ratio = None
+
+    for bucket, count in zip(BUCKET_ORDER, counts):
+        cum_count += count
+
         # カットオフ判定
-        if cutoff_bucket is None:
-            if cum_count >= need_defend:
-                cutoff_bucket = bucket.value
-                # mix判定
-                if prev_cum < need_defend < cum_count:
-                    mix_required = True
-                    need_in_bucket = need_defend - prev_cum
-                    mix_ratio = round((need_in_bucket / count * 100), 1) if count > 0 else 0.0
+        if cum_count >= need_defend:
+            cutoff_bucket = bucket.value
+            # mix判定
+            if prev_cum < need_defend < cum_count:
+                mix_required = True
+                need_in_bucket = need_defend - prev_cum
+                mix_ratio = round((need_in_bucket / count * 100), 1) if count > 0 else 0.0
+            break
 
         prev_cum = cum_count
 
@@ -107,10 +257,53 @@ def calculate_mdf_analysis(range_combos: Set[Tuple[Card, Card]], board: List[Car
 
     return {
         'mdf': round(mdf, 3),
-        'total_combos': total_combos,
         'need_defend_combos': need_defend,
         'cutoff_bucket': cutoff_bucket,
         'mix_required': mix_required,
         'mix_ratio': mix_ratio,
-        'buckets': bucket_list
     }
+
+
+def bucket_equities(
+    range_combos: ComboRange,
+    bettor_range: ComboRange,
+    board: List[CardId],
+    time_budget: float = EQUITY_TIME_BUDGET,
+) -> List[Dict[str, Any]]:
+    """
+    各バケットのコンボ群 vs ベッターのレンジ のエクイティ。
+    ターン/リバーなど列挙が軽いときは全列挙、それ以外はモンテカルロ（equity.planner）。
+    モンテカルロの時間の上限は空でないバケットで均等に割り振る。
+    Webワーカー内（MDF用スレッド）で呼ばれるので、プロセスプールは使わず同じプロセスで回す。
+
+    Returns:
+        [{'name': str, 'count': int, 'equity': float or None, 'std_error': float, 'samples': int}, ...]
+    """
+    # スート置換でエクイティは変わらないので正準ボード上で計算する
+    canonical_board, _ = canonicalize_board(board)
+    distribution = bucket_distribution(range_combos, canonical_board)
+    non_empty = sum(1 for indices in distribution if indices)
+
+    results = []
+    for bucket, indices in zip(BUCKET_ORDER, distribution):
+        if not indices:
+            results.append({'name': bucket.value, 'count': 0, 'equity': None, 'std_error': 0.0, 'samples': 0})
+            continue
+        hero = ComboRange(sum(1 << i for i in indices))
+        result = range_equity(
+            hero,
+            bettor_range,
+            board=canonical_board,
+            samples=EQUITY_SAMPLES_PER_BUCKET,
+            target_std_error=EQUITY_TARGET_STD_ERROR,
+            time_budget=time_budget / non_empty,
+            workers=1,
+        )
+        results.append({
+            'name': bucket.value,
+            'count': len(indices),
+            'equity': round(result.equity * 100, 1) if result.samples else None,
+            'std_error': round(result.std_error * 100, 1),
+            'samples': result.samples,
+        })
+    return results
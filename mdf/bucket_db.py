@@ -0,0 +1,136 @@
+# mdf/bucket_db.py
+"""
+全1326コンボ × 全1755正準フロップのバケットを事前計算したバイナリDB。
+
+バケットはレンジに依存しない（コンボとボードだけで決まる）ので、
+コンボ単位で1回だけ評価しておけば、全レンジはビットセットで引くだけになる。
+
+ファイル形式（data/mdf_buckets.bin、リトルエンディアン）:
+  header : b"MDFB" + version(uint16) + バケット判定ルールの版(uint16) + フロップ数(uint16) + CRC32(uint32)
+  flops  : 正準フロップ × 3byte（card_id）
+  rows   : 正準フロップ × 1326byte（BUCKET_ORDERのindex、ボードと被るコンボは 255）
+CRC32 は flops + rows に対するもの。ルールの版（mdf.evaluator.BUCKET_RULES_VERSION）が違うDBは
+古い判定のままなので読み込まない（評価器にフォールバックする）。
+
+ビルド: python -m mdf.bucket_db
+サーバーは起動時に読み取り専用で mmap する（ワーカー間でページキャッシュを共有）。
+"""
+import logging
+import mmap
+import os
+import struct
+import sys
+import zlib
+from typing import Dict, Optional, Tuple
+from core.enums import CardId, BUCKET_ORDER
+from core.cards import NUM_COMBOS, cards_mask, dead_combo_bits
+from core.isomorphism import canonical_flops
+from mdf.evaluator import BUCKET_RULES_VERSION, evaluate_range_buckets
+
+
+logger = logging.getLogger(__name__)
+
+
+DB_PATH = os.environ.get(
+    "MDF_BUCKET_DB",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "mdf_buckets.bin"),
+)
+
+MAGIC = b"MDFB"
+FORMAT_VERSION = 2
+BLOCKED = 255
+
+_HEADER = struct.Struct("<4sHHHI")
+
+
+class BucketDB:
+    """mmapしたバケットDB。正準フロップ → 1326byteの行"""
+
+    def __init__(self, buf: mmap.mmap, rows_offset: int, flop_rows: Dict[Tuple[CardId, ...], int]):
+        self._buf = buf
+        self._rows_offset = rows_offset
+        self._flop_rows = flop_rows
+
+    def row(self, canonical_flop: Tuple[CardId, ...]) -> Optional[memoryview]:
+        """正準フロップの行（combo_index → バケットコード）。無ければ None"""
+        idx = self._flop_rows.get(canonical_flop)
+        if idx is None:
+            return None
+        start = self._rows_offset + idx * NUM_COMBOS
+        return memoryview(self._buf)[start:start + NUM_COMBOS]
+
+
+def build_bucket_db(path: str = DB_PATH) -> None:
+    """全正準フロップを評価してDBファイルを書き出す"""
+    flops = canonical_flops()
+    body = bytearray()
+    for flop in flops:
+        body += bytes(flop)
+    all_combos = (1 << NUM_COMBOS) - 1
+    for flop in flops:
+        row = bytearray([BLOCKED]) * NUM_COMBOS
+        live = all_combos & ~dead_combo_bits(cards_mask(flop))
+        indices = [i for i in range(NUM_COMBOS) if (live >> i) & 1]
+        for i, bucket in zip(indices, evaluate_range_buckets(list(flop), indices)):
+            row[i] = BUCKET_ORDER.index(bucket)
+        body += row
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, BUCKET_RULES_VERSION, len(flops), zlib.crc32(body)))
+        f.write(body)
+    # 書き込み完了後に差し替え（読み込み中のプロセスを壊さない）
+    os.replace(tmp_path, path)
+
+
+def load_bucket_db(path: str = DB_PATH) -> Optional[BucketDB]:
+    """DBを読み取り専用でmmapする。ファイルが無い・壊れている・形式が違う場合は None"""
+    try:
+        with open(path, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+    except ValueError:  # 空ファイルは mmap できない
+        logger.warning("%s is empty, ignoring it", path)
+        return None
+
+    if len(buf) < _HEADER.size:
+        logger.warning("%s is truncated, ignoring it", path)
+        buf.close()
+        return None
+    magic, version, rules_version, num_flops, checksum = _HEADER.unpack_from(buf, 0)
+    rows_offset = _HEADER.size + num_flops * 3
+    if magic != MAGIC or version != FORMAT_VERSION or len(buf) != rows_offset + num_flops * NUM_COMBOS:
+        logger.warning("%s has an unexpected format or size, ignoring it", path)
+        buf.close()
+        return None
+    if rules_version != BUCKET_RULES_VERSION:
+        logger.warning(
+            "%s was built with bucket rules v%d (current v%d), ignoring it; rebuild with python -m mdf.bucket_db",
+            path, rules_version, BUCKET_RULES_VERSION,
+        )
+        buf.close()
+        return None
+    with memoryview(buf) as view:
+        actual = zlib.crc32(view[_HEADER.size:])
+    if actual != checksum:
+        logger.warning("%s failed its checksum, ignoring it", path)
+        buf.close()
+        return None
+
+    flop_rows = {}
+    for idx in range(num_flops):
+        start = _HEADER.size + idx * 3
+        flop_rows[tuple(buf[start:start + 3])] = idx
+    return BucketDB(buf, rows_offset, flop_rows)
+
+
+# 起動時に1回だけmmap（無ければ評価器にフォールバック）
+BUCKET_DB = load_bucket_db()
+
+
+if __name__ == "__main__":
+    out_path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    build_bucket_db(out_path)
+    print(f"wrote {out_path}")
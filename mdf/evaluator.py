@@ -1,144 +1,199 @@
 # mdf/evaluator.py
-from typing import List, Tuple
-from collections import Counter
-from core.enums import Card, Bucket
+from functools import lru_cache
+from itertools import combinations
+from typing import Iterable, List, Sequence, Tuple
+from core.enums import CardId, Bucket, HandCategory
+from core.cards import CARD_RANK, CARD_SUIT, RANK_BIT, COMBOS, COMBO_INDEX
+from core.hand_rank import CATEGORY_START, rank5, evaluate_cards
 
 
-def evaluate_hand_strength(hand: Tuple[Card, Card], board: List[Card]) -> Bucket:
+# バケット判定ルール（classify_buckets と core.hand_rank）の版。同じボード・コンボで判定結果が変わる変更をしたら上げる
+# （mdf.bucket_db はこの版で作ったDBファイルだけを読み込む。tests/test_bucket_db.py が判定結果と版の対応を固定している）
+BUCKET_RULES_VERSION = 1
+
+# 役カテゴリの境界（強さの下限）
+_STRAIGHT_MIN = CATEGORY_START[HandCategory.STRAIGHT]
+_TRIPS_MIN = CATEGORY_START[HandCategory.THREE_OF_A_KIND]
+_TWO_PAIR_MIN = CATEGORY_START[HandCategory.TWO_PAIR]
+
+# 5連続ランクの窓（A2345〜TJQKA）を13bitランクマスクで表現
+_STRAIGHT_WINDOWS = [0b1000000001111] + [0b11111 << i for i in range(9)]
+
+# 13bitランクマスク → 5ランク窓に4枚以上（OESD・GS）
+_HAS_STRAIGHT_DRAW = tuple(
+    any((bits & w).bit_count() >= 4 for w in _STRAIGHT_WINDOWS) for bits in range(1 << 13)
+)
+
+
+def board_suit_counts(board: Iterable[CardId]) -> Tuple[int, int, int, int]:
+    """ボードのスート別枚数"""
+    counts = [0, 0, 0, 0]
+    for c in board:
+        counts[CARD_SUIT[c]] += 1
+    return counts[0], counts[1], counts[2], counts[3]
+
+
+@lru_cache(maxsize=None)
+def bucket_class_table(suit_counts: Tuple[int, int, int, int]) -> Tuple[int, ...]:
+    """
+    combo_index → バケット同値クラスID（ボードのスート別枚数ごと）。
+    バケットがスートに依存するのはフラッシュ/フラッシュドローだけなので、
+    ランクが同じで、スートの効き方（suitedでボードに同スート2枚 / 3枚以上、
+    オフスートの1枚でボードに同スート4枚以上）も同じコンボは同じバケットになる。
+    """
+    class_ids = {}
+    table = []
+    for c1, c2 in COMBOS:
+        n1 = suit_counts[CARD_SUIT[c1]]
+        n2 = suit_counts[CARD_SUIT[c2]]
+        if CARD_SUIT[c1] == CARD_SUIT[c2]:
+            # 0: 無関係, 1: フラッシュドロー, 2: フラッシュ
+            key = (CARD_RANK[c1], CARD_RANK[c2], 2 if n1 >= 3 else 1 if n1 == 2 else 0)
+        else:
+            k1 = (CARD_RANK[c1], n1 >= 4)
+            k2 = (CARD_RANK[c2], n2 >= 4)
+            key = (max(k1, k2), min(k1, k2))
+        table.append(class_ids.setdefault(key, len(class_ids)))
+    return tuple(table)
+
+
+def evaluate_hand_strength(hand: Tuple[CardId, CardId], board: List[CardId]) -> Bucket:
     """
-    ハンド2枚 + ボード3枚 から、バケットを判定する。
+    ハンド2枚 + ボード から、バケットを判定する。
     優先度順に判定し、最初に該当したものを返す。
     """
-    c1, c2 = hand
-    all_five = [c1, c2] + board
-
-    # ランクとスートの抽出
-    ranks = [c[0] for c in all_five]
-    suits = [c[1] for c in all_five]
-    rank_counts = Counter(ranks)
-    suit_counts = Counter(suits)
-
-    board_ranks = [c[0] for c in board]
-    board_suits = [c[1] for c in board]
-    hand_ranks = [c1[0], c2[0]]
-    hand_suits = [c1[1], c2[1]]
-
-    # ボードの最高ランク
-    r_top = max(board_ranks)
-
-    # ===== Priority 1: Monster =====
-    # straight以上 OR two pair以上 OR set
-
-    # フラッシュチェック（5枚中同スート5枚）
-    for count in suit_counts.values():
-        if count >= 5:
-            return Bucket.MONSTER
-
-    # ストレートチェック
-    unique_ranks = sorted(set(ranks), reverse=True)
-    # ホイール対応（A-2-3-4-5）
-    if set([14, 5, 4, 3, 2]).issubset(set(unique_ranks)):
-        return Bucket.MONSTER
-    # 通常ストレート
-    for i in range(len(unique_ranks) - 4):
-        if unique_ranks[i] - unique_ranks[i+4] == 4:
-            return Bucket.MONSTER
-
-    # カウント系役
-    pairs = [r for r, cnt in rank_counts.items() if cnt == 2]
-    trips = [r for r, cnt in rank_counts.items() if cnt == 3]
-    quads = [r for r, cnt in rank_counts.items() if cnt == 4]
-
-    if quads:
-        return Bucket.MONSTER
-    if trips:
-        # フルハウスまたはセット
-        if len(pairs) > 0:
-            # フルハウス
-            return Bucket.MONSTER
-        # セット（トリップス）
-        # ポケットがボードにヒットした場合のみセット
-        if hand_ranks[0] == hand_ranks[1] and hand_ranks[0] in trips:
-            return Bucket.MONSTER
-    if len(pairs) >= 2:
-        # ツーペア
-        # 両方がボードにヒットしたか確認
-        hand_hit_count = sum(1 for hr in hand_ranks if hr in board_ranks)
-        if hand_hit_count == 2:
-            return Bucket.MONSTER
-
-    # ===== Priority 2: Strong Made =====
-    # トップペア＆キッカー強い（k >= Q）、オーバーペア
-    for hr in hand_ranks:
-        if hr == r_top:
-            # トップペアを持っている
-            kicker = [r for r in hand_ranks if r != hr][0] if hand_ranks[0] != hand_ranks[1] else hr
-            if kicker >= 12:  # Q以上
-                return Bucket.STRONG_MADE
-
-    # オーバーペア（トップペアより強い）
-    if hand_ranks[0] == hand_ranks[1]:
-        pocket_rank = hand_ranks[0]
-        if pocket_rank > r_top:
-            return Bucket.STRONG_MADE
-
-    # ===== Priority 3: Weak Made =====
-    # トップペア（Strongでない）、2ndペア、3rdペア、ポケットペア（全て）
-
-    # トップペア（キッカー弱い）
-    for hr in hand_ranks:
-        if hr == r_top:
-            return Bucket.WEAK_MADE
-
-    # ポケットペア（ボードに絡んでいるか関係なく全て）
-    if hand_ranks[0] == hand_ranks[1]:
-        return Bucket.WEAK_MADE
-
-    # 2ndペア、3rdペア
-    board_ranks_sorted = sorted(set(board_ranks), reverse=True)
-    for hr in hand_ranks:
-        if len(board_ranks_sorted) >= 2 and hr == board_ranks_sorted[1]:
-            return Bucket.WEAK_MADE
-        if len(board_ranks_sorted) >= 3 and hr == board_ranks_sorted[2]:
-            return Bucket.WEAK_MADE
-
-    # ===== Priority 4: Draw =====
-    # FD, OESD, GS
-
-    # フラッシュドロー（手札2枚同スート、ボードに同スート2枚）
-    if hand_suits[0] == hand_suits[1]:
-        hand_suit = hand_suits[0]
-        board_suit_count = sum(1 for s in board_suits if s == hand_suit)
-        if board_suit_count == 2:
-            # 合計4枚同スート → FD
-            return Bucket.DRAW
-
-    # ストレートドロー（OESD, GS）
-    unique_5 = sorted(set(ranks), reverse=True)
-    # ホイール系も考慮
-    if 14 in unique_5:
-        unique_5_with_low_ace = unique_5 + [1]
-    else:
-        unique_5_with_low_ace = unique_5
-
-    # 4連続チェック（OESDまたはGS）
-    for i in range(len(unique_5_with_low_ace) - 3):
-        four = [unique_5_with_low_ace[i + j] for j in range(4)]
-        if max(four) - min(four) == 3:
-            # 4連続が揃っている（gap=0 → OESD確定）
-            return Bucket.DRAW
-        elif max(four) - min(four) == 4:
-            # 5ランクに4枚 → gap=1 → ガットショット
-            return Bucket.DRAW
-
-    # ===== Priority 5: SD Value =====
-    # A-high / K-high（未ヒット、かつDrawではない）
-
-    high_card = max(hand_ranks)
-    if high_card == 14:  # A-high
-        return Bucket.SD_VALUE
-    if high_card == 13:  # K-high
-        return Bucket.SD_VALUE
-
-    # ===== Priority 6: Air =====
-    return Bucket.AIR
+    return evaluate_range_buckets(board, [COMBO_INDEX[hand]])[0]
+
+
+def evaluate_range_buckets(board: List[CardId], combo_indices: Iterable[int]) -> List[Bucket]:
+    """
+    ボード + 複数コンボ（core.cards.COMBOS の index）をまとめてバケット判定する。
+    """
+    combo_indices = list(combo_indices)
+    return classify_buckets(board, combo_indices, hand_strengths(board, combo_indices))
+
+
+def hand_strengths(board: List[CardId], combo_indices: Sequence[int]) -> List[int]:
+    """各コンボの役の強さ（core.hand_rank、ホール2枚 + ボード）"""
+    board = list(board)
+    if len(board) == 3:
+        b1, b2, b3 = board
+        return [rank5(c1, c2, b1, b2, b3) for c1, c2 in (COMBOS[i] for i in combo_indices)]
+    return [evaluate_cards(list(COMBOS[i]) + board) for i in combo_indices]
+
+
+def extend_strengths(
+    board: List[CardId], combo_indices: Sequence[int], strengths: Sequence[int], card: CardId
+) -> List[int]:
+    """
+    board 上の強さ（hand_strengths）から、1枚追加した後の強さを差分で求める。
+    新しいカードを含む5枚組（ホール+ボードの4枚 + 新カード）だけを評価する。
+    """
+    board = list(board)
+    results = []
+    for i, strength in zip(combo_indices, strengths):
+        best = strength
+        for four in combinations(list(COMBOS[i]) + board, 4):
+            s = rank5(four[0], four[1], four[2], four[3], card)
+            if s > best:
+                best = s
+        results.append(best)
+    return results
+
+
+def classify_buckets(board: List[CardId], combo_indices: Sequence[int], strengths: Sequence[int]) -> List[Bucket]:
+    """
+    役の強さ（hand_strengths / extend_strengths）からバケットを判定する。
+    ボード側の集計は1回だけ行い、コンボごとの判定は比較のみ。
+
+    優先度（強い順）:
+      1. Monster: straight以上 OR two pair以上（両方ボードにヒット）OR set
+      2. Strong Made: トップペア＆キッカー強い（k >= Q）、オーバーペア
+      3. Weak Made: トップペア（キッカー弱い）、ポケットペア、2nd/3rdペア
+      4. Draw: FD, OESD, GS（リバーでは残りカードが無いので対象外）
+      5. SD Value: A-high / K-high
+      6. Air
+    """
+    # ===== ボード側の前処理 =====
+    board = list(board)
+    board_rank_count = [0] * 15
+    for c in board:
+        board_rank_count[CARD_RANK[c]] += 1
+    board_suit_count = [0] * 4
+    for c in board:
+        board_suit_count[CARD_SUIT[c]] += 1
+    board_rank_bits = 0
+    for c in board:
+        board_rank_bits |= RANK_BIT[c]
+
+    board_ranks_sorted = sorted({CARD_RANK[c] for c in board}, reverse=True)
+    r_top = board_ranks_sorted[0]
+    r_second = board_ranks_sorted[1] if len(board_ranks_sorted) >= 2 else None
+    r_third = board_ranks_sorted[2] if len(board_ranks_sorted) >= 3 else None
+
+    draws_possible = len(board) < 5
+
+    results = []
+    for i, strength in zip(combo_indices, strengths):
+        c1, c2 = COMBOS[i]
+        r1 = CARD_RANK[c1]
+        r2 = CARD_RANK[c2]
+        pocket = r1 == r2
+
+        # ===== Priority 1: Monster =====
+        if strength >= _STRAIGHT_MIN:
+            # ストレート・フラッシュ・フルハウス・クアッズ・ストフラ
+            results.append(Bucket.MONSTER)
+            continue
+        if strength >= _TRIPS_MIN:
+            # セット（ポケットがボードにヒット）のみ。トリップスは対象外
+            if pocket and board_rank_count[r1]:
+                results.append(Bucket.MONSTER)
+                continue
+        elif strength >= _TWO_PAIR_MIN:
+            # ツーペア（両方がボードにヒット）
+            if board_rank_count[r1] and board_rank_count[r2]:
+                results.append(Bucket.MONSTER)
+                continue
+
+        # ===== Priority 2: Strong Made =====
+        # トップペア＆キッカー強い（k >= Q）、オーバーペア
+        if pocket:
+            if r1 > r_top:  # r1 == r_top はセット（Monster）で判定済み
+                results.append(Bucket.STRONG_MADE)
+                continue
+        elif (r1 == r_top and r2 >= 12) or (r2 == r_top and r1 >= 12):
+            results.append(Bucket.STRONG_MADE)
+            continue
+
+        # ===== Priority 3: Weak Made =====
+        # トップペア（キッカー弱い）、ポケットペア（全て）、2ndペア、3rdペア
+        if pocket or r1 == r_top or r2 == r_top:
+            results.append(Bucket.WEAK_MADE)
+            continue
+        if r1 == r_second or r2 == r_second or r1 == r_third or r2 == r_third:
+            results.append(Bucket.WEAK_MADE)
+            continue
+
+        # ===== Priority 4: Draw =====
+        if draws_possible:
+            # フラッシュドロー（手札2枚同スート、ボードに同スート2枚）
+            s1 = CARD_SUIT[c1]
+            if s1 == CARD_SUIT[c2] and board_suit_count[s1] == 2:
+                results.append(Bucket.DRAW)
+                continue
+            # ストレートドロー（OESD, GS）
+            if _HAS_STRAIGHT_DRAW[board_rank_bits | RANK_BIT[c1] | RANK_BIT[c2]]:
+                results.append(Bucket.DRAW)
+                continue
+
+        # ===== Priority 5: SD Value =====
+        # A-high / K-high（未ヒット、かつDrawではない）
+        if r1 >= 13 or r2 >= 13:
+            results.append(Bucket.SD_VALUE)
+            continue
+
+        # ===== Priority 6: Air =====
+        results.append(Bucket.AIR)
+
+    return results
@@ -0,0 +1,123 @@
+# mdf/streets.py
+"""
+ターン・リバー対応（フロップの状態を差分更新）。
+
+フロップで計算したコンボごとの状態（生存コンボ、役の強さ）を持ち回し、
+カードが1枚増えるたびに「新しいカードを含む5枚組」だけを評価して更新する。
+1つの状態から多数のランアウトを見る runout_distribution（/mdf/runouts）で使う。
+問題・答え合わせの1ボードの分析は mdf.analysis が代表コンボを直接評価する。
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+from core.enums import CardId, Bucket, BUCKET_ORDER
+from core.cards import DECK, COMBO_MASK, CARD_BIT, cards_mask
+from core.range_combos import ComboRange
+from mdf.evaluator import (
+    board_suit_counts,
+    bucket_class_table,
+    classify_buckets,
+    extend_strengths,
+    hand_strengths,
+)
+
+
+# ボード枚数 → ストリート名
+STREET_NAMES = {3: "flop", 4: "turn", 5: "river"}
+
+
+@dataclass(frozen=True)
+class StreetState:
+    """あるストリートでのレンジの状態"""
+    board: Tuple[CardId, ...]
+    combo_indices: Tuple[int, ...]  # ボードと被らないコンボ
+    strengths: Tuple[int, ...]      # 各コンボの役の強さ（core.hand_rank）
+
+    @property
+    def street(self) -> str:
+        return STREET_NAMES[len(self.board)]
+
+    def buckets(self) -> List[Bucket]:
+        return classify_buckets(list(self.board), self.combo_indices, self.strengths)
+
+
+def flop_state(range_combos: ComboRange, flop: List[CardId]) -> StreetState:
+    """フロップの状態を作る"""
+    indices = tuple(range_combos.without(cards_mask(flop)))
+    return StreetState(tuple(flop), indices, tuple(hand_strengths(flop, indices)))
+
+
+def next_street(state: StreetState, card: CardId) -> StreetState:
+    """1枚追加した次のストリートの状態（カードと被るコンボを除き、強さを差分更新）"""
+    card_bit = CARD_BIT[card]
+    kept = [(i, s) for i, s in zip(state.combo_indices, state.strengths) if not COMBO_MASK[i] & card_bit]
+    indices = tuple(i for i, _ in kept)
+    strengths = extend_strengths(list(state.board), indices, [s for _, s in kept], card)
+    return StreetState(state.board + (card,), indices, tuple(strengths))
+
+
+def street_state(range_combos: ComboRange, board: List[CardId]) -> StreetState:
+    """フロップから順にカードを追加してボードの状態を作る"""
+    state = flop_state(range_combos, board[:3])
+    for card in board[3:]:
+        state = next_street(state, card)
+    return state
+
+
+def runout_distribution(range_combos: ComboRange, board: List[CardId]) -> Dict[str, Any]:
+    """
+    次のストリートの全ランアウト（フロップなら47/49枚、ターンなら46/48枚）での
+    バケット分布の平均を返す。
+
+    現在のストリートの状態を1回作り、各ランアウトではバケット同値クラス
+    （mdf.evaluator.bucket_class_table）の代表コンボだけ差分更新・判定する。
+
+    Returns:
+        {
+            'street': str,          # 集計対象のストリート（'turn' / 'river'）
+            'runouts': int,
+            'buckets': [{'name': str, 'avg_count': float, 'pct': float}, ...],
+        }
+    """
+    state = street_state(range_combos, board)
+    board = list(state.board)
+    dead = cards_mask(board)
+
+    totals = [0] * len(BUCKET_ORDER)
+    runouts = 0
+    for card in DECK:
+        if dead & CARD_BIT[card]:
+            continue
+        runouts += 1
+        card_bit = CARD_BIT[card]
+        class_of = bucket_class_table(board_suit_counts(board + [card]))
+
+        # クラスごとの代表（と強さ）とコンボ数
+        reps: Dict[int, Tuple[int, int]] = {}
+        class_size: Dict[int, int] = {}
+        for i, strength in zip(state.combo_indices, state.strengths):
+            if COMBO_MASK[i] & card_bit:
+                continue
+            cls = class_of[i]
+            if cls not in reps:
+                reps[cls] = (i, strength)
+                class_size[cls] = 0
+            class_size[cls] += 1
+
+        rep_indices = [i for i, _ in reps.values()]
+        strengths = extend_strengths(board, rep_indices, [s for _, s in reps.values()], card)
+        for cls, bucket in zip(reps.keys(), classify_buckets(board + [card], rep_indices, strengths)):
+            totals[BUCKET_ORDER.index(bucket)] += class_size[cls]
+
+    grand_total = sum(totals)
+    return {
+        'street': STREET_NAMES.get(len(board) + 1, ''),
+        'runouts': runouts,
+        'buckets': [
+            {
+                'name': bucket.value,
+                'avg_count': round(count / runouts, 1) if runouts else 0.0,
+                'pct': round(count / grand_total * 100, 1) if grand_total else 0.0,
+            }
+            for bucket, count in zip(BUCKET_ORDER, totals)
+        ],
+    }
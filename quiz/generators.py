@@ -1,26 +1,43 @@
 # quiz/generators.py
 import random
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional, Tuple
 from core.enums import StudyMode, Position, POSITIONS
 from core.utils_hand import random_hand, hand_label
-from core.ranges_open import in_open_range
-from core.ranges_3bet import three_bet_allowed_actions
-from core.ranges_3bet_defence import three_bet_defence_action
-from core.ranges_bb_defence import bb_defence_vs_open
-from core.ranges_sb_open import sb_first_in_action
-from core.power_number import should_shove_with_power_number
-from core.cards import generate_board, card_to_str
-from core.range_combos import get_range_combos
-from mdf.analysis import calculate_mdf_analysis
-
-
-def generate_open_range_question() -> Dict[str, Any]:
+from core.range_store import decision_tables
+from core.power_number import shove_with_power_number
+from core.cards import generate_board, card_to_str, format_board
+from mdf.analysis import question_mdf_analysis
+from mdf.streets import STREET_NAMES
+from equity.push_fold import nash_shove_frequency, position_blind, DEAD_MONEY
+from equity.icm import called_shove_thresholds, DEFAULT_PAYOUTS
+
+
+# MDF Trainer の bet size候補（v1仕様）
+MDF_BET_SIZES = [0.25, 0.33, 0.50, 0.80, 1.25]
+
+# MDF Trainer のボード枚数候補（フロップ / ターン / リバー）
+MDF_BOARD_SIZES = [3, 4, 5]
+
+# MIX で出題するモード（MIX以外の全モード）
+MIX_MODES = [
+    StudyMode.OPEN_RANGE,
+    StudyMode.SB_OPEN,
+    StudyMode.THREE_BET,
+    StudyMode.THREE_BET_DEFENCE,
+    StudyMode.POWER_NUMBER,
+    StudyMode.BB_DEFENCE,
+    StudyMode.MDF_TRAINER,
+]
+
+
+def generate_open_range_question(rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    rng = rng or random
     # SBを除外（SB_OPENモードで別途扱う）
-    hero_pos = random.choice(POSITIONS)
-    hi, lo, suited = random_hand()
+    hero_pos = rng.choice(POSITIONS)
+    hi, lo, suited = random_hand(rng)
     label = hand_label(hi, lo, suited)
 
-    correct = "open" if in_open_range(hero_pos, hi, lo, suited) else "fold"
+    correct = "open" if decision_tables().in_open_range(hero_pos, hi, lo, suited) else "fold"
 
     return {
         "mode": StudyMode.OPEN_RANGE.value,
@@ -36,12 +53,13 @@ def generate_open_range_question() -> Dict[str, Any]:
     }
 
 
-def generate_sb_open_question() -> Dict[str, Any]:
+def generate_sb_open_question(rng: Optional[random.Random] = None) -> Dict[str, Any]:
     """SB first-in専用の問題生成（raise/limp/fold の3択）"""
-    hi, lo, suited = random_hand()
+    rng = rng or random
+    hi, lo, suited = random_hand(rng)
     label = hand_label(hi, lo, suited)
 
-    correct = sb_first_in_action(hi, lo, suited)
+    correct = decision_tables().sb_first_in_action(hi, lo, suited)
 
     return {
         "mode": StudyMode.SB_OPEN.value,
@@ -57,22 +75,23 @@ def generate_sb_open_question() -> Dict[str, Any]:
     }
 
 
-def generate_three_bet_question() -> Dict[str, Any]:
+def generate_three_bet_question(rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    rng = rng or random
     # VillainポジションをBTN以外（UTG〜CO）からランダムに選択
     # POSITIONS = [UTG, UTG+1, UTG+2, LJ, HJ, CO, BTN]
     # インデックス 0〜5 がBTN以外
     villain_positions = POSITIONS[:-1]  # BTNを除外
-    villain_pos = random.choice(villain_positions)
+    villain_pos = rng.choice(villain_positions)
 
     # Heroポジションは Villainより後ろのポジションからランダムに選ぶ
     villain_idx = POSITIONS.index(villain_pos)
     # villain_idx + 1 から最後まで（BTN含む）
     hero_positions = POSITIONS[villain_idx + 1:]
-    hero_pos = random.choice(hero_positions)
+    hero_pos = rng.choice(hero_positions)
 
-    hi, lo, suited = random_hand()
+    hi, lo, suited = random_hand(rng)
     label = hand_label(hi, lo, suited)
-    allowed = three_bet_allowed_actions(hero_pos, villain_pos, hi, lo, suited)
+    allowed = decision_tables().three_bet_allowed_actions(hero_pos, villain_pos, hi, lo, suited)
 
     correct_action = ",".join(sorted(allowed))  # "3bet,call" など
 
@@ -90,29 +109,28 @@ def generate_three_bet_question() -> Dict[str, Any]:
     }
 
 
-def generate_three_bet_defence_question() -> Dict[str, Any]:
+def generate_three_bet_defence_question(rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    rng = rng or random
     # Heroは常にオープナー。UTG〜BTN からランダムで選ぶ
-    hero_pos = random.choice(POSITIONS)
+    hero_pos = rng.choice(POSITIONS)
 
-    # Heroのオープンレンジ内からハンドをサンプル
-    while True:
-        hi, lo, suited = random_hand()
-        if in_open_range(hero_pos, hi, lo, suited):
-            break
+    # Heroのオープンレンジ内からハンドをサンプル（コンボ頻度で重み付け、棄却なし）
+    hand = decision_tables().random_open_hand(hero_pos, rng)
+    hi, lo, suited = hand if hand is not None else random_hand(rng)
 
     # BTNだけは SB / BB から3betされるケースを明示的に作る（HeroはIP）
     if hero_pos == Position.BTN:
-        villain_pos = random.choice([Position.SB, Position.BB])
+        villain_pos = rng.choice([Position.SB, Position.BB])
         in_pos = True
     else:
         # それ以外は「自分より後ろのポジション」から3betされる前提（HeroはOOP）
         hero_idx = POSITIONS.index(hero_pos)
-        v_idx = random.randint(hero_idx + 1, len(POSITIONS) - 1)
+        v_idx = rng.randint(hero_idx + 1, len(POSITIONS) - 1)
         villain_pos = POSITIONS[v_idx]
         in_pos = False
 
     label = hand_label(hi, lo, suited)
-    action = three_bet_defence_action(hero_pos, in_pos, hi, lo, suited)
+    action = decision_tables().three_bet_defence_action(hero_pos, in_pos, hi, lo, suited)
 
     return {
         "mode": StudyMode.THREE_BET_DEFENCE.value,
@@ -128,17 +146,38 @@ def generate_three_bet_defence_question() -> Dict[str, Any]:
     }
 
 
-def generate_power_number_question() -> Dict[str, Any]:
-    hero_pos = random.choice(POSITIONS)
+def icm_shove_thresholds(hero_pos: Position, m_value: float) -> Tuple[float, float]:
+    """
+    9人・全員同じスタック（M値）で、BBにコールされたときの必要勝率（チップEV, ICM）。
+    配当は equity.icm.DEFAULT_PAYOUTS。スタック・アンティの扱いはプッシュ/フォールドチャートと同じ
+    （ブラインドを出す前のスタックが M × 2.5BB、BBアンティはスタックの外）。
+    """
+    seats = POSITIONS + [Position.SB, Position.BB]
+    stacks = [m_value * DEAD_MONEY] * len(seats)
+    blinds = [position_blind(pos) for pos in seats]
+    return called_shove_thresholds(
+        stacks, blinds, DEFAULT_PAYOUTS, seats.index(hero_pos), seats.index(Position.BB), DEAD_MONEY
+    )
+
+
+def generate_power_number_question(rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    rng = rng or random
+    hero_pos = rng.choice(POSITIONS)
     # M値は 1.0〜5.5 のどこか
-    m_value = round(random.uniform(1.0, 5.5), 1)
+    m_value = round(rng.uniform(1.0, 5.5), 1)
 
-    hi, lo, suited = random_hand()
+    hi, lo, suited = random_hand(rng)
     label = hand_label(hi, lo, suited)
 
-    shove = should_shove_with_power_number(hero_pos, hi, lo, suited, m_value)
+    pn = decision_tables().assign_power_number(hero_pos, hi, lo, suited)
+    shove = shove_with_power_number(hero_pos, pn, m_value)
     correct = "shove" if shove else "fold"
 
+    # 均衡チャート上のシャブ頻度（PNルールとのズレ表示用）
+    nash_freq = nash_shove_frequency(hero_pos, hi, lo, suited, m_value)
+    # BBにコールされたときの必要勝率（ICMでどれだけ厳しくなるか）
+    chip_threshold, icm_threshold = icm_shove_thresholds(hero_pos, m_value)
+
     return {
         "mode": StudyMode.POWER_NUMBER.value,
         "hero_pos": hero_pos.value,
@@ -150,10 +189,14 @@ def generate_power_number_question() -> Dict[str, Any]:
         "m_value": m_value,
         "in_position": None,
         "correct_action": correct,
+        "nash_shove_freq": round(nash_freq * 100, 1) if nash_freq is not None else None,
+        "chip_required_equity": round(chip_threshold * 100, 1),
+        "icm_required_equity": round(icm_threshold * 100, 1),
     }
 
 
-def generate_bb_defence_question() -> Dict[str, Any]:
+def generate_bb_defence_question(rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    rng = rng or random
     # VillainポジションはUTG〜BTN（BBを除く）からランダムに選択
     villain_positions = [
         Position.UTG,
@@ -164,12 +207,12 @@ def generate_bb_defence_question() -> Dict[str, Any]:
         Position.CO,
         Position.BTN,
     ]
-    villain_pos = random.choice(villain_positions)
+    villain_pos = rng.choice(villain_positions)
 
-    hi, lo, suited = random_hand()
+    hi, lo, suited = random_hand(rng)
     label = hand_label(hi, lo, suited)
 
-    defend = bb_defence_vs_open(villain_pos, hi, lo, suited)
+    defend = decision_tables().bb_defence_vs_open(villain_pos, hi, lo, suited)
     correct = "defend" if defend else "fold"
 
     return {
@@ -186,15 +229,16 @@ def generate_bb_defence_question() -> Dict[str, Any]:
     }
 
 
-def generate_mdf_trainer_question() -> Dict[str, Any]:
+def generate_mdf_trainer_question(rng: Optional[random.Random] = None) -> Dict[str, Any]:
     """
     MDF Trainerモードの問題を生成する。
     1. ランダムにレンジを選択
-    2. ボードを生成
+    2. ストリート（フロップ/ターン/リバー）を選んでボードを生成
     3. bet sizeをランダムに選択
     4. MDF計算を実行
     5. 正解はcutoff_bucket
     """
+    rng = rng or random
     # レンジ候補（仕様に沿った候補）
     range_options = [
         "OPEN_UTG",
@@ -210,22 +254,18 @@ def generate_mdf_trainer_question() -> Dict[str, Any]:
         "BB_DEFENCE_vs_BTN",
         "SB_RFI",
     ]
-    range_name = random.choice(range_options)
+    range_name = rng.choice(range_options)
 
     # ボード生成
-    board = generate_board()
+    board = generate_board(rng.choice(MDF_BOARD_SIZES), rng)
     board_display = [card_to_str(c) for c in board]  # 表示用（絵文字）
-    board_raw = [f"{c[0]}{c[1]}" for c in board]  # hidden field用（数値形式）
+    board_raw = format_board(board)  # トークン・API用（例: "14s,7h,2c"）
 
     # bet size候補（v1仕様）
-    bet_sizes = [0.25, 0.33, 0.50, 0.80, 1.25]
-    bet_size = random.choice(bet_sizes)
+    bet_size = rng.choice(MDF_BET_SIZES)
 
-    # レンジコンボ取得
-    range_combos = get_range_combos(range_name)
-
-    # MDF分析実行
-    analysis = calculate_mdf_analysis(range_combos, board, bet_size)
+    # MDF分析実行（採点時はこのキャッシュを引く）
+    analysis = question_mdf_analysis(range_name, board_raw, bet_size)
 
     # 正解はcutoff_bucket
     correct_bucket = analysis['cutoff_bucket']
@@ -234,7 +274,8 @@ def generate_mdf_trainer_question() -> Dict[str, Any]:
         "mode": StudyMode.MDF_TRAINER.value,
         "range_name": range_name,
         "board": board_display,  # 表示用
-        "board_raw": ",".join(board_raw),  # hidden field用（カンマ区切り）
+        "board_raw": board_raw,  # hidden field用（カンマ区切り）
+        "street": STREET_NAMES[len(board)],
         "bet_size": bet_size,
         "correct_action": correct_bucket,  # 正解バケット
         "analysis": analysis,  # 答え合わせ用データ
@@ -250,30 +291,33 @@ def generate_mdf_trainer_question() -> Dict[str, Any]:
     }
 
 
-def generate_question(mode: StudyMode) -> Dict[str, Any]:
+def generate_question(mode: StudyMode, rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    rng = rng or random
     if mode == StudyMode.OPEN_RANGE:
-        return generate_open_range_question()
+        return generate_open_range_question(rng)
     elif mode == StudyMode.SB_OPEN:
-        return generate_sb_open_question()
+        return generate_sb_open_question(rng)
     elif mode == StudyMode.THREE_BET:
-        return generate_three_bet_question()
+        return generate_three_bet_question(rng)
     elif mode == StudyMode.THREE_BET_DEFENCE:
-        return generate_three_bet_defence_question()
+        return generate_three_bet_defence_question(rng)
     elif mode == StudyMode.POWER_NUMBER:
-        return generate_power_number_question()
+        return generate_power_number_question(rng)
     elif mode == StudyMode.BB_DEFENCE:
-        return generate_bb_defence_question()
+        return generate_bb_defence_question(rng)
     elif mode == StudyMode.MDF_TRAINER:
-        return generate_mdf_trainer_question()
+        return generate_mdf_trainer_question(rng)
     else:
         # MIX の時は7モードからランダム（SB_OPEN, MDF_TRAINER含む）
-        base_mode = random.choice([
-            StudyMode.OPEN_RANGE,
-            StudyMode.SB_OPEN,
-            StudyMode.THREE_BET,
-            StudyMode.THREE_BET_DEFENCE,
-            StudyMode.POWER_NUMBER,
-            StudyMode.BB_DEFENCE,
-            StudyMode.MDF_TRAINER,
-        ])
-        return generate_question(base_mode)
+        base_mode = rng.choice(MIX_MODES)
+        return generate_question(base_mode, rng)
+
+
+def generate_questions(mode: StudyMode, n: int, seed: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    n問を順に生成する。seed を渡すと呼び出しごとの乱数（random.Random）を使うので、
+    同じ seed なら同じ問題列になる（グローバル乱数・他のリクエストの影響を受けない）。
+    """
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield generate_question(mode, rng)
@@ -0,0 +1,156 @@
+# quiz/pool.py
+"""
+StudyModeごとの出題済みストック（事前生成プール）。
+
+ハンドラはプールから1問取り出すだけにして、問題生成（MDFのバケット分析など）は
+バックグラウンドのスレッドで補充する。プールが空のときだけその場で生成する。
+
+メトリクス（GET /metrics/question-pool）:
+  depth          現在のストック数
+  hits / misses  プールから出せた回数 / その場で生成した回数
+  refill_lag_ms  ストックが下限（QUESTION_POOL_LOW_WATER）を割ってから満杯に戻るまでの時間（直近 / 最大）
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from core.enums import StudyMode
+from core.range_store import add_reload_listener
+from quiz.generators import generate_question, MIX_MODES
+
+
+QUESTION_POOL_SIZE = int(os.environ.get("QUESTION_POOL_SIZE", "32"))
+QUESTION_POOL_LOW_WATER = int(os.environ.get("QUESTION_POOL_LOW_WATER", str(QUESTION_POOL_SIZE // 2)))
+
+
+class QuestionPool:
+    def __init__(self, size: int = QUESTION_POOL_SIZE, low_water: int = QUESTION_POOL_LOW_WATER):
+        self.size = size
+        self.low_water = min(low_water, size)
+        self._queues: Dict[StudyMode, Deque[Dict[str, Any]]] = {mode: deque() for mode in MIX_MODES}
+        self._hits = {mode: 0 for mode in MIX_MODES}
+        self._misses = {mode: 0 for mode in MIX_MODES}
+        # 下限を割った時刻（満杯に戻ったら None）と補充にかかった時間
+        self._low_since: Dict[StudyMode, Optional[float]] = {mode: time.monotonic() for mode in MIX_MODES}
+        self._last_lag = {mode: 0.0 for mode in MIX_MODES}
+        self._max_lag = {mode: 0.0 for mode in MIX_MODES}
+        # clear() のたびに増える。補充中に変わったら、その問題は古いレンジで作ったものなので捨てる
+        self._generation = 0
+        self._lock = threading.Lock()  # clear() と補充の「世代確認 → 追加」を排他にする
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def pick_mode(self, mode: StudyMode) -> StudyMode:
+        """出題するモード（MIX は各モードからランダムに）"""
+        return mode if mode in self._queues else random.choice(MIX_MODES)
+
+    def pop(self, mode: StudyMode) -> Dict[str, Any]:
+        """1問取り出す。ストックが無ければその場で生成する"""
+        mode = self.pick_mode(mode)
+        question = self.pop_ready(mode)
+        if question is None:
+            question = generate_question(mode)
+            self._misses[mode] += 1
+            self._taken(mode)
+        return question
+
+    def pop_ready(self, mode: StudyMode) -> Optional[Dict[str, Any]]:
+        """ストックから1問取り出す（生成はしない）。ストックが無ければ None"""
+        mode = self.pick_mode(mode)
+        try:
+            question = self._queues[mode].popleft()
+        except IndexError:
+            return None
+        self._hits[mode] += 1
+        self._taken(mode)
+        return question
+
+    def _taken(self, mode: StudyMode) -> None:
+        """1問出した後の記録と補充の依頼"""
+        if self._low_since[mode] is None and len(self._queues[mode]) < self.low_water:
+            self._low_since[mode] = time.monotonic()
+        self._wakeup.set()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def put_back(self, mode: StudyMode, question: Dict[str, Any], generation: int) -> None:
+        """
+        使われなかった問題をストックの先頭に戻す（満杯なら捨てる）。
+        generation は問題を取り出す前の self.generation。その間に clear() されていたら捨てる
+        """
+        with self._lock:
+            queue = self._queues[mode]
+            if generation == self._generation and len(queue) < self.size:
+                queue.appendleft(question)
+
+    def clear(self) -> None:
+        """ストックを捨てる（レンジ差し替え時など）。補充中の問題も捨てられる"""
+        with self._lock:
+            self._generation += 1
+            for mode, queue in self._queues.items():
+                queue.clear()
+                if self._low_since[mode] is None:
+                    self._low_since[mode] = time.monotonic()
+        self._wakeup.set()
+
+    def refill(self) -> None:
+        """全モードを満杯まで補充する（少ないモードから1問ずつ）"""
+        while not self._stop.is_set():
+            mode = min(self._queues, key=lambda m: len(self._queues[m]))
+            queue = self._queues[mode]
+            if len(queue) >= self.size:
+                break
+            generation = self._generation
+            question = generate_question(mode)
+            with self._lock:
+                if generation != self._generation:
+                    continue
+                queue.append(question)
+            if len(queue) >= self.size and self._low_since[mode] is not None:
+                lag = time.monotonic() - self._low_since[mode]
+                self._last_lag[mode] = lag
+                self._max_lag[mode] = max(self._max_lag[mode], lag)
+                self._low_since[mode] = None
+
+    def start(self) -> None:
+        """補充スレッドを起動する（起動時に1回）"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="question-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            self.refill()
+            self._wakeup.wait()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "modes": {
+                mode.value: {
+                    "depth": len(self._queues[mode]),
+                    "hits": self._hits[mode],
+                    "misses": self._misses[mode],
+                    "refill_lag_ms": round(self._last_lag[mode] * 1000, 1),
+                    "max_refill_lag_ms": round(self._max_lag[mode] * 1000, 1),
+                }
+                for mode in MIX_MODES
+            },
+        }
+
+
+QUESTION_POOL = QuestionPool()
+
+# レンジが差し替わったら古いレンジで作った問題を捨てる
+add_reload_listener(lambda ranges: QUESTION_POOL.clear())
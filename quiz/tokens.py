@@ -0,0 +1,120 @@
+# quiz/tokens.py
+"""
+出題した問題を1つの署名付きトークンにする（フォームの hidden・共有URL用）。
+
+  トークン = base64url(JSON配列) + "." + base64url(HMAC-SHA256 の先頭16バイト)
+
+JSON配列は問題の状態と正解（correct_action）をそのまま持つので、採点は署名の検証だけで済み、
+正解を書き換えたフォームは検証で弾かれる。MDFの分析結果はトークンに入れず、
+(range_name, board_raw, bet_size) をキーに mdf.analysis.question_mdf_analysis のキャッシュから引く。
+
+署名の鍵は環境変数 POKER_QUESTION_SECRET。未設定ならプロセスごとのランダムな鍵になり、
+再起動・別インスタンスでは以前のトークンが無効になる（本番では必ず設定する）。
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+from typing import Any, Dict
+from core.enums import StudyMode
+from core.utils_hand import hand_label
+from core.cards import card_to_str, parse_board
+from mdf.streets import STREET_NAMES
+
+
+logger = logging.getLogger(__name__)
+
+TOKEN_VERSION = 1
+SIGNATURE_BYTES = 16
+
+# トークンに入れる問題のフィールド（この順で配列にする）
+TOKEN_FIELDS = (
+    "mode",
+    "hero_pos",
+    "villain_pos",
+    "hand_hi",
+    "hand_lo",
+    "suited",
+    "m_value",
+    "in_position",
+    "correct_action",
+    # MDF用
+    "range_name",
+    "board_raw",
+    "bet_size",
+)
+
+
+def _load_secret() -> bytes:
+    secret = os.environ.get("POKER_QUESTION_SECRET")
+    if secret:
+        return secret.encode("utf-8")
+    logger.warning("POKER_QUESTION_SECRET is not set; question tokens are valid for this process only")
+    return secrets.token_bytes(32)
+
+
+QUESTION_SECRET = _load_secret()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: str) -> str:
+    digest = hmac.new(QUESTION_SECRET, payload.encode("ascii"), hashlib.sha256).digest()
+    return _b64encode(digest[:SIGNATURE_BYTES])
+
+
+def encode_question(question: Dict[str, Any]) -> str:
+    """問題をトークンにする"""
+    values = [TOKEN_VERSION] + [question.get(name) for name in TOKEN_FIELDS]
+    payload = _b64encode(json.dumps(values, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_sign(payload)}"
+
+
+def issue_question(question: Dict[str, Any]) -> Dict[str, Any]:
+    """問題にトークン（question['token']）を付けて返す"""
+    question["token"] = encode_question(question)
+    return question
+
+
+def decode_question(token: str) -> Dict[str, Any]:
+    """
+    トークンを検証して問題を復元する（表示用のフィールドも付ける。MDF分析は付けない）。
+    署名・形式が不正なら ValueError。
+    """
+    payload, _, signature = token.partition(".")
+    try:
+        expected = _sign(payload).encode("ascii")
+    except UnicodeEncodeError as e:  # 正しいトークンは ASCII だけ
+        raise ValueError("invalid question token") from e
+    # compare_digest は非ASCIIの str で TypeError になるので bytes で比べる
+    if not signature or not hmac.compare_digest(signature.encode("utf-8"), expected):
+        raise ValueError("invalid question token signature")
+    try:
+        values = json.loads(_b64decode(payload))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"malformed question token: {e}") from e
+    if not isinstance(values, list) or len(values) != len(TOKEN_FIELDS) + 1 or values[0] != TOKEN_VERSION:
+        raise ValueError("unsupported question token")
+
+    question = dict(zip(TOKEN_FIELDS, values[1:]))
+    question["token"] = token
+    hi, lo, suited = question["hand_hi"], question["hand_lo"], question["suited"]
+    question["hand_label"] = hand_label(hi, lo, suited) if hi and lo else ""
+
+    if question["mode"] == StudyMode.MDF_TRAINER.value:
+        board_cards = parse_board(question["board_raw"])
+        question.update({
+            "board": [card_to_str(c) for c in board_cards],
+            "street": STREET_NAMES.get(len(board_cards), ""),
+        })
+    return question
@@ -0,0 +1,65 @@
+# tests/test_bucket_db.py
+import random
+import zlib
+import pytest
+import mdf.bucket_db as bucket_db
+from core.cards import COMBOS, DECK, cards_mask, dead_combo_bits
+from core.enums import BUCKET_ORDER
+from core.isomorphism import canonical_flops
+from mdf.evaluator import BUCKET_RULES_VERSION, evaluate_range_buckets
+
+# バケット判定ルールの版 → サンプルボードでの判定結果のCRC32。
+# 判定が変わる変更をしたら BUCKET_RULES_VERSION を上げて、ここに新しい値を足す（古いDBを読まないようにするため）
+RULES_FINGERPRINTS = {
+    1: 2290749625,
+}
+
+
+def rules_fingerprint() -> int:
+    rng = random.Random(0)
+    checksum = 0
+    for num_cards in (3, 3, 3, 3, 4, 4, 5, 5):
+        board = rng.sample(DECK, num_cards)
+        dead = dead_combo_bits(cards_mask(board))
+        indices = [i for i in range(len(COMBOS)) if not (dead >> i) & 1]
+        codes = bytes(BUCKET_ORDER.index(b) for b in evaluate_range_buckets(board, indices))
+        checksum = zlib.crc32(codes, checksum)
+    return checksum
+
+
+def test_rules_version_matches_rules():
+    assert rules_fingerprint() == RULES_FINGERPRINTS[BUCKET_RULES_VERSION]
+
+
+@pytest.fixture
+def small_db(tmp_path, monkeypatch):
+    """正準フロップの一部だけで作ったDBファイル"""
+    monkeypatch.setattr(bucket_db, "canonical_flops", lambda: canonical_flops()[::150])
+    path = str(tmp_path / "buckets.bin")
+    bucket_db.build_bucket_db(path)
+    return path
+
+
+def test_round_trip(small_db):
+    db = bucket_db.load_bucket_db(small_db)
+    assert db is not None
+    for flop in canonical_flops()[::150]:
+        row = db.row(flop)
+        dead = dead_combo_bits(cards_mask(flop))
+        indices = [i for i in range(len(COMBOS)) if not (dead >> i) & 1]
+        assert [BUCKET_ORDER[row[i]] for i in indices] == evaluate_range_buckets(list(flop), indices)
+        assert all(row[i] == bucket_db.BLOCKED for i in range(len(COMBOS)) if (dead >> i) & 1)
+
+
+def test_other_rules_version_is_rejected(small_db, monkeypatch):
+    monkeypatch.setattr(bucket_db, "BUCKET_RULES_VERSION", BUCKET_RULES_VERSION + 1)
+    assert bucket_db.load_bucket_db(small_db) is None
+
+
+def test_corrupted_file_is_rejected(small_db):
+    with open(small_db, "r+b") as f:
+        f.seek(-1, 2)
+        last = f.read(1)
+        f.seek(-1, 2)
+        f.write(bytes([last[0] ^ 1]))
+    assert bucket_db.load_bucket_db(small_db) is None
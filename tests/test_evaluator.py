@@ -0,0 +1,30 @@
+# tests/test_evaluator.py
+import random
+import pytest
+from core.cards import COMBOS, DECK, cards_mask, dead_combo_bits
+from mdf.evaluator import evaluate_hand_strength, evaluate_range_buckets
+from tests.baseline_evaluator import evaluate_hand_strength as baseline_hand_strength
+
+
+def sampled_flops(n: int, seed: int):
+    rng = random.Random(seed)
+    return [rng.sample(DECK, 3) for _ in range(n)]
+
+
+def live_combos(board):
+    dead = dead_combo_bits(cards_mask(board))
+    return [i for i in range(len(COMBOS)) if not (dead >> i) & 1]
+
+
+@pytest.mark.parametrize("board", sampled_flops(20, seed=5))
+def test_batch_evaluator_matches_baseline(board):
+    indices = live_combos(board)
+    expected = [baseline_hand_strength(COMBOS[i], board) for i in indices]
+    assert evaluate_range_buckets(board, indices) == expected
+
+
+@pytest.mark.parametrize("board", sampled_flops(5, seed=6))
+def test_single_combo_matches_baseline(board):
+    for i in live_combos(board)[::37]:
+        assert evaluate_hand_strength(COMBOS[i], board) == baseline_hand_strength(COMBOS[i], board)
+
@@ -0,0 +1,81 @@
+# tests/test_executor.py
+import asyncio
+import threading
+import pytest
+import web.executor as executor
+from web.executor import MDFBusy, MDFTimeout, run_mdf
+
+
+@pytest.fixture
+def slots(monkeypatch):
+    """MDFの枠を2つにして、テストの間だけ差し替える"""
+    semaphore = threading.BoundedSemaphore(2)
+    monkeypatch.setattr(executor, "_mdf_slots", semaphore)
+    monkeypatch.setattr(executor, "MDF_CONCURRENCY", 2)
+    return semaphore
+
+
+def free_slots(semaphore: threading.BoundedSemaphore) -> int:
+    """今すぐ取れる枠の数（取った分はすぐ返す）"""
+    taken = 0
+    while semaphore.acquire(blocking=False):
+        taken += 1
+    for _ in range(taken):
+        semaphore.release()
+    return taken
+
+
+def test_returns_result(slots):
+    assert asyncio.run(run_mdf(sum, [1, 2, 3])) == 6
+    assert free_slots(slots) == 2
+
+
+def test_timeout_keeps_slot_until_finished_and_delivers_late_result(slots):
+    release = threading.Event()
+    late = []
+    done = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return "late"
+
+    async def scenario():
+        with pytest.raises(MDFTimeout):
+            await run_mdf(slow, timeout=0.05, on_late_result=lambda r: (late.append(r), done.set()))
+        # 時間切れでも処理は続いているので、枠は返っていない
+        assert free_slots(slots) == 1
+        release.set()
+        await asyncio.get_running_loop().run_in_executor(None, done.wait, 5)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert late == ["late"]
+    assert free_slots(slots) == 2
+
+
+def test_full_slots_fail_fast(slots):
+    release = threading.Event()
+
+    async def scenario():
+        try:
+            for _ in range(2):
+                with pytest.raises(MDFTimeout):
+                    await run_mdf(release.wait, 5, timeout=0.01)
+            with pytest.raises(MDFBusy):
+                await run_mdf(sum, [1])
+        finally:
+            release.set()
+        # 処理が終われば枠が返る
+        for _ in range(100):
+            if free_slots(slots) == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert await run_mdf(sum, [1]) == 1
+
+    asyncio.run(scenario())
+
+
+def test_exception_releases_slot(slots):
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(run_mdf(lambda: 1 / 0))
+    assert free_slots(slots) == 2
@@ -0,0 +1,77 @@
+# tests/test_hand_rank.py
+import random
+from collections import Counter
+from itertools import combinations
+import pytest
+from core.cards import CARD_RANK, CARD_SUIT, DECK
+from core.enums import HandCategory
+from core.hand_rank import evaluate_cards, hand_category
+
+
+def naive_rank5(cards):
+    """5枚の強さを (役カテゴリ, タイブレーク) で素直に数える参照実装"""
+    ranks = sorted((CARD_RANK[c] for c in cards), reverse=True)
+    flush = len({CARD_SUIT[c] for c in cards}) == 1
+    unique = sorted(set(ranks), reverse=True)
+    straight_top = None
+    if len(unique) == 5 and unique[0] - unique[4] == 4:
+        straight_top = unique[0]
+    elif unique == [14, 5, 4, 3, 2]:
+        straight_top = 5
+    # 枚数の多い順、同じならランクの高い順
+    groups = sorted(Counter(ranks).items(), key=lambda rc: (rc[1], rc[0]), reverse=True)
+    shape = [cnt for _, cnt in groups]
+    by_group = tuple(r for r, _ in groups)
+
+    if straight_top and flush:
+        return HandCategory.STRAIGHT_FLUSH, (straight_top,)
+    if shape == [4, 1]:
+        return HandCategory.FOUR_OF_A_KIND, by_group
+    if shape == [3, 2]:
+        return HandCategory.FULL_HOUSE, by_group
+    if flush:
+        return HandCategory.FLUSH, tuple(ranks)
+    if straight_top:
+        return HandCategory.STRAIGHT, (straight_top,)
+    if shape == [3, 1, 1]:
+        return HandCategory.THREE_OF_A_KIND, by_group
+    if shape == [2, 2, 1]:
+        return HandCategory.TWO_PAIR, by_group
+    if shape == [2, 1, 1, 1]:
+        return HandCategory.ONE_PAIR, by_group
+    return HandCategory.HIGH_CARD, tuple(ranks)
+
+
+def naive_best(cards):
+    return max(naive_rank5(five) for five in combinations(cards, 5))
+
+
+def sampled_hands(num_cards: int, n: int, seed: int):
+    rng = random.Random(seed)
+    return [rng.sample(DECK, num_cards) for _ in range(n)]
+
+
+@pytest.mark.parametrize("num_cards", [5, 6, 7])
+def test_category_matches_reference(num_cards):
+    for cards in sampled_hands(num_cards, 400, seed=num_cards):
+        assert hand_category(evaluate_cards(cards)) == naive_best(cards)[0], cards
+
+
+@pytest.mark.parametrize("num_cards", [5, 7])
+def test_ordering_matches_reference(num_cards):
+    hands = sampled_hands(num_cards, 300, seed=10 + num_cards)
+    ours = [evaluate_cards(cards) for cards in hands]
+    reference = [naive_best(cards) for cards in hands]
+    for (a, ref_a), (b, ref_b) in zip(zip(ours, reference), zip(ours[1:], reference[1:])):
+        assert (a > b) == (ref_a > ref_b) and (a == b) == (ref_a == ref_b)
+
+
+def test_every_category_is_reachable():
+    # 出にくい役（ストレートフラッシュ・クワッズ）も含めて、作った手で確認する
+    royal = [c for c in DECK if CARD_SUIT[c] == 0 and CARD_RANK[c] >= 10]
+    wheel = [c for c in DECK if CARD_SUIT[c] == 1 and CARD_RANK[c] in (14, 2, 3, 4, 5)]
+    quads = [c for c in DECK if CARD_RANK[c] == 9] + [DECK[0]]
+    assert hand_category(evaluate_cards(royal)) == HandCategory.STRAIGHT_FLUSH
+    assert hand_category(evaluate_cards(wheel)) == HandCategory.STRAIGHT_FLUSH
+    assert evaluate_cards(royal) > evaluate_cards(wheel)
+    assert hand_category(evaluate_cards(quads)) == HandCategory.FOUR_OF_A_KIND
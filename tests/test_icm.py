@@ -0,0 +1,30 @@
+# tests/test_icm.py
+import pytest
+from equity.icm import called_shove, called_shove_thresholds, DEFAULT_PAYOUTS
+from equity.push_fold import PUSH_POSITIONS, STACK_GRID, DEAD_MONEY, BIG_BLIND, _pot, position_blind
+from quiz.generators import icm_shove_thresholds
+
+
+def test_called_shove_pins_ante_convention():
+    # M2（5BB）の UTG シャブに BB がコール: BBアンティはスタックの外なので、ポットは 5 + (5 - 1) + 2.5
+    assert called_shove(5.0, 5.0, 0.0, BIG_BLIND, DEAD_MONEY) == (5.0, 4.0, 11.5)
+    # スタックが違うときは小さい方のスタック（ブラインド込み）までしか賭けない
+    assert called_shove(8.0, 5.0, 0.5, BIG_BLIND, DEAD_MONEY) == (4.5, 4.0, 11.0)
+
+
+@pytest.mark.parametrize("pos", PUSH_POSITIONS)
+@pytest.mark.parametrize("stack", STACK_GRID[::4])
+def test_icm_chip_threshold_matches_push_fold_solver(pos, stack):
+    # プッシュ/フォールドの均衡計算で BB にコールされたシャブが損益ゼロになる勝率と、ICM問題のチップEV側の必要勝率は同じ
+    chip, _ = icm_shove_thresholds(pos, stack / DEAD_MONEY)
+    hero_blind = position_blind(pos)
+    assert chip == pytest.approx((stack - hero_blind) / _pot(stack, hero_blind, BIG_BLIND))
+
+
+def test_called_shove_thresholds_uses_effective_stack():
+    stacks = [5.0, 7.0, 6.0]
+    blinds = [0.0, 0.5, 1.0]
+    # BB（6BB）が hero（5BB）をカバーしているので、hero はスタック全部・BB はブラインドを除いた 4BB を賭ける
+    chip, icm = called_shove_thresholds(stacks, blinds, DEFAULT_PAYOUTS, 0, 2, DEAD_MONEY)
+    assert chip == pytest.approx(5.0 / 11.5)
+    assert chip < icm < 1.0
@@ -0,0 +1,54 @@
+# tests/test_isomorphism.py
+import random
+import pytest
+from core.cards import COMBOS, DECK, card_to_str, cards_mask
+from core.enums import BUCKET_ORDER
+from core.isomorphism import PERMUTED_CARD, PERMUTED_COMBO, canonical_flops, canonicalize_board
+from core.range_combos import get_range_combos
+from mdf.analysis import bucket_hands, calculate_mdf_analysis
+from tests.baseline_evaluator import evaluate_hand_strength as baseline_hand_strength
+
+
+def sampled_flops(n: int, seed: int):
+    rng = random.Random(seed)
+    return [rng.sample(DECK, 3) for _ in range(n)]
+
+
+def test_canonical_flop_count():
+    assert len(canonical_flops()) == 1755
+
+
+@pytest.mark.parametrize("board", sampled_flops(20, seed=7))
+def test_suit_permutations_share_a_canonical_board(board):
+    canonical, perm = canonicalize_board(board)
+    assert sorted((PERMUTED_CARD[perm][c] for c in board), reverse=True) == list(canonical)
+    for cards in PERMUTED_CARD:
+        assert canonicalize_board(cards[c] for c in board)[0] == canonical
+
+
+def test_permuted_combo_table_matches_cards():
+    for cards, combos in zip(PERMUTED_CARD, PERMUTED_COMBO):
+        for i in range(0, len(COMBOS), 17):
+            c1, c2 = COMBOS[i]
+            assert set(COMBOS[combos[i]]) == {cards[c1], cards[c2]}
+
+
+@pytest.mark.parametrize("range_name", ["OPEN_UTG", "BB_DEFENCE_vs_BTN", "3BET_DEFENCE_OOP"])
+def test_canonical_buckets_match_baseline(range_name):
+    # 正準ボード・キャッシュ・バケットDBを通した結果が、元のボードで1コンボずつ判定したものと一致する
+    range_combos = get_range_combos(range_name)
+    for board in sampled_flops(10, seed=8):
+        live = list(range_combos.without(cards_mask(board)))
+        buckets = [baseline_hand_strength(COMBOS[i], board) for i in live]
+        analysis = calculate_mdf_analysis(range_combos, board, 0.5)
+        assert analysis["total_combos"] == len(buckets)
+        assert [b["count"] for b in analysis["buckets"]] == [buckets.count(b) for b in BUCKET_ORDER]
+
+        # ハンド一覧は元のスートに戻っている
+        for bucket in BUCKET_ORDER:
+            expected = sorted(
+                f"{card_to_str(COMBOS[i][0])}{card_to_str(COMBOS[i][1])}"
+                for i, b in zip(live, buckets) if b == bucket
+            )
+            total, hands = bucket_hands(range_combos, board, bucket, limit=len(live))
+            assert total == len(expected) and sorted(hands) == expected
@@ -0,0 +1,63 @@
+# tests/test_range_store.py
+import json
+import pytest
+from core import range_store
+from core.decision_tables import DECISION_TABLES
+from core.enums import Position
+from core.range_combos import get_range_combos
+from mdf.analysis import _cached_mdf_analysis, question_mdf_analysis
+
+
+@pytest.fixture
+def load(tmp_path):
+    """レンジファイルを読み込む。テストの後は空のファイル（組み込みレンジのみ）に戻す"""
+    def load_file(ranges):
+        path = tmp_path / "ranges.json"
+        path.write_text(json.dumps({"ranges": ranges}))
+        return range_store.load_ranges(str(path))
+    yield load_file
+    load_file({})
+
+
+def test_open_overrides_reach_derived_tables(load):
+    load({"OPEN_UTG": "AA", "OPEN_UTG1": "KK+", "OPEN_UTG2": "AA", "OPEN_BTN": "AA"})
+    tables = range_store.decision_tables()
+    # UTG は KK をオープンしないので、パワーナンバーも 999（UTGオープンレンジ）ではない
+    assert not tables.in_open_range(Position.UTG, 13, 13, False)
+    assert tables.assign_power_number(Position.UTG, 13, 13, False) == 50
+    assert tables.assign_power_number(Position.UTG, 14, 14, False) == 999
+    # SB first-in の RAISE は（SB_RFI が無ければ）上書き後の BTN オープンレンジ
+    assert tables.sb_first_in_action(14, 2, False) == "fold"
+    assert tables.sb_first_in_action(14, 14, False) == "raise"
+    assert len(get_range_combos("SB_RFI")) == 6
+    # 3betディフェンスは上書き後の UTG+1 オープンレンジが土台
+    assert tables.three_bet_defence_action(Position.CO, True, 12, 12, False) == "fold"
+    assert tables.three_bet_defence_action(Position.CO, True, 13, 13, False) == "defend"
+    assert len(get_range_combos("3BET_DEFENCE_IP")) == 12
+    # 3bet の「一つ上のオープンレンジ」（LJ のオープンに対しては UTG+2）も上書き後のレンジ
+    assert tables.three_bet_allowed_actions(Position.BTN, Position.LJ, 13, 12, True) == ["fold"]
+    assert tables.three_bet_allowed_actions(Position.BTN, Position.LJ, 14, 14, False) == ["3bet"]
+
+
+def test_explicit_derived_range_wins(load):
+    load({"OPEN_BTN": "AA", "SB_RFI": "KK+"})
+    tables = range_store.decision_tables()
+    assert tables.sb_first_in_action(13, 13, False) == "raise"
+    assert len(get_range_combos("SB_RFI")) == 12
+
+
+def test_empty_file_matches_builtin(load):
+    load({})
+    tables = range_store.decision_tables()
+    for field in ("open_range", "bb_defence", "sb_first_in", "three_bet", "three_bet_defence", "power_number"):
+        assert getattr(tables, field) == getattr(DECISION_TABLES, field)
+
+
+def test_stale_mdf_analysis_is_not_served_after_reload(load):
+    # 差し替え前に始まった計算が、キャッシュを捨てた後に古いレンジの結果を入れた状況
+    board_raw = "14s,7h,2c"
+    old_range = get_range_combos("OPEN_UTG")
+    load({"OPEN_UTG": "AA"})
+    stale = _cached_mdf_analysis(old_range, board_raw, 0.5)  # 古いレンジの結果がキャッシュに入る
+    fresh = question_mdf_analysis("OPEN_UTG", board_raw, 0.5)
+    assert fresh["total_combos"] == 3 != stale["total_combos"]
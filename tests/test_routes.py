@@ -0,0 +1,50 @@
+# tests/test_routes.py
+import random
+import re
+import threading
+import pytest
+from fastapi.testclient import TestClient
+import web.executor as executor
+from core.enums import StudyMode
+from main import app
+from quiz.generators import generate_question
+from quiz.pool import QUESTION_POOL
+from quiz.tokens import encode_question
+from web.routes import NEXT_QUESTION_UNAVAILABLE
+
+# lifespan（補充スレッドの起動）は走らせない。プールの中身はテストごとに用意する
+client = TestClient(app)
+
+
+@pytest.fixture
+def busy_mdf(monkeypatch):
+    """MDFの枠が全部埋まっている状態"""
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(executor, "_mdf_slots", slots)
+
+
+def test_stocked_mdf_question_is_served_while_busy(busy_mdf):
+    QUESTION_POOL.refill()
+    response = client.get("/", params={"mode": StudyMode.MDF_TRAINER.value})
+    assert response.status_code == 200
+    assert re.search(r'name="q" value="[^"]+"', response.text)
+
+
+def test_empty_mdf_pool_while_busy_is_503(busy_mdf):
+    QUESTION_POOL.clear()
+    response = client.get("/", params={"mode": StudyMode.MDF_TRAINER.value})
+    assert response.status_code == 503
+
+
+def test_answer_keeps_verdict_when_next_question_is_unavailable(busy_mdf):
+    QUESTION_POOL.clear()
+    question = generate_question(StudyMode.OPEN_RANGE, random.Random(3))
+    response = client.post("/answer", data={
+        "q": encode_question(question),
+        "requested_mode": StudyMode.MDF_TRAINER.value,
+        "user_action": question["correct_action"],
+    })
+    assert response.status_code == 200
+    assert 'class="result-status ok"' in response.text
+    assert NEXT_QUESTION_UNAVAILABLE in response.text
@@ -0,0 +1,43 @@
+# tests/test_tokens.py
+import random
+import pytest
+from core.enums import StudyMode
+from quiz.generators import generate_question
+from quiz.tokens import TOKEN_FIELDS, _b64encode, _sign, decode_question, encode_question, issue_question
+
+
+@pytest.mark.parametrize("mode", [StudyMode.OPEN_RANGE, StudyMode.THREE_BET, StudyMode.POWER_NUMBER, StudyMode.MDF_TRAINER])
+def test_round_trip(mode):
+    question = issue_question(generate_question(mode, random.Random(1)))
+    restored = decode_question(question["token"])
+    for name in TOKEN_FIELDS:
+        assert restored[name] == question.get(name)
+    assert restored["hand_label"] == question["hand_label"]
+    if mode == StudyMode.MDF_TRAINER:
+        assert restored["board"] == question["board"]
+
+
+def test_tampered_answer_is_rejected():
+    question = generate_question(StudyMode.OPEN_RANGE, random.Random(2))
+    token = encode_question(question)
+    forged = dict(question, correct_action="raise" if question["correct_action"] != "raise" else "fold")
+    payload, _, signature = token.partition(".")
+    forged_payload = encode_question(forged).partition(".")[0]
+    with pytest.raises(ValueError):
+        decode_question(f"{forged_payload}.{signature}")
+    bad_signature = signature[:-2] + ("BB" if signature.endswith("AA") else "AA")
+    with pytest.raises(ValueError):
+        decode_question(f"{payload}.{bad_signature}")
+
+
+@pytest.mark.parametrize("token", ["", "garbage", "abc.", ".abc", "abc.éé", "é.abc", "abあc.def"])
+def test_malformed_tokens_raise_value_error(token):
+    with pytest.raises(ValueError):
+        decode_question(token)
+
+
+def test_unsupported_payload_is_rejected():
+    # 署名は正しいが中身が想定外（バージョン違い・要素数違い）
+    for payload in (_b64encode(b"[99]"), _b64encode(b"{}")):
+        with pytest.raises(ValueError):
+            decode_question(f"{payload}.{_sign(payload)}")
@@ -0,0 +1,73 @@
+# web/executor.py
+"""
+MDFの重い処理（バケット分析・カーブ・ランアウト・エクイティ）をイベントループの外で実行する。
+
+  - 専用のスレッドプール（MDF_WORKERS 本）で実行し、ハンドラは await するだけにする
+  - 実行中＋実行待ちの処理数を MDF_CONCURRENCY に制限する（空きが無ければ待たずに MDFBusy）
+    枠はスレッドプール側の処理が本当に終わった時に返すので、時間切れで手放した処理も数に入る
+  - 実行が MDF_TIMEOUT 秒を超えたら MDFTimeout（呼び出し側で縮退・503 にする）
+
+プリフロップの問題はこのプールを通らないので、MDF分析が詰まっていても待たされない。
+純Pythonの処理なのでスレッド間でGILは共有するが、イベントループは数msごとに実行権を取り戻せる。
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+MDF_WORKERS = int(os.environ.get("MDF_WORKERS", "2"))
+MDF_CONCURRENCY = int(os.environ.get("MDF_CONCURRENCY", str(MDF_WORKERS * 2)))
+MDF_TIMEOUT = float(os.environ.get("MDF_TIMEOUT", "10.0"))
+
+MDF_EXECUTOR = ThreadPoolExecutor(max_workers=MDF_WORKERS, thread_name_prefix="mdf")
+_mdf_slots = threading.BoundedSemaphore(MDF_CONCURRENCY)
+
+
+class MDFTimeout(Exception):
+    """MDFの処理が MDF_TIMEOUT 秒以内に終わらなかった"""
+
+
+class MDFBusy(MDFTimeout):
+    """MDFの処理が MDF_CONCURRENCY 件たまっていて受け付けられなかった（時間切れと同じく縮退・503 にする）"""
+
+
+async def run_mdf(
+    func: Callable[..., T],
+    *args: Any,
+    timeout: float = MDF_TIMEOUT,
+    on_late_result: Optional[Callable[[T], None]] = None,
+) -> T:
+    """
+    func(*args) をMDF用スレッドプールで実行して結果を返す。
+    空きが無ければすぐ MDFBusy。タイムアウトしても実行中のスレッドは止められないので、
+    遅れて出た結果は on_late_result に渡す（結果はキャッシュに残るので、次の同じリクエストは速い）。
+    """
+    if not _mdf_slots.acquire(blocking=False):
+        raise MDFBusy(f"{MDF_CONCURRENCY} MDF tasks are already running or queued")
+    try:
+        executor_future = MDF_EXECUTOR.submit(partial(func, *args))
+    except BaseException:
+        _mdf_slots.release()
+        raise
+    # 枠は（タイムアウトで待つのをやめた後でも）処理が終わった時に返す
+    executor_future.add_done_callback(lambda f: _mdf_slots.release())
+    future = asyncio.wrap_future(executor_future)
+
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+    except asyncio.TimeoutError:
+        if on_late_result is not None:
+            def deliver(f: asyncio.Future) -> None:
+                if not f.cancelled() and f.exception() is None:
+                    on_late_result(f.result())
+            future.add_done_callback(deliver)
+        raise MDFTimeout(f"{getattr(func, '__name__', func)} did not finish within {timeout}s") from None
+
+
+def shutdown_mdf_executor() -> None:
+    """シャットダウン時に呼ぶ（実行中の処理は待たない）"""
+    MDF_EXECUTOR.shutdown(wait=False, cancel_futures=True)
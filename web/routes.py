@@ -1,87 +1,110 @@
 # web/routes.py
-from typing import Optional, List
-from fastapi import APIRouter, Request, Form
-from fastapi.responses import HTMLResponse
+import json
+import math
+from itertools import islice
+from typing import Any, Dict, Optional, List, Tuple
+from fastapi import APIRouter, HTTPException, Request, Form
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 
-from core.enums import StudyMode
-from core.utils_hand import hand_label
-from core.cards import card_to_str
-from core.range_combos import get_range_combos
-from mdf.analysis import calculate_mdf_analysis
-from quiz.generators import generate_question
+from core.enums import StudyMode, Bucket, Position
+from core.cards import parse_board
+from core.range_combos import ComboRange, get_range_combos, BETTOR_RANGE
+from mdf.analysis import question_mdf_analysis, calculate_mdf_curve, bucket_hands, bucket_equities
+from mdf.streets import runout_distribution
+from equity.push_fold import nash_shove_frequency
+from quiz.generators import generate_questions, icm_shove_thresholds, MDF_BET_SIZES
+from quiz.pool import QUESTION_POOL
+from quiz.tokens import decode_question, issue_question
+from web.executor import MDFTimeout, run_mdf
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
+# GET /questions.ndjson で1回に生成できる最大問題数
+MAX_STREAM_QUESTIONS = 1000
+# MDFの問題を含むモードで、1回の run_mdf に生成させる問題数
+STREAM_BATCH_SIZE = 20
+
+# 改ざん・期限切れ（鍵の変更）のトークンを受け取ったときに新しい問題と一緒に出す案内
+QUESTION_EXPIRED = "前の問題の有効期限が切れたため、新しい問題を出題しました"
+# 採点後に次の問題を用意できなかったとき（MDFの処理が混雑・時間切れ）の案内
+NEXT_QUESTION_UNAVAILABLE = "次の問題を用意できませんでした。少し待ってから再読み込みしてください"
+
+# MDFの処理が混み合っているときの応答
+MDF_BUSY = HTTPException(status_code=503, detail="MDF analysis is busy, retry shortly", headers={"Retry-After": "1"})
+
+
+def range_combos_or_404(range_name: str) -> ComboRange:
+    """クエリのレンジ名 → コンボ。知らないレンジ名は 404"""
+    try:
+        return get_range_combos(range_name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"unknown range: {range_name}")
+
+
+def board_or_422(board: str, sizes: Tuple[int, ...] = (3, 4, 5)) -> List[int]:
+    """クエリの board_raw → カードID。カードが不正・重複・枚数違いなら 422"""
+    try:
+        cards = parse_board(board)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if len(cards) not in sizes or len(set(cards)) != len(cards):
+        raise HTTPException(status_code=422, detail=f"board must be {'/'.join(map(str, sizes))} distinct cards")
+    return cards
+
+
+async def take_question(ui_mode: StudyMode) -> Dict[str, Any]:
+    """
+    次の問題を取り出してトークンを付ける。
+    ストックにある問題はそのまま出す。MDFの問題だけはストック切れのとき生成が重いので、
+    MDF用スレッドプールで待つ。時間切れ・混雑なら、遅れて出来た問題はストックに戻し、
+    MIX ではプリフロップの問題で代用する（それ以外は MDFTimeout / MDFBusy を呼び出し側へ）。
+    """
+    mode = QUESTION_POOL.pick_mode(ui_mode)
+    if mode != StudyMode.MDF_TRAINER:
+        return issue_question(QUESTION_POOL.pop(mode))
+    question = QUESTION_POOL.pop_ready(mode)
+    if question is not None:
+        return issue_question(question)
+    generation = QUESTION_POOL.generation
+    try:
+        question = await run_mdf(
+            QUESTION_POOL.pop, mode, on_late_result=lambda q: QUESTION_POOL.put_back(mode, q, generation)
+        )
+    except MDFTimeout:
+        if ui_mode != StudyMode.MIX:
+            raise
+        question = QUESTION_POOL.pop(StudyMode.OPEN_RANGE)
+    return issue_question(question)
+
 
 @router.get("/", response_class=HTMLResponse)
 async def index(
     request: Request,
     mode: str = StudyMode.OPEN_RANGE.value,
-    # 問題復元用パラメータ
-    q_mode: Optional[str] = None,
-    hero_pos: Optional[str] = None,
-    villain_pos: Optional[str] = None,
-    hand_hi: Optional[int] = None,
-    hand_lo: Optional[int] = None,
-    suited: Optional[str] = None,
-    m_value: Optional[float] = None,
-    in_position: Optional[str] = None,
-    correct_action: Optional[str] = None,
-    # MDF用復元パラメータ
-    range_name: Optional[str] = None,
-    board: Optional[str] = None,
-    bet_size: Optional[float] = None,
+    q: Optional[str] = None,            # 共有URLの問題トークン（quiz.tokens）
 ):
     try:
         ui_mode = StudyMode(mode)
     except ValueError:
         ui_mode = StudyMode.OPEN_RANGE
 
-    # URLパラメータから問題を復元するか、新規生成するか
-    if q_mode is not None:
-        # 問題復元モード
-        question = {
-            "mode": q_mode,
-            "hero_pos": hero_pos or "",
-            "villain_pos": villain_pos or "",
-            "hand_hi": hand_hi or 0,
-            "hand_lo": hand_lo or 0,
-            "suited": (suited == "true"),
-            "hand_label": hand_label(hand_hi, hand_lo, suited == "true") if hand_hi and hand_lo else "",
-            "m_value": m_value,
-            "in_position": (in_position == "true") if in_position else None,
-            "correct_action": correct_action or "",
-        }
-
-        # MDFモードの場合、追加データを復元
-        if q_mode == StudyMode.MDF_TRAINER.value and range_name and board and bet_size is not None:
-            # ボードを表示用に変換
-            board_cards_str = board.split(',')
-            board_display = []
-            board_cards = []
-            for card_str in board_cards_str:
-                suit_str = card_str[-1]
-                rank_str = card_str[:-1]
-                rank = int(rank_str)
-                board_cards.append((rank, suit_str))
-                board_display.append(card_to_str((rank, suit_str)))
-
-            # MDF分析を実行
-            range_combos = get_range_combos(range_name)
-            analysis = calculate_mdf_analysis(range_combos, board_cards, bet_size)
-
-            question.update({
-                "range_name": range_name,
-                "board": board_display,
-                "board_raw": board,
-                "bet_size": bet_size,
-                "analysis": analysis,
-            })
-    else:
-        # 新規問題生成
-        question = generate_question(ui_mode)
+    # トークンから問題を復元するか、新規生成するか
+    question = None
+    notice = None
+    if q is not None:
+        try:
+            question = decode_question(q)
+        except ValueError:
+            # 改ざん・期限切れ（鍵の変更）のトークンは新しい問題で置き換える
+            notice = QUESTION_EXPIRED
+    if question is None:
+        # 新規問題（事前生成プールから取り出す）
+        try:
+            question = await take_question(ui_mode)
+        except MDFTimeout:
+            raise MDF_BUSY
 
     context = {
         "request": request,
@@ -89,6 +112,7 @@ async def index(
         "ui_mode": ui_mode.value,
         "question": question,
         "last_result": None,
+        "notice": notice,
     }
     return templates.TemplateResponse("index.html", context)
 
@@ -96,38 +120,50 @@ async def index(
 @router.post("/answer", response_class=HTMLResponse)
 async def answer(
     request: Request,
-    mode: str = Form(...),              # 出題時の question.mode
+    q: str = Form(...),                 # 出題時の問題トークン（quiz.tokens）
     requested_mode: str = Form(...),    # UIで選んだモード（mix含む）
-    correct_action: str = Form(...),
-    hero_pos: str = Form(""),
-    villain_pos: str = Form(""),
-    hand_hi: int = Form(0),
-    hand_lo: int = Form(0),
-    suited: str = Form("false"),
-    m_value: Optional[float] = Form(None),
-    in_position: Optional[str] = Form(None),
     user_action: Optional[str] = Form(None),
     user_actions: Optional[List[str]] = Form(None),
-    # MDF用パラメータ
-    range_name: Optional[str] = Form(None),
-    board: Optional[str] = Form(None),
-    bet_size: Optional[float] = Form(None),
 ):
-    hi = int(hand_hi)
-    lo = int(hand_lo)
-    is_suited = (suited == "true")
+    # UIで選んだモード（次の問題用）
+    try:
+        ui_mode = StudyMode(requested_mode)
+    except ValueError:
+        ui_mode = StudyMode.OPEN_RANGE
+
+    # 署名を検証して問題を復元（正解もトークンから取るので書き換えられない）
+    try:
+        question = decode_question(q)
+    except ValueError:
+        # 改ざん・期限切れ（再起動で鍵が変わった等）のトークンは採点せず、新しい問題を出す
+        try:
+            question = await take_question(ui_mode)
+        except MDFTimeout:
+            raise MDF_BUSY
+        context = {
+            "request": request,
+            "study_modes": list(StudyMode),
+            "ui_mode": ui_mode.value,
+            "question": question,
+            "last_result": None,
+            "notice": QUESTION_EXPIRED,
+        }
+        return templates.TemplateResponse("index.html", context)
+
+    mode = question["mode"]
+    hi = int(question["hand_hi"] or 0)
+    lo = int(question["hand_lo"] or 0)
+    is_suited = bool(question["suited"])
+    m_value = question["m_value"]
 
-    hero_position = hero_pos
-    villain_position = villain_pos or None
+    hero_position = question["hero_pos"]
+    villain_position = question["villain_pos"] or None
 
     # in_position は three_bet_defence 以外は None
-    if in_position is not None and in_position != "":
-        in_pos_bool = (in_position == "true")
-    else:
-        in_pos_bool = None
+    in_pos_bool = question["in_position"]
 
     # 正解アクション側（文字列）
-    expected_raw = correct_action
+    expected_raw = question["correct_action"]
 
     # ユーザーの回答解析
     if mode == StudyMode.THREE_BET.value:
@@ -156,7 +192,7 @@ async def answer(
     last_result = {
         "is_correct": is_correct,
         "mode": mode,
-        "hand_label": hand_label(hi, lo, is_suited) if hi > 0 else "",
+        "hand_label": question["hand_label"],
         "hero_pos": hero_position,
         "villain_pos": villain_position,
         "m_value": m_value,
@@ -165,37 +201,44 @@ async def answer(
         "expected": expected_str,
     }
 
-    # MDFモードの場合、追加データを含める
-    if mode == StudyMode.MDF_TRAINER.value and range_name and board and bet_size is not None:
-        # ボード文字列をパース
-        board_cards_str = board.split(',')
-        # 分析を再実行（答え合わせ用）
-        range_combos = get_range_combos(range_name)
-        # ボードを再構築
-        board_cards = []
-        for card_str in board_cards_str:
-            # card_str format: "14s" or "2c" (rank + suit)
-            suit_str = card_str[-1]  # 最後の文字がスート
-            rank_str = card_str[:-1]  # それ以外がランク（数値文字列）
-            rank = int(rank_str)
-            board_cards.append((rank, suit_str))
-
-        analysis = calculate_mdf_analysis(range_combos, board_cards, bet_size)
+    # パワーナンバーの場合、均衡チャートのシャブ頻度とICMの必要勝率を含める（テーブル参照・キャッシュのみ）
+    if mode == StudyMode.POWER_NUMBER.value and m_value is not None and hi > 0:
+        try:
+            pn_position = Position(hero_position)
+        except ValueError:
+            pn_position = None
+        if pn_position is not None:
+            nash_freq = nash_shove_frequency(pn_position, hi, lo, is_suited, m_value)
+            if nash_freq is not None:
+                last_result["nash_shove_freq"] = round(nash_freq * 100, 1)
+            if pn_position not in (Position.SB, Position.BB):
+                chip_threshold, icm_threshold = icm_shove_thresholds(pn_position, m_value)
+                last_result["chip_required_equity"] = round(chip_threshold * 100, 1)
+                last_result["icm_required_equity"] = round(icm_threshold * 100, 1)
 
+    # MDFモードの場合、追加データを含める
+    if mode == StudyMode.MDF_TRAINER.value:
+        range_name = question["range_name"]
+        # 分析は出題時のキャッシュを引く（キャッシュ切れで時間切れなら分析表示だけ省略、判定は有効）
+        try:
+            analysis = await run_mdf(question_mdf_analysis, range_name, question["board_raw"], question["bet_size"])
+        except MDFTimeout:
+            analysis = None
         last_result.update({
             "range_name": range_name,
-            "board": board,
-            "bet_size": bet_size,
+            "board": question["board_raw"],
+            "bet_size": question["bet_size"],
             "analysis": analysis,
+            "bettor_range": BETTOR_RANGE.get(range_name),
         })
 
-    # 次の問題を生成（UIで選んだモードに基づく）
+    # 次の問題を生成（UIで選んだモードに基づく）。用意できなくても採点結果は返す
+    notice = None
     try:
-        ui_mode = StudyMode(requested_mode)
-    except ValueError:
-        ui_mode = StudyMode.OPEN_RANGE
-
-    next_question = generate_question(ui_mode)
+        next_question = await take_question(ui_mode)
+    except MDFTimeout:  # MDFBusy も含む
+        next_question = None
+        notice = NEXT_QUESTION_UNAVAILABLE
 
     context = {
         "request": request,
@@ -203,5 +246,140 @@ async def answer(
         "ui_mode": ui_mode.value,
         "question": next_question,
         "last_result": last_result,
+        "notice": notice,
     }
     return templates.TemplateResponse("index.html", context)
+
+
+@router.get("/mdf/curve")
+async def mdf_curve(
+    range_name: str,
+    board: str,                         # board_raw形式（例: "14s,7h,2c"）
+    bet_sizes: Optional[str] = None,    # カンマ区切り（省略時は出題用の5サイズ）
+):
+    """レンジ × ボードのディフェンスカーブ（bet sizeごとのカットオフ）をJSONで返す"""
+    try:
+        sizes = [float(x) for x in bet_sizes.split(",")] if bet_sizes else MDF_BET_SIZES
+    except ValueError:
+        raise HTTPException(status_code=422, detail="bet_sizes must be comma-separated numbers")
+    if not all(math.isfinite(x) and x > 0 for x in sizes):
+        raise HTTPException(status_code=422, detail="bet_sizes must be positive")
+    board_cards = board_or_422(board)
+    try:
+        curve = await run_mdf(calculate_mdf_curve, range_combos_or_404(range_name), board_cards, sizes)
+    except MDFTimeout:
+        raise MDF_BUSY
+    return {
+        "range_name": range_name,
+        "board": board,
+        "curve": curve,
+    }
+
+
+@router.get("/mdf/hands")
+async def mdf_hands(
+    range_name: str,
+    board: str,                         # board_raw形式（例: "14s,7h,2c"）
+    bucket: Bucket,                     # Bucketの値（例: "Weak Made"）
+    offset: int = 0,
+    limit: int = 200,
+):
+    """MDF分析のバケット内ハンド一覧をページ単位でJSONで返す（トグル表示時に取得）"""
+    board_cards = board_or_422(board)
+    offset = max(offset, 0)
+    try:
+        total, hands = await run_mdf(
+            bucket_hands, range_combos_or_404(range_name), board_cards, bucket, offset, min(max(limit, 0), 500)
+        )
+    except MDFTimeout:
+        raise MDF_BUSY
+    return {
+        "bucket": bucket.value,
+        "total": total,
+        "offset": offset,
+        "hands": hands,
+    }
+
+
+@router.get("/mdf/runouts")
+async def mdf_runouts(
+    range_name: str,
+    board: str,                         # board_raw形式（フロップ or ターン）
+):
+    """次のストリートの全ランアウトでのバケット分布の平均をJSONで返す"""
+    board_cards = board_or_422(board)
+    if len(board_cards) >= 5:
+        return {"street": "", "runouts": 0, "buckets": []}
+    try:
+        return await run_mdf(runout_distribution, range_combos_or_404(range_name), board_cards)
+    except MDFTimeout:
+        raise MDF_BUSY
+
+
+@router.get("/mdf/equity")
+async def mdf_equity(
+    range_name: str,
+    board: str,                         # board_raw形式（例: "14s,7h,2c"）
+):
+    """各バケット vs ベッターのレンジ のエクイティをJSONで返す（ベッターのレンジが無いスポットは空）"""
+    range_combos = range_combos_or_404(range_name)
+    board_cards = board_or_422(board)
+    bettor_range_name = BETTOR_RANGE.get(range_name)
+    if bettor_range_name is None:
+        return {"bettor_range": None, "buckets": []}
+    try:
+        buckets = await run_mdf(
+            bucket_equities, range_combos, get_range_combos(bettor_range_name), board_cards
+        )
+    except MDFTimeout:
+        raise MDF_BUSY
+    return {
+        "bettor_range": bettor_range_name,
+        "buckets": buckets,
+    }
+
+
+@router.get("/metrics/question-pool")
+async def question_pool_metrics():
+    """事前生成プールのストック数・ヒット率・補充の遅れをJSONで返す"""
+    return QUESTION_POOL.metrics()
+
+
+@router.get("/questions.ndjson")
+async def questions_ndjson(
+    mode: StudyMode = StudyMode.MIX,
+    n: int = 100,
+    seed: Optional[int] = None,
+):
+    """
+    問題を1行1問のNDJSONでストリーミングする（seed 指定で再現可能な問題セット）。
+    MDFの問題を含むモード（MDF_TRAINER / MIX）は STREAM_BATCH_SIZE 問ずつ run_mdf で生成し、
+    MDFの同時実行数・タイムアウトに従う。最初のバッチが時間切れなら 503、
+    途中で時間切れになったら {"error": ...} の行を出して打ち切る。
+    """
+    questions = generate_questions(mode, max(0, min(n, MAX_STREAM_QUESTIONS)), seed)
+    if mode not in (StudyMode.MDF_TRAINER, StudyMode.MIX):
+        lines = (json.dumps(q, ensure_ascii=False) + "\n" for q in questions)
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    def next_batch() -> List[Dict[str, Any]]:
+        return list(islice(questions, STREAM_BATCH_SIZE))
+
+    try:
+        first = await run_mdf(next_batch)
+    except MDFTimeout:
+        raise MDF_BUSY
+
+    async def batches():
+        batch = first
+        while batch:
+            yield "".join(json.dumps(q, ensure_ascii=False) + "\n" for q in batch)
+            if len(batch) < STREAM_BATCH_SIZE:
+                return
+            try:
+                batch = await run_mdf(next_batch)
+            except MDFTimeout:
+                yield json.dumps({"error": MDF_BUSY.detail}) + "\n"
+                return
+
+    return StreamingResponse(batches(), media_type="application/x-ndjson")